@@ -0,0 +1,52 @@
+"""010_rewrite_suggestions
+
+Crée la table `rewrite_suggestions` : cache des suggestions de réécriture
+(clé = version du prompt + texte normalisé + secteur + hash des raisons),
+partagé par l'endpoint unitaire, l'endpoint batch et le rapport marque.
+
+Revision ID: 010_rewrite_suggestions
+Revises: 009_pdf_marque
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "010_rewrite_suggestions"
+down_revision = "009_pdf_marque"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rewrite_suggestions",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            primary_key=True,
+            server_default=sa.text("gen_random_uuid()"),
+        ),
+        sa.Column("cache_key", sa.String(64), nullable=False),
+        sa.Column("prompt_version", sa.String(20), nullable=False),
+        sa.Column("sector", sa.String(100), nullable=False),
+        sa.Column("claim_text", sa.Text, nullable=False),
+        sa.Column("suggestions", sa.JSON, nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+        ),
+    )
+    op.create_index(
+        "ix_rewrite_suggestions_cache_key",
+        "rewrite_suggestions",
+        ["cache_key"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rewrite_suggestions_cache_key", table_name="rewrite_suggestions")
+    op.drop_table("rewrite_suggestions")
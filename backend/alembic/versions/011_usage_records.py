@@ -0,0 +1,66 @@
+"""011_usage_records
+
+Crée la table `usage_records` : registre append-only de la consommation
+LLM (tokens in/out/cache) et scraping (pages Firecrawl, appels Jina)
+par organisation, audit et jour.
+
+Revision ID: 011_usage_records
+Revises: 010_rewrite_suggestions
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "011_usage_records"
+down_revision = "010_rewrite_suggestions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "usage_records",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            primary_key=True,
+            server_default=sa.text("gen_random_uuid()"),
+        ),
+        sa.Column(
+            "organization_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("organizations.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "audit_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("audits.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("day", sa.Date, nullable=False),
+        sa.Column("operation", sa.String(50), nullable=False),
+        sa.Column("input_tokens", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("output_tokens", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("cached_tokens", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("llm_calls", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("firecrawl_pages", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("jina_calls", sa.Integer, nullable=False, server_default="0"),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+        ),
+    )
+    op.create_index(
+        "ix_usage_records_organization_id",
+        "usage_records",
+        ["organization_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_usage_records_organization_id", table_name="usage_records")
+    op.drop_table("usage_records")
@@ -0,0 +1,51 @@
+"""013_monitoring_runs
+
+Crée la table `monitoring_runs` : statistiques de chaque passage du
+scheduler de monitoring (checks lancés / terminés / en erreur / en timeout,
+reports au tick suivant, retard au lancement).
+
+Revision ID: 013_monitoring_runs
+Revises: 012_jobs
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "013_monitoring_runs"
+down_revision = "012_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "monitoring_runs",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            primary_key=True,
+            server_default=sa.text("gen_random_uuid()"),
+        ),
+        sa.Column(
+            "started_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+        ),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("due", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("started", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("completed", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("failed", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("timed_out", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("carried_over", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("alerts_created", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("max_lag_seconds", sa.Float, nullable=False, server_default="0"),
+        sa.Column("avg_lag_seconds", sa.Float, nullable=False, server_default="0"),
+        sa.Column("deadline_hit", sa.Boolean, nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("monitoring_runs")
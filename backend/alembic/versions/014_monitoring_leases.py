@@ -0,0 +1,36 @@
+"""014_monitoring_leases
+
+Ajoute le bail du scheduler sur `monitoring_configs` (lease_owner /
+lease_expires_at) : chaque check dû n'est exécuté que par la réplique qui
+détient le bail, même avec plusieurs workers uvicorn ou réplicas.
+
+Revision ID: 014_monitoring_leases
+Revises: 013_monitoring_runs
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "014_monitoring_leases"
+down_revision = "013_monitoring_runs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "monitoring_configs",
+        sa.Column("lease_owner", sa.String(100), nullable=True),
+    )
+    op.add_column(
+        "monitoring_configs",
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("monitoring_configs", "lease_expires_at")
+    op.drop_column("monitoring_configs", "lease_owner")
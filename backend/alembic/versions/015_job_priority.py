@@ -0,0 +1,33 @@
+"""015_job_priority
+
+Ajoute `jobs.priority` (interactive / batch) pour le partage équitable pondéré
+des workers entre organisations, et un index (status, organization_id) pour
+le calcul des files par organisation.
+
+Revision ID: 015_job_priority
+Revises: 014_monitoring_leases
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "015_job_priority"
+down_revision = "014_monitoring_leases"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "jobs",
+        sa.Column("priority", sa.String(20), nullable=False, server_default="interactive"),
+    )
+    op.create_index("ix_jobs_status_organization_id", "jobs", ["status", "organization_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_status_organization_id", table_name="jobs")
+    op.drop_column("jobs", "priority")
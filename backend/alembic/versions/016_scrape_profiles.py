@@ -0,0 +1,36 @@
+"""016_scrape_profiles
+
+Table `scrape_profiles` : résultat de la dernière sonde de chaque chemin RSE
+par domaine, pour ne scraper que les chemins productifs aux scans suivants.
+
+Revision ID: 016_scrape_profiles
+Revises: 015_job_priority
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "016_scrape_profiles"
+down_revision = "015_job_priority"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scrape_profiles",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("domain", sa.String(255), nullable=False),
+        sa.Column("paths", sa.JSON(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_scrape_profiles_domain", "scrape_profiles", ["domain"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scrape_profiles_domain", table_name="scrape_profiles")
+    op.drop_table("scrape_profiles")
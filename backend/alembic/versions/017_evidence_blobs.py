@@ -0,0 +1,89 @@
+"""017_evidence_blobs
+
+Sort le contenu des pièces justificatives de PostgreSQL vers le blob store
+(app.services.blob_store, adressé par sha256) :
+  - ajoute `evidence_files.sha256` (indexé) et rend `file_data` nullable ;
+  - déplace les blobs existants par lots de _BATCH_SIZE lignes (mémoire bornée),
+    puis vide `file_data`. Reprise possible : seules les lignes sans sha256
+    sont traitées.
+
+Le downgrade recopie les blobs en base avant de supprimer la colonne.
+
+Revision ID: 017_evidence_blobs
+Revises: 016_scrape_profiles
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "017_evidence_blobs"
+down_revision = "016_scrape_profiles"
+branch_labels = None
+depends_on = None
+
+_BATCH_SIZE = 50
+
+_evidence = sa.table(
+    "evidence_files",
+    sa.column("id"),
+    sa.column("sha256", sa.String),
+    sa.column("file_data", sa.LargeBinary),
+)
+
+
+def upgrade() -> None:
+    from app.services.blob_store import get_blob_store
+
+    op.add_column("evidence_files", sa.Column("sha256", sa.String(64), nullable=True))
+    op.create_index("ix_evidence_files_sha256", "evidence_files", ["sha256"])
+    op.alter_column("evidence_files", "file_data", existing_type=sa.LargeBinary(), nullable=True)
+
+    conn = op.get_bind()
+    store = get_blob_store()
+    while True:
+        rows = conn.execute(
+            sa.select(_evidence.c.id, _evidence.c.file_data)
+            .where(_evidence.c.sha256.is_(None), _evidence.c.file_data.is_not(None))
+            .limit(_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            data = bytes(row.file_data)
+            sha256 = hashlib.sha256(data).hexdigest()
+            store.write(sha256, data)
+            conn.execute(
+                _evidence.update()
+                .where(_evidence.c.id == row.id)
+                .values(sha256=sha256, file_data=None)
+            )
+
+
+def downgrade() -> None:
+    from app.services.blob_store import get_blob_store
+
+    conn = op.get_bind()
+    store = get_blob_store()
+    while True:
+        rows = conn.execute(
+            sa.select(_evidence.c.id, _evidence.c.sha256)
+            .where(_evidence.c.sha256.is_not(None), _evidence.c.file_data.is_(None))
+            .limit(_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            conn.execute(
+                _evidence.update()
+                .where(_evidence.c.id == row.id)
+                .values(file_data=store.read(row.sha256))
+            )
+
+    op.alter_column("evidence_files", "file_data", existing_type=sa.LargeBinary(), nullable=False)
+    op.drop_index("ix_evidence_files_sha256", table_name="evidence_files")
+    op.drop_column("evidence_files", "sha256")
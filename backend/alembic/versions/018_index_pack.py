@@ -0,0 +1,51 @@
+"""018_index_pack
+
+Index des clés étrangères et filtres des requêtes chaudes des routers :
+  - claims.audit_id, claim_results.claim_id, evidence_files.claim_id
+    (chargement des claims / résultats / pièces d'un audit) ;
+  - audits (organization_id, created_at) : liste des audits d'une organisation ;
+  - audits.created_by_user_id : audits d'un membre ;
+  - monitoring_configs (is_active, next_check_at) : checks dus ;
+  - monitoring_alerts (monitoring_config_id, is_read) : alertes d'une config.
+
+client_accesses.audit_id est déjà couvert par sa contrainte UNIQUE.
+
+Sur PostgreSQL les index sont créés CONCURRENTLY (hors transaction) : pas de
+verrou d'écriture sur les tables pendant la construction. IF NOT EXISTS : les
+tables créées par create_all au démarrage ont déjà ces index.
+
+Revision ID: 018_index_pack
+Revises: 017_evidence_blobs
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "018_index_pack"
+down_revision = "017_evidence_blobs"
+branch_labels = None
+depends_on = None
+
+_INDEXES = [
+    ("ix_claims_audit_id", "claims", ["audit_id"]),
+    ("ix_claim_results_claim_id", "claim_results", ["claim_id"]),
+    ("ix_evidence_files_claim_id", "evidence_files", ["claim_id"]),
+    ("ix_audits_organization_id_created_at", "audits", ["organization_id", "created_at"]),
+    ("ix_audits_created_by_user_id", "audits", ["created_by_user_id"]),
+    ("ix_monitoring_configs_is_active_next_check_at", "monitoring_configs", ["is_active", "next_check_at"]),
+    ("ix_monitoring_alerts_monitoring_config_id_is_read", "monitoring_alerts", ["monitoring_config_id", "is_read"]),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in _INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(_INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,43 @@
+"""019_alert_keyset_index
+
+Index monitoring_alerts (monitoring_config_id, detected_at) : pagination par
+curseur des alertes d'une config (GET /api/audits/{id}/monitoring/alerts) et
+page des alertes récentes embarquée dans la config, sans tri de toutes les
+alertes accumulées.
+
+Créé CONCURRENTLY sur PostgreSQL, comme 018_index_pack.
+
+Revision ID: 019_alert_keyset_index
+Revises: 018_index_pack
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "019_alert_keyset_index"
+down_revision = "018_index_pack"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_monitoring_alerts_monitoring_config_id_detected_at",
+            "monitoring_alerts",
+            ["monitoring_config_id", "detected_at"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_monitoring_alerts_monitoring_config_id_detected_at",
+            table_name="monitoring_alerts",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
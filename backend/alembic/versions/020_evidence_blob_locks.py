@@ -0,0 +1,36 @@
+"""020_evidence_blob_locks
+
+Table evidence_blobs : une ligne par sha256 du blob store, verrouillée par
+l'envoi d'une pièce (de l'écriture du blob au commit de la ligne
+evidence_files) et par release_blob (du comptage des références à la
+suppression du blob). Sans elle, une suppression pouvait effacer un blob
+qu'un envoi concurrent du même fichier venait de juger déjà présent.
+
+Les lignes sont créées à la demande : aucune reprise des blobs existants.
+
+Revision ID: 020_evidence_blob_locks
+Revises: 019_alert_keyset_index
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "020_evidence_blob_locks"
+down_revision = "019_alert_keyset_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "evidence_blobs",
+        sa.Column("sha256", sa.String(64), primary_key=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("evidence_blobs")
@@ -55,6 +55,62 @@ class Settings(BaseSettings):
     # Brevo API (email transactionnel)
     BREVO_API_KEY: Optional[str] = None
 
+    # Jobs asynchrones (scan, analyse)
+    # inprocess : pool de workers dans le process web
+    # external  : workers séparés (python -m app.worker), le web ne fait qu'enfiler
+    # eager     : exécution immédiate dans la requête (dev mono-process, tests)
+    JOBS_MODE: str = "inprocess"
+    JOBS_CONCURRENCY: int = 2
+    JOBS_LEASE_SECONDS: int = 120
+    JOBS_POLL_SECONDS: float = 2.0
+    JOBS_MAX_ATTEMPTS: int = 3
+    JOBS_DEADLINE_SECONDS: int = 300       # budget d'un job, propagé au scraping / LLM
+    JOBS_CANCEL_POLL_SECONDS: float = 2.0  # détection d'une annulation par le worker
+    # Partage équitable : au-delà de cette profondeur de file, les jobs d'une
+    # organisation passent en "batch" ; les batch n'occupent jamais plus de
+    # JOBS_MAX_RUNNING_BATCH workers (le reste reste libre pour l'interactif)
+    JOBS_INTERACTIVE_QUEUE_DEPTH: int = 3
+    JOBS_MAX_RUNNING_BATCH: int = 1
+
+    # Scheduler de monitoring (tick horaire)
+    MONITORING_CONCURRENCY: int = 8             # checks simultanés, tous domaines confondus
+    MONITORING_DOMAIN_CONCURRENCY: int = 1      # checks simultanés sur un même domaine
+    MONITORING_CHECK_TIMEOUT_SECONDS: int = 300
+    MONITORING_RUN_DEADLINE_SECONDS: int = 3300  # < intervalle du tick : pas de chevauchement
+    MONITORING_LEASE_SECONDS: int = 120         # bail d'une config, prolongé par heartbeat
+    MONITORING_SLOT_CAPACITY: int = 200         # checks visés par créneau horaire (lissage)
+
+    # Scraping couvert (hedged) : si Firecrawl n'a pas répondu après le délai,
+    # la même page est demandée à Jina et la première réponse exploitable gagne.
+    # Délai = p90 des latences Firecrawl récentes (borné), ce réglage tant que
+    # les mesures sont insuffisantes.
+    SCRAPE_HEDGING: bool = True
+    SCRAPE_HEDGE_DELAY_SECONDS: float = 4.0
+
+    # Profil par domaine : seuls les chemins RSE productifs (et inconnus) sont
+    # scrapés ; les chemins improductifs sont re-sondés après ce délai, quelques-uns par scan
+    SCRAPE_PROFILE_REPROBE_DAYS: int = 14
+
+    # Lecture en flux des pages et sitemaps : octets lus au plus par réponse
+    SCRAPE_PAGE_MAX_BYTES: int = 512_000
+    SCRAPE_SITEMAP_MAX_BYTES: int = 5_000_000
+
+    # Pièces justificatives (blob store adressé par sha256)
+    # local : EVIDENCE_STORE_PATH ; s3 : bucket S3 ou compatible (MinIO…)
+    EVIDENCE_STORE: str = "local"
+    EVIDENCE_STORE_PATH: str = "data/evidence"
+    EVIDENCE_S3_BUCKET: Optional[str] = None
+    EVIDENCE_S3_PREFIX: str = "evidence/"
+    EVIDENCE_S3_ENDPOINT_URL: Optional[str] = None
+    EVIDENCE_S3_REGION: Optional[str] = None
+    EVIDENCE_S3_ACCESS_KEY: Optional[str] = None
+    EVIDENCE_S3_SECRET_KEY: Optional[str] = None
+
+    # Instrumentation SQL (services/db_stats.py)
+    DB_STATS_HEADERS: bool = False        # en-têtes X-DB-* sur les réponses (debug)
+    DB_SLOW_QUERY_MS: int = 200           # seuil du log des requêtes lentes
+    DB_N_PLUS_ONE_THRESHOLD: int = 10     # même requête répétée N fois dans une requête HTTP
+
     @field_validator("SECRET_KEY")
     @classmethod
     def secret_key_must_be_strong(cls, v: str) -> str:
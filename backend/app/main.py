@@ -12,11 +12,14 @@ from slowapi.errors import RateLimitExceeded
 
 from app.config import settings
 from app.limiter import limiter
+from app.utils.body_limit import BodySizeLimitMiddleware
+from app.utils.db_stats_middleware import DbStatsMiddleware
 from app.utils.security_headers import SecurityHeadersMiddleware
 from app.database import engine, Base
+from app.services import db_stats
 from app.models import client_access as _  # noqa: F401 — register ClientAccess with SQLAlchemy
 from app.routers import auth, audits, claims, reports
-from app.routers import monitoring, contact, organizations, admin, evidence, payment, members, share
+from app.routers import monitoring, contact, organizations, admin, evidence, payment, members, share, usage, jobs
 
 logger = logging.getLogger(__name__)
 
@@ -90,7 +93,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     # Démarrer le scheduler APScheduler
     from apscheduler.schedulers.asyncio import AsyncIOScheduler
-    from app.services.monitoring_service import run_due_monitoring_checks
+    from app.services.monitoring_scheduler import run_due_monitoring_checks
 
     scheduler = AsyncIOScheduler()
     scheduler.add_job(
@@ -103,8 +106,15 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     scheduler.start()
     logger.info("Scheduler de monitoring démarré (interval: 1h)")
 
+    # Workers de jobs (scan, analyse) — en mode external, lancés par `python -m app.worker`
+    from app.services.jobs import start_worker_pool, stop_worker_pool
+
+    if settings.JOBS_MODE == "inprocess":
+        await start_worker_pool()
+
     yield
 
+    await stop_worker_pool()
     scheduler.shutdown(wait=False)
     await engine.dispose()
 
@@ -122,8 +132,17 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 cors_origins = [s.strip() for s in settings.CORS_ORIGINS.split(",") if s.strip()]
 
 # IMPORTANT : les middlewares sont appliqués dans l'ordre inverse d'ajout.
-# SecurityHeaders doit être en dernier (ajouté en premier) pour couvrir toutes les réponses,
-# y compris celles générées par CORSMiddleware.
+# Limite de taille des envois de pièces : au plus près de l'application, pour que
+# son 413 reçoive les en-têtes CORS et de sécurité.
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    path_pattern=evidence.UPLOAD_PATH_PATTERN,
+    max_size=evidence.MAX_UPLOAD_BODY_SIZE,
+    detail=evidence.UPLOAD_TOO_LARGE_DETAIL,
+)
+
+# SecurityHeaders doit être en dernier parmi les autres (ajouté juste après) pour couvrir
+# toutes les réponses, y compris celles générées par CORSMiddleware.
 app.add_middleware(SecurityHeadersMiddleware)
 
 app.add_middleware(
@@ -133,8 +152,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # En-têtes de pagination lisibles par le front (cf. app/utils/pagination.py)
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
+# Requêtes SQL par requête HTTP (compteurs, requêtes lentes, N+1) — cf. services/db_stats.py
+db_stats.install()
+app.add_middleware(DbStatsMiddleware)
+
 
 app.include_router(auth.router)
 app.include_router(organizations.router)
@@ -148,6 +173,8 @@ app.include_router(contact.router)
 app.include_router(payment.router)
 app.include_router(members.router)
 app.include_router(share.router)
+app.include_router(usage.router)
+app.include_router(jobs.router)
 
 
 @app.get("/health")
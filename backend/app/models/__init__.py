@@ -3,8 +3,13 @@ from app.models.user import User
 from app.models.audit import Audit
 from app.models.claim import Claim
 from app.models.claim_result import ClaimResult
-from app.models.evidence import EvidenceFile
+from app.models.evidence import EvidenceBlob, EvidenceFile
 from app.models.monitoring_config import MonitoringConfig
 from app.models.monitoring_alert import MonitoringAlert
+from app.models.rewrite_suggestion import RewriteSuggestion
+from app.models.usage_record import UsageRecord
+from app.models.job import Job
+from app.models.monitoring_run import MonitoringRun
+from app.models.scrape_profile import ScrapeProfile
 
-__all__ = ["Organization", "User", "Audit", "Claim", "ClaimResult", "EvidenceFile", "MonitoringConfig", "MonitoringAlert"]
+__all__ = ["Organization", "User", "Audit", "Claim", "ClaimResult", "EvidenceFile", "EvidenceBlob", "MonitoringConfig", "MonitoringAlert", "RewriteSuggestion", "UsageRecord", "Job", "MonitoringRun", "ScrapeProfile"]
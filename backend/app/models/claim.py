@@ -26,7 +26,7 @@ class Claim(Base):
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     audit_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("audits.id", ondelete="CASCADE"), nullable=False
+        UUID(as_uuid=True), ForeignKey("audits.id", ondelete="CASCADE"), nullable=False, index=True
     )
 
     claim_text: Mapped[str] = mapped_column(Text, nullable=False)
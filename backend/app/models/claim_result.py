@@ -24,7 +24,7 @@ class ClaimResult(Base):
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     claim_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("claims.id", ondelete="CASCADE"), nullable=False
+        UUID(as_uuid=True), ForeignKey("claims.id", ondelete="CASCADE"), nullable=False, index=True
     )
     criterion: Mapped[str] = mapped_column(String(50), nullable=False)
     verdict: Mapped[str] = mapped_column(String(20), nullable=False)
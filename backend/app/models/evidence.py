@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from sqlalchemy import DateTime, ForeignKey, Integer, LargeBinary, String
 from sqlalchemy.dialects.postgresql import UUID
@@ -24,11 +24,17 @@ class EvidenceFile(Base):
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     claim_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("claims.id", ondelete="CASCADE"), nullable=False
+        UUID(as_uuid=True), ForeignKey("claims.id", ondelete="CASCADE"), nullable=False, index=True
     )
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
     content_type: Mapped[str] = mapped_column(String(100), nullable=False)
-    file_data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # Contenu dans le blob store (app.services.blob_store), clé = sha256 du fichier.
+    # file_data : ancien stockage en base, vide une fois la ligne migrée — différé, lu
+    # uniquement par blob_store.read_evidence
+    sha256: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)
+    file_data: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, nullable=True, deferred=True, deferred_raiseload=True
+    )
     file_size: Mapped[int] = mapped_column(Integer, nullable=False)
     # Type de document : "ecolabel" | "certification" | "rapport_interne" | "autre"
     document_type: Mapped[str] = mapped_column(String(50), nullable=False, default="autre")
@@ -37,3 +43,18 @@ class EvidenceFile(Base):
     )
 
     claim: Mapped[Claim] = relationship(back_populates="evidence_files")
+
+
+class EvidenceBlob(Base):
+    """
+    Empreinte d'un blob du blob store : sa ligne sert de verrou (SELECT … FOR
+    UPDATE via l'upsert de blob_store) entre l'envoi d'un fichier identique et
+    la suppression d'un blob qui n'est plus référencé.
+    """
+
+    __tablename__ = "evidence_blobs"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
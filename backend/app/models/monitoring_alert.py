@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -19,6 +19,12 @@ class MonitoringAlert(Base):
     """Alerte de monitoring — nouvelle allégation détectée sur le site."""
 
     __tablename__ = "monitoring_alerts"
+    # Alertes (non lues) d'une config
+    __table_args__ = (
+        Index("ix_monitoring_alerts_monitoring_config_id_is_read", "monitoring_config_id", "is_read"),
+        # Alertes d'une config, des plus récentes aux plus anciennes (pagination)
+        Index("ix_monitoring_alerts_monitoring_config_id_detected_at", "monitoring_config_id", "detected_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Boolean, DateTime, Float, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class MonitoringRun(Base):
+    """Statistiques d'un passage du scheduler de monitoring (un par tick horaire)."""
+
+    __tablename__ = "monitoring_runs"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    due: Mapped[int] = mapped_column(Integer, default=0)           # configs dues au début du run
+    started: Mapped[int] = mapped_column(Integer, default=0)       # checks lancés
+    completed: Mapped[int] = mapped_column(Integer, default=0)
+    failed: Mapped[int] = mapped_column(Integer, default=0)
+    timed_out: Mapped[int] = mapped_column(Integer, default=0)
+    carried_over: Mapped[int] = mapped_column(Integer, default=0)  # reportés au tick suivant
+    alerts_created: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Retard au lancement = début du check - next_check_at (secondes)
+    max_lag_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    avg_lag_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    deadline_hit: Mapped[bool] = mapped_column(Boolean, default=False)
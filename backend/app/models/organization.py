@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING, List, Optional
 
 from sqlalchemy import Boolean, DateTime, Integer, LargeBinary, String
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, column_property, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from app.database import Base
@@ -32,8 +32,13 @@ class Organization(Base):
     # Branding white-label
     brand_primary_color: Mapped[str] = mapped_column(String(7), default="#1B5E20")
     brand_secondary_color: Mapped[str] = mapped_column(String(7), default="#2E7D32")
-    logo_data: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    # Différé : jamais chargé avec l'organisation (lecture explicite par le endpoint logo
+    # ou undefer() pour le PDF) ; has_logo est calculé en SQL sans rapatrier les octets
+    logo_data: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, nullable=True, deferred=True, deferred_raiseload=True
+    )
     logo_content_type: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    has_logo: Mapped[bool] = column_property(logo_data.is_not(None))
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
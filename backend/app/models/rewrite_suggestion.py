@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import JSON, DateTime, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class RewriteSuggestion(Base):
+    """Suggestions de réécriture mises en cache (partagées entre claims et audits).
+
+    cache_key = sha256(version du prompt, texte normalisé, secteur, hash des raisons)
+    — voir rewrite_engine.rewrite_cache_key().
+    """
+
+    __tablename__ = "rewrite_suggestions"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    cache_key: Mapped[str] = mapped_column(String(64), unique=True, index=True, nullable=False)
+    prompt_version: Mapped[str] = mapped_column(String(20), nullable=False)
+    sector: Mapped[str] = mapped_column(String(100), nullable=False)
+    claim_text: Mapped[str] = mapped_column(Text, nullable=False)
+    suggestions: Mapped[List[str]] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
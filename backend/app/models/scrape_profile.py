@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy import JSON, DateTime, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class ScrapeProfile(Base):
+    """Profil de scraping d'un site : résultat de la dernière sonde de chaque chemin RSE.
+
+    domain : domaine et chemin de base de l'URL scannée (scrape_profiles.profile_key),
+    les chemins étant relatifs à cette URL
+
+    paths : {chemin: {"outcome", "size", "backend", "redirect_to", "checked_at"}}
+    outcome : content | not_found | consent | empty | error
+    Partagé entre organisations (un site, quel que soit l'auditeur).
+    """
+
+    __tablename__ = "scrape_profiles"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    # Non unique : deux premiers scans simultanés d'un domaine peuvent créer deux
+    # lignes ; la plus récente fait foi (cache, pas de donnée de référence)
+    domain: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    paths: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
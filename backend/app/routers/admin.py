@@ -1,19 +1,28 @@
 from __future__ import annotations
 
+from collections import defaultdict
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, EmailStr
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from app.auth.dependencies import get_current_user, get_superadmin_user
 from app.auth.jwt import hash_password
+from app.config import settings
 from app.database import get_db
 from app.models.audit import Audit
+from app.models.monitoring_run import MonitoringRun
 from app.models.organization import Organization
 from app.models.user import User
+from app.services.db_stats import db_stats
+from app.services.jobs import queue_depths
+from app.services.monitoring_planner import projected_load
+from app.services.monitoring_service import hedge_delay
+from app.services.scrape_stats import scrape_stats
+from app.services.usage import get_usage_by_organization, month_bounds, plan_budget
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -42,24 +51,31 @@ async def get_overview(
     _: User = Depends(get_superadmin_user),
     db: AsyncSession = Depends(get_db),
 ) -> list:
-    """Retourne toutes les organisations avec leurs membres et stats."""
+    """
+    Retourne toutes les organisations avec leurs membres et stats.
+    Nombre de requêtes constant : membres actifs et nombre d'audits sont chargés
+    pour toutes les organisations à la fois (COUNT … GROUP BY), pas par organisation.
+    """
     orgs_result = await db.execute(select(Organization).order_by(Organization.created_at.desc()))
     orgs = list(orgs_result.scalars().all())
 
+    members_result = await db.execute(
+        select(User).where(User.organization_id.is_not(None), User.is_active == True)
+    )
+    members_by_org: Dict[UUID, List[User]] = defaultdict(list)
+    for u in members_result.scalars().all():
+        members_by_org[u.organization_id].append(u)
+
+    counts_result = await db.execute(
+        select(Audit.organization_id, func.count()).group_by(Audit.organization_id)
+    )
+    audits_by_org = dict(counts_result.all())
+
     result = []
     for org in orgs:
-        members_result = await db.execute(
-            select(User).where(User.organization_id == org.id, User.is_active == True)
-        )
-        members = list(members_result.scalars().all())
-
+        members = members_by_org.get(org.id, [])
         admin = next((u for u in members if u.role == "admin"), members[0] if members else None)
 
-        audits_result = await db.execute(
-            select(Audit).where(Audit.organization_id == org.id)
-        )
-        total_audits = len(list(audits_result.scalars().all()))
-
         result.append({
             "org_id": str(org.id),
             "org_name": org.name,
@@ -68,7 +84,7 @@ async def get_overview(
             "subscription_status": org.subscription_status,
             "audits_this_month": org.audits_this_month,
             "audits_limit": org.audits_limit,
-            "total_audits": total_audits,
+            "total_audits": audits_by_org.get(org.id, 0),
             "created_at": org.created_at.strftime("%d/%m/%Y") if org.created_at else "",
             "members": [
                 {
@@ -111,6 +127,124 @@ async def get_overview(
     return result
 
 
+@router.get("/usage")
+async def get_usage_overview(
+    month: Optional[str] = None,
+    _: User = Depends(get_superadmin_user),
+    db: AsyncSession = Depends(get_db),
+) -> list:
+    """Consommation LLM / scraping du mois par organisation, triée par tokens consommés."""
+    try:
+        since, until = month_bounds(month)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Format de mois invalide (attendu : YYYY-MM)")
+
+    usage_by_org = await get_usage_by_organization(db, since, until)
+    if not usage_by_org:
+        return []
+
+    orgs_result = await db.execute(
+        select(Organization).where(Organization.id.in_(list(usage_by_org)))
+    )
+    orgs = {org.id: org for org in orgs_result.scalars().all()}
+
+    result = []
+    for org_id, totals in usage_by_org.items():
+        org = orgs.get(org_id)
+        plan = org.subscription_plan if org else "starter"
+        result.append({
+            "org_id": str(org_id),
+            "org_name": org.name if org else "",
+            "plan": plan,
+            "month": since.strftime("%Y-%m"),
+            "budget": plan_budget(plan),
+            **totals,
+        })
+    result.sort(key=lambda r: r["llm_tokens"], reverse=True)
+    return result
+
+
+@router.get("/monitoring/runs")
+async def list_monitoring_runs(
+    limit: int = 48,
+    _: User = Depends(get_superadmin_user),
+    db: AsyncSession = Depends(get_db),
+) -> list:
+    """Derniers passages du scheduler de monitoring (débit, erreurs, retard)."""
+    result = await db.execute(
+        select(MonitoringRun)
+        .order_by(MonitoringRun.started_at.desc())
+        .limit(max(1, min(limit, 500)))
+    )
+    return [
+        {
+            "id": str(run.id),
+            "started_at": run.started_at.isoformat() if run.started_at else None,
+            "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+            "due": run.due,
+            "started": run.started,
+            "completed": run.completed,
+            "failed": run.failed,
+            "timed_out": run.timed_out,
+            "carried_over": run.carried_over,
+            "alerts_created": run.alerts_created,
+            "max_lag_seconds": run.max_lag_seconds,
+            "avg_lag_seconds": run.avg_lag_seconds,
+            "deadline_hit": run.deadline_hit,
+        }
+        for run in result.scalars().all()
+    ]
+
+
+@router.get("/jobs/queues")
+async def list_job_queues(
+    _: User = Depends(get_superadmin_user),
+    db: AsyncSession = Depends(get_db),
+) -> list:
+    """Profondeur des files de jobs par organisation (partage équitable des workers)."""
+    return [
+        {
+            **queue,
+            "organization_id": str(queue["organization_id"]),
+        }
+        for queue in await queue_depths(db)
+    ]
+
+
+@router.get("/monitoring/load")
+async def monitoring_load(
+    hours: int = 168,
+    _: User = Depends(get_superadmin_user),
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """Charge de monitoring prévue par créneau horaire (pic, moyenne, capacité)."""
+    return await projected_load(db, hours=max(1, min(hours, 24 * 31)))
+
+
+@router.get("/scraping/stats")
+async def scraping_stats(
+    _: User = Depends(get_superadmin_user),
+) -> dict:
+    """Latences (p50/p90/p99) et taux de victoire des backends de scraping — process courant."""
+    return {
+        "hedging": settings.SCRAPE_HEDGING,
+        "hedge_delay_seconds": round(hedge_delay(), 3),
+        "backends": scrape_stats.snapshot(),
+    }
+
+
+@router.get("/db/stats")
+async def database_stats(
+    _: User = Depends(get_superadmin_user),
+) -> dict:
+    """Requêtes SQL par requête HTTP, par route (p50/p90, temps en base, N+1) — process courant."""
+    return {
+        "slow_query_ms": settings.DB_SLOW_QUERY_MS,
+        "n_plus_one_threshold": settings.DB_N_PLUS_ONE_THRESHOLD,
+        "routes": db_stats.snapshot(),
+    }
+
+
 @router.patch("/orgs/{org_id}/plan")
 async def set_org_plan(
     org_id: UUID,
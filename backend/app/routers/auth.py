@@ -213,7 +213,7 @@ async def _user_to_response(user: User, db: AsyncSession) -> dict:
             org_info = OrgInfo(
                 id=org.id,
                 name=org.name,
-                has_logo=org.logo_data is not None,
+                has_logo=org.has_logo,
                 brand_primary_color=org.brand_primary_color,
                 brand_secondary_color=org.brand_secondary_color,
                 subscription_plan=org.subscription_plan,
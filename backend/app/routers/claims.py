@@ -6,7 +6,7 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -21,7 +21,10 @@ from app.schemas.claim import ClaimCreate, ClaimResponse, ClaimUpdate
 from app.services.analysis_engine import analyze_claim, RULES_VERSION
 from app.services.regulatory_classifier import classify_claim_regime
 from app.services.scoring import calculate_global_score, compute_verdict_counts
-from app.services.rewrite_engine import suggest_rewrite
+from app.config import settings
+from app.services.rewrite_engine import get_rewrites, non_conforming_reasons
+from app.services.usage import metered
+from app.utils.pagination import PageParams, keyset, page_items
 
 router = APIRouter(tags=["claims"])
 
@@ -145,19 +148,27 @@ async def create_claim(
 )
 async def list_claims(
     audit_id: UUID,
+    response: Response,
+    page: PageParams = Depends(),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> List[Claim]:
-    """Lister les claims d'un audit."""
+    """
+    Lister les claims d'un audit, paginées par curseur (created_at, id) dans
+    l'ordre de création ; les résultats ne sont chargés que pour la page.
+    """
     await _get_user_audit(audit_id, user, db)
 
-    result = await db.execute(
-        select(Claim)
-        .where(Claim.audit_id == audit_id)
-        .options(selectinload(Claim.results))
-        .order_by(Claim.created_at)
-    )
-    return list(result.scalars().all())
+    in_audit = Claim.audit_id == audit_id
+    claims = (await db.execute(keyset(
+        select(Claim).where(in_audit).options(selectinload(Claim.results)),
+        Claim.created_at, Claim.id, page, descending=False,
+    ))).scalars().all()
+
+    total = None
+    if page.include_total:
+        total = await db.scalar(select(func.count()).select_from(Claim).where(in_audit))
+    return page_items(claims, page, response, total=total)
 
 
 # --- Routes sous /api/claims/{claim_id} ---
@@ -272,6 +283,23 @@ class RewriteResponse(BaseModel):
     suggestions: List[str]
 
 
+class ClaimRewriteResponse(BaseModel):
+    claim_id: UUID
+    original: str
+    suggestions: List[str]
+
+
+class AuditRewritesResponse(BaseModel):
+    audit_id: UUID
+    rewrites: List[ClaimRewriteResponse]
+
+
+def _unavailable_rewrite() -> List[str]:
+    if not settings.ANTHROPIC_API_KEY:
+        return ["Clé API Claude non configurée."]
+    return ["Réécriture indisponible pour le moment, réessayez dans quelques instants."]
+
+
 @router.post("/api/claims/{claim_id}/rewrite", response_model=RewriteResponse)
 async def rewrite_claim(
     claim_id: UUID,
@@ -293,17 +321,61 @@ async def rewrite_claim(
     )
     audit = audit_result.scalar_one()
 
-    # Collecter les raisons de non-conformité
-    reasons = [
-        r.explanation
-        for r in claim.results
-        if r.verdict in ("non_conforme", "risque")
-    ]
+    claim_text = claim.claim_text
+    async with metered(db, audit.organization_id, "rewrite", audit_id=audit.id):
+        [suggestions] = await get_rewrites(
+            db,
+            [{"claim_text": claim_text, "reasons": non_conforming_reasons(claim)}],
+            audit.sector,
+        )
+    # Les entrées de cache créées par get_rewrites : metered ne commite
+    # que si l'usage est facturé à une organisation
+    await db.commit()
 
-    suggestion = await suggest_rewrite(
-        claim_text=claim.claim_text,
-        sector=audit.sector,
-        non_conforming_reasons=reasons,
+    return {"original": claim_text, "suggestions": suggestions or _unavailable_rewrite()}
+
+
+@router.post("/api/audits/{audit_id}/rewrites", response_model=AuditRewritesResponse)
+async def rewrite_audit_claims(
+    audit_id: UUID,
+    user: User = Depends(require_pro),
+    db: AsyncSession = Depends(get_db),
+) -> AuditRewritesResponse:
+    """
+    Réécritures de toutes les allégations non conformes ou à risque de l'audit
+    (hors faux positifs) — cache partagé + appels Claude groupés par lots.
+    """
+    audit = await _get_user_audit(audit_id, user, db)
+    sector = audit.sector
+
+    result = await db.execute(
+        select(Claim)
+        .where(
+            Claim.audit_id == audit_id,
+            Claim.overall_verdict.in_(("non_conforme", "risque")),
+            Claim.is_false_positive == False,  # noqa: E712
+        )
+        .options(selectinload(Claim.results))
+        .order_by(Claim.created_at)
     )
+    claims = list(result.scalars().all())
+    items = [
+        {"claim_id": c.id, "claim_text": c.claim_text, "reasons": non_conforming_reasons(c)}
+        for c in claims
+    ]
 
-    return {"original": claim.claim_text, "suggestions": suggestion}
+    async with metered(db, audit.organization_id, "rewrite", audit_id=audit_id):
+        all_suggestions = await get_rewrites(db, items, sector)
+    await db.commit()
+
+    return AuditRewritesResponse(
+        audit_id=audit_id,
+        rewrites=[
+            ClaimRewriteResponse(
+                claim_id=it["claim_id"],
+                original=it["claim_text"],
+                suggestions=suggestions or _unavailable_rewrite(),
+            )
+            for it, suggestions in zip(items, all_suggestions)
+        ],
+    )
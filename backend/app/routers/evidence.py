@@ -1,12 +1,10 @@
 from __future__ import annotations
 
-import hashlib
-import io
-import zipfile
 from datetime import datetime, timezone
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -19,11 +17,19 @@ from app.models.claim_result import ClaimResult
 from app.models.evidence import EvidenceFile
 from app.models.organization import Organization
 from app.models.user import User
+from app.services.blob_store import BlobTooLarge, put_blob_stream, read_evidence, release_blob
+from app.services.evidence_export import collect_entries, zip_response
 from app.services.scoring import calculate_global_score, compute_verdict_counts
 
 router = APIRouter(tags=["evidence"])
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 Mo
+# Corps multipart complet (fichier + enveloppe et champs de formulaire),
+# plafonné par BodySizeLimitMiddleware avant la réception par FastAPI
+MAX_UPLOAD_BODY_SIZE = MAX_FILE_SIZE + 64 * 1024
+UPLOAD_PATH_PATTERN = r"/api/claims/[^/]+/evidence"
+UPLOAD_TOO_LARGE_DETAIL = "Fichier trop volumineux. Maximum : 10 Mo."
+_UPLOAD_CHUNK_SIZE = 64 * 1024
 
 # Priorité des types de document pour la règle 6
 _VAULT_STRONG = {"ecolabel", "certification"}   # → conforme
@@ -36,14 +42,11 @@ async def _refresh_justification_from_vault(claim_id: UUID, db: AsyncSession) ->
     Met à jour ClaimResult, overall_verdict de la claim et score global de l'audit.
     Appelé après chaque upload ou suppression de preuve.
     """
-    # Charger la claim avec résultats et fichiers vault
+    # Charger la claim avec ses résultats (les pièces du vault : types seulement)
     result = await db.execute(
         select(Claim)
         .where(Claim.id == claim_id)
-        .options(
-            selectinload(Claim.evidence_files),
-            selectinload(Claim.results),
-        )
+        .options(selectinload(Claim.results))
     )
     claim = result.scalar_one_or_none()
     if not claim:
@@ -54,8 +57,9 @@ async def _refresh_justification_from_vault(claim_id: UUID, db: AsyncSession) ->
     if not just_result:
         return
 
-    evidence_files = claim.evidence_files
-    doc_types = {ef.document_type for ef in evidence_files}
+    doc_types = set((await db.execute(
+        select(EvidenceFile.document_type).where(EvidenceFile.claim_id == claim_id).distinct()
+    )).scalars().all())
 
     if doc_types & _VAULT_STRONG:
         just_result.verdict = "conforme"
@@ -89,15 +93,17 @@ async def _refresh_justification_from_vault(claim_id: UUID, db: AsyncSession) ->
     rq = sum(1 for v in verdicts if v == "risque")
     claim.overall_verdict = "non_conforme" if nc > 0 else ("risque" if rq >= 2 else "conforme")
 
-    # Recompute score global de l'audit
-    audit_result = await db.execute(
-        select(Audit)
-        .where(Audit.id == claim.audit_id)
-        .options(selectinload(Audit.claims))
-    )
-    audit = audit_result.scalar_one_or_none()
+    # Recompute score global de l'audit — verdicts des claims seuls (autoflush :
+    # le verdict de cette claim est déjà à jour), sans recharger les claims
+    audit = await db.get(Audit, claim.audit_id)
     if audit:
-        all_verdicts = [c.overall_verdict for c in audit.claims if c.overall_verdict and not c.is_false_positive]
+        all_verdicts = (await db.execute(
+            select(Claim.overall_verdict).where(
+                Claim.audit_id == audit.id,
+                Claim.overall_verdict.is_not(None),
+                Claim.is_false_positive.is_not(True),
+            )
+        )).scalars().all()
         counts = compute_verdict_counts(all_verdicts)
         score, risk_level = calculate_global_score(
             conforming=counts["conforme"],
@@ -127,7 +133,6 @@ async def _get_user_claim(claim_id: UUID, user: User, db: AsyncSession) -> Claim
         select(Claim)
         .join(Audit)
         .where(Claim.id == claim_id, Audit.organization_id == user.organization_id)
-        .options(selectinload(Claim.evidence_files))
     )
     claim = result.scalar_one_or_none()
     if not claim:
@@ -135,6 +140,27 @@ async def _get_user_claim(claim_id: UUID, user: User, db: AsyncSession) -> Claim
     return claim
 
 
+# Signatures (premiers octets) par type MIME accepté
+_MAGIC_BYTES = {
+    "application/pdf": b"%PDF",
+    "image/jpeg": b"\xff\xd8\xff",
+    "image/png": b"\x89PNG\r\n\x1a\n",
+    "image/webp": b"RIFF",
+    "application/msword": b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",  # OLE2
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": b"PK\x03\x04",  # ZIP
+}
+
+
+def _verify_evidence_magic(head: bytes, content_type: str) -> bool:
+    """Vérifie que le début du fichier correspond au type MIME déclaré."""
+    magic = _MAGIC_BYTES.get(content_type)
+    if magic is None or not head.startswith(magic):
+        return False
+    if content_type == "image/webp":
+        return head[8:12] == b"WEBP"
+    return True
+
+
 ALLOWED_DOCUMENT_TYPES = {"ecolabel", "certification", "rapport_interne", "autre"}
 
 
@@ -151,6 +177,10 @@ async def upload_evidence(
     document_type : "ecolabel" | "certification" | "rapport_interne" | "autre"
     - "ecolabel" : EU Ecolabel, Ange Bleu, ISO 14024 Type I... débloque le verdict conforme
       sur les allégations génériques (Art. 2(s) EmpCo)
+
+    Taille : le corps de la requête est coupé à MAX_UPLOAD_BODY_SIZE pendant la
+    réception (BodySizeLimitMiddleware, 413) ; la taille exacte du fichier est
+    ensuite vérifiée pendant la copie vers le blob store.
     """
     claim = await _get_user_claim(claim_id, user, db)
 
@@ -163,16 +193,34 @@ async def upload_evidence(
     if document_type not in ALLOWED_DOCUMENT_TYPES:
         document_type = "autre"
 
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=413, detail="Fichier trop volumineux. Maximum : 10 Mo.")
-
+    too_large = HTTPException(status_code=413, detail=UPLOAD_TOO_LARGE_DETAIL)
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        raise too_large
+
+    head = await file.read(_UPLOAD_CHUNK_SIZE)
+    if not _verify_evidence_magic(head, file.content_type):
+        raise HTTPException(status_code=400, detail="Le contenu du fichier ne correspond pas au format déclaré.")
+
+    async def _chunks():
+        chunk = head
+        while chunk:
+            yield chunk
+            chunk = await file.read(_UPLOAD_CHUNK_SIZE)
+
+    # Contenu envoyé par morceaux au blob store (dédupliqué par sha256, calculé à
+    # la volée avec la taille), métadonnées et empreinte en base. Le fichier est
+    # déjà reçu à ce stade : la limite ne s'applique ici qu'à la copie, la
+    # réception elle-même est coupée par BodySizeLimitMiddleware.
+    try:
+        sha256, size = await put_blob_stream(db, _chunks(), MAX_FILE_SIZE)
+    except BlobTooLarge:
+        raise too_large
     evidence = EvidenceFile(
         claim_id=claim_id,
         filename=file.filename or "document",
         content_type=file.content_type,
-        file_data=contents,
-        file_size=len(contents),
+        sha256=sha256,
+        file_size=size,
         document_type=document_type,
     )
     db.add(evidence)
@@ -198,8 +246,13 @@ async def list_evidence(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> list:
-    """Liste les pièces justificatives d'une allégation."""
-    claim = await _get_user_claim(claim_id, user, db)
+    """Liste les pièces justificatives d'une allégation (métadonnées seules)."""
+    await _get_user_claim(claim_id, user, db)
+    result = await db.execute(
+        select(EvidenceFile)
+        .where(EvidenceFile.claim_id == claim_id)
+        .order_by(EvidenceFile.uploaded_at)
+    )
 
     return [
         {
@@ -210,7 +263,7 @@ async def list_evidence(
             "document_type": e.document_type,
             "uploaded_at": e.uploaded_at.isoformat(),
         }
-        for e in claim.evidence_files
+        for e in result.scalars().all()
     ]
 
 
@@ -235,7 +288,7 @@ async def download_evidence(
         raise HTTPException(status_code=404, detail="Fichier introuvable")
 
     return Response(
-        content=evidence.file_data,
+        content=await read_evidence(db, evidence),
         media_type=evidence.content_type,
         headers={"Content-Disposition": f'attachment; filename="{evidence.filename}"'},
     )
@@ -262,8 +315,12 @@ async def delete_evidence(
         raise HTTPException(status_code=404, detail="Fichier introuvable")
 
     deleted_claim_id = evidence.claim_id
+    deleted_sha256 = evidence.sha256
     await db.delete(evidence)
     await db.commit()
+    # Blob partagé avec d'autres pièces (même fichier) : conservé
+    await release_blob(db, deleted_sha256)
+    await db.commit()
 
     # Réévaluer règle 6 + score global après suppression de la preuve
     await _refresh_justification_from_vault(deleted_claim_id, db)
@@ -274,8 +331,8 @@ async def download_evidence_zip(
     audit_id: UUID,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-) -> Response:
-    """Télécharger toutes les pièces justificatives de l'audit en un ZIP (dossier DGCCRF)."""
+) -> StreamingResponse:
+    """Télécharger toutes les pièces justificatives de l'audit en un ZIP (dossier DGCCRF), en flux."""
     audit_result = await db.execute(
         select(Audit).where(
             Audit.id == audit_id,
@@ -301,47 +358,8 @@ async def download_evidence_zip(
     org = org_result.scalar_one_or_none()
     cabinet_name = org.name if org else "Cabinet inconnu"
 
-    zip_buffer = io.BytesIO()
-    now = datetime.now(timezone.utc)
-    tracability_lines: list[str] = []
-    total = 0
-
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-        for i, claim in enumerate(claims, 1):
-            for evidence in claim.evidence_files:
-                folder = f"allegation_{i}_{claim.claim_text[:30].replace('/', '_').replace(' ', '_')}"
-                zf.writestr(f"{folder}/{evidence.filename}", evidence.file_data)
-                sha256 = hashlib.sha256(evidence.file_data).hexdigest()
-                tracability_lines.append(
-                    f"  [{evidence.filename}]  SHA-256 : {sha256}"
-                )
-                total += 1
-
-        if total == 0:
-            raise HTTPException(status_code=404, detail="Aucune pièce justificative à télécharger")
-
-        tracability_content = (
-            "DOSSIER DE PREUVES — TRACABILITE\n"
-            "=================================\n\n"
-            f"Entreprise auditee : {audit.company_name}\n"
-            f"Cabinet RSE        : {cabinet_name}\n"
-            f"Date               : {now.strftime('%d/%m/%Y')}\n"
-            f"Heure (UTC)        : {now.strftime('%H:%M:%S')}\n"
-            f"Nombre de fichiers : {total}\n\n"
-            "Empreintes SHA-256 des fichiers :\n"
-            "---------------------------------\n"
-            + "\n".join(tracability_lines)
-            + "\n\n"
-            "Ce fichier atteste de l'integrite des preuves deposees dans GreenAudit\n"
-            "et peut etre presente en cas de controle DGCCRF.\n"
-        )
-        zf.writestr("Tracabilite.txt", tracability_content.encode("utf-8"))
-
-    zip_buffer.seek(0)
-    filename = f"dossier_preuves_{audit.company_name.replace(' ', '_')}.zip"
+    entries = await collect_entries(db, claims)
+    if not entries:
+        raise HTTPException(status_code=404, detail="Aucune pièce justificative à télécharger")
 
-    return Response(
-        content=zip_buffer.read(),
-        media_type="application/zip",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
+    return zip_response(entries, audit, cabinet_name, datetime.now(timezone.utc))
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.dependencies import get_current_user
+from app.database import get_db
+from app.models.job import Job
+from app.models.user import User
+from app.schemas.job import JobResponse, TenantQueueResponse
+from app.services.jobs import cancel_job, queue_depths
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+@router.get("/queue", response_model=List[TenantQueueResponse])
+async def get_queue(
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> List[TenantQueueResponse]:
+    """File de l'organisation : jobs en attente (interactifs / lots), en cours, part du plan."""
+    return [TenantQueueResponse(**t) for t in await queue_depths(db, user.organization_id)]
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: UUID,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> JobResponse:
+    """État d'un job (scan, analyse) : étape, progression, résultat ou erreur."""
+    result = await db.execute(
+        select(Job).where(Job.id == job_id, Job.organization_id == user.organization_id)
+    )
+    job = result.scalar_one_or_none()
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job introuvable",
+        )
+    return JobResponse.model_validate(job)
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel(
+    job_id: UUID,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> JobResponse:
+    """Annuler un job en attente ou en cours — le scraping et les appels LLM en vol sont interrompus."""
+    job = await cancel_job(db, job_id, user.organization_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job introuvable",
+        )
+    return JobResponse.model_validate(job)
@@ -50,13 +50,13 @@ async def list_members(
     )
     members = result.scalars().all()
 
-    # Compter les audits par membre
-    audit_counts = {}
-    for m in members:
-        count_result = await db.execute(
-            select(func.count()).where(Audit.created_by_user_id == m.id)
-        )
-        audit_counts[m.id] = count_result.scalar() or 0
+    # Audits par membre : un seul COUNT groupé (index audits.created_by_user_id)
+    counts_result = await db.execute(
+        select(Audit.created_by_user_id, func.count())
+        .where(Audit.created_by_user_id.in_([m.id for m in members]))
+        .group_by(Audit.created_by_user_id)
+    )
+    audit_counts = dict(counts_result.all())
 
     return [
         {
@@ -1,12 +1,11 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+from typing import List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.auth.dependencies import get_current_user, require_pro
 from app.database import get_db
@@ -19,7 +18,9 @@ from app.schemas.monitoring import (
     MonitoringConfigCreate,
     MonitoringConfigResponse,
 )
+from app.services.monitoring_planner import plan_next_check
 from app.services.monitoring_service import run_monitoring_check
+from app.utils.pagination import DEFAULT_PAGE_SIZE, PageParams, encode_cursor, keyset, page_items
 
 router = APIRouter(tags=["monitoring"])
 
@@ -38,10 +39,34 @@ async def _get_audit_for_user(
     return audit
 
 
-def _build_config_response(
+def _alerts_of(config_id: UUID):
+    return select(MonitoringAlert).where(MonitoringAlert.monitoring_config_id == config_id)
+
+
+async def _build_config_response(
     config: MonitoringConfig,
+    db: AsyncSession,
 ) -> MonitoringConfigResponse:
-    unread_count = sum(1 for a in config.alerts if not a.is_read)
+    """
+    Config + alertes les plus récentes (une page ; alerts_next_cursor pour la suite
+    via GET …/monitoring/alerts). Le nombre de non lues est un COUNT sur l'index
+    (config, is_read).
+    """
+    unread_count = await db.scalar(
+        select(func.count()).select_from(MonitoringAlert).where(
+            MonitoringAlert.monitoring_config_id == config.id,
+            MonitoringAlert.is_read == False,  # noqa: E712
+        )
+    )
+    alerts = (await db.execute(
+        _alerts_of(config.id)
+        .order_by(MonitoringAlert.detected_at.desc(), MonitoringAlert.id.desc())
+        .limit(DEFAULT_PAGE_SIZE + 1)
+    )).scalars().all()
+    next_cursor = None
+    if len(alerts) > DEFAULT_PAGE_SIZE:
+        alerts = alerts[:DEFAULT_PAGE_SIZE]
+        next_cursor = encode_cursor(alerts[-1].detected_at, alerts[-1].id)
     return MonitoringConfigResponse(
         id=config.id,
         audit_id=config.audit_id,
@@ -51,10 +76,24 @@ def _build_config_response(
         next_check_at=config.next_check_at,
         created_at=config.created_at,
         unread_alerts_count=unread_count,
-        alerts=[MonitoringAlertResponse.model_validate(a) for a in config.alerts],
+        alerts=[MonitoringAlertResponse.model_validate(a) for a in alerts],
+        alerts_next_cursor=next_cursor,
     )
 
 
+async def _get_config(audit_id: UUID, db: AsyncSession) -> MonitoringConfig:
+    result = await db.execute(
+        select(MonitoringConfig).where(MonitoringConfig.audit_id == audit_id)
+    )
+    config = result.scalar_one_or_none()
+    if config is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Monitoring non configuré pour cet audit",
+        )
+    return config
+
+
 @router.post(
     "/api/audits/{audit_id}/monitoring",
     response_model=MonitoringConfigResponse,
@@ -81,34 +120,25 @@ async def enable_monitoring(
         )
 
     existing = await db.execute(
-        select(MonitoringConfig)
-        .where(MonitoringConfig.audit_id == audit_id)
-        .options(selectinload(MonitoringConfig.alerts))
+        select(MonitoringConfig).where(MonitoringConfig.audit_id == audit_id)
     )
     config = existing.scalar_one_or_none()
 
     if config:
-        config.is_active = True
-        config.frequency_days = data.frequency_days
+        # Réactivation ou changement de fréquence : l'ancienne échéance est
+        # périmée, on replanifie (lissée) à partir de maintenant
+        if not config.is_active or config.frequency_days != data.frequency_days:
+            config.is_active = True
+            config.frequency_days = data.frequency_days
+            config.next_check_at = await plan_next_check(db, config, audit.organization_id)
     else:
-        now = datetime.now(timezone.utc)
-        config = MonitoringConfig(
-            audit_id=audit_id,
-            frequency_days=data.frequency_days,
-            next_check_at=now + timedelta(days=data.frequency_days),
-        )
+        config = MonitoringConfig(audit_id=audit_id, frequency_days=data.frequency_days)
+        config.next_check_at = await plan_next_check(db, config, audit.organization_id)
         db.add(config)
 
     await db.commit()
     await db.refresh(config)
-
-    result = await db.execute(
-        select(MonitoringConfig)
-        .where(MonitoringConfig.id == config.id)
-        .options(selectinload(MonitoringConfig.alerts))
-    )
-    config = result.scalar_one()
-    return _build_config_response(config)
+    return await _build_config_response(config, db)
 
 
 @router.get(
@@ -123,20 +153,36 @@ async def get_monitoring(
     """Récupérer la config monitoring + alertes d'un audit."""
     await _get_audit_for_user(audit_id, user, db)
 
-    result = await db.execute(
-        select(MonitoringConfig)
-        .where(MonitoringConfig.audit_id == audit_id)
-        .options(selectinload(MonitoringConfig.alerts))
-    )
-    config = result.scalar_one_or_none()
+    config = await _get_config(audit_id, db)
+    return await _build_config_response(config, db)
 
-    if config is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Monitoring non configuré pour cet audit",
-        )
 
-    return _build_config_response(config)
+@router.get(
+    "/api/audits/{audit_id}/monitoring/alerts",
+    response_model=List[MonitoringAlertResponse],
+)
+async def list_monitoring_alerts(
+    audit_id: UUID,
+    response: Response,
+    page: PageParams = Depends(),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> List[MonitoringAlert]:
+    """Alertes d'un audit, de la plus récente à la plus ancienne, paginées par curseur."""
+    await _get_audit_for_user(audit_id, user, db)
+    config = await _get_config(audit_id, db)
+
+    alerts = (await db.execute(keyset(
+        _alerts_of(config.id), MonitoringAlert.detected_at, MonitoringAlert.id, page,
+    ))).scalars().all()
+
+    total = None
+    if page.include_total:
+        total = await db.scalar(
+            select(func.count()).select_from(MonitoringAlert)
+            .where(MonitoringAlert.monitoring_config_id == config.id)
+        )
+    return page_items(alerts, page, response, sort_key="detected_at", total=total)
 
 
 @router.delete(
@@ -151,18 +197,7 @@ async def disable_monitoring(
 ):
     """Désactiver le monitoring pour un audit."""
     await _get_audit_for_user(audit_id, user, db)
-
-    result = await db.execute(
-        select(MonitoringConfig).where(MonitoringConfig.audit_id == audit_id)
-    )
-    config = result.scalar_one_or_none()
-
-    if config is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Monitoring non configuré pour cet audit",
-        )
-
+    config = await _get_config(audit_id, db)
     config.is_active = False
     await db.commit()
 
@@ -124,15 +124,18 @@ async def get_logo(org_id: str, db: AsyncSession = Depends(get_db)) -> Response:
     except ValueError:
         raise HTTPException(status_code=400, detail="ID invalide")
 
-    result = await db.execute(select(Organization).where(Organization.id == org_uuid))
-    org = result.scalar_one_or_none()
+    result = await db.execute(
+        select(Organization.logo_data, Organization.logo_content_type)
+        .where(Organization.id == org_uuid)
+    )
+    logo = result.one_or_none()
 
-    if not org or not org.logo_data:
+    if not logo or not logo.logo_data:
         raise HTTPException(status_code=404, detail="Aucun logo trouvé")
 
     return Response(
-        content=org.logo_data,
-        media_type=org.logo_content_type or "image/png",
+        content=logo.logo_data,
+        media_type=logo.logo_content_type or "image/png",
     )
 
 
@@ -282,7 +285,7 @@ async def _org_to_response(org: Organization, db: AsyncSession) -> dict:
         contact_phone=org.contact_phone,
         brand_primary_color=org.brand_primary_color,
         brand_secondary_color=org.brand_secondary_color,
-        has_logo=org.logo_data is not None,
+        has_logo=org.has_logo,
         subscription_plan=org.subscription_plan,
         subscription_status=org.subscription_status,
         audits_this_month=org.audits_this_month,
@@ -31,7 +31,9 @@ from app.models.organization import Organization
 from app.models.user import User
 from app.schemas.claim_result import AuditResultsResponse
 from app.services.pdf_generator import generate_audit_pdf
-from app.services.pdf_generator_marque import generate_marque_pdf
+from app.services.pdf_generator_marque import generate_marque_pdf, marque_reformulation_claims
+from app.services.rewrite_engine import get_rewrites, non_conforming_reasons
+from app.services.usage import metered
 
 router = APIRouter(prefix="/api/audits", tags=["reports"])
 
@@ -46,7 +48,8 @@ async def _load_completed_audit(
         .options(
             selectinload(Audit.claims).selectinload(Claim.results),
             selectinload(Audit.claims).selectinload(Claim.evidence_files),
-            selectinload(Audit.organization),
+            # Logo du cabinet : seul endroit où le PDF a besoin des octets
+            selectinload(Audit.organization).undefer(Organization.logo_data),
         )
     )
     audit = result.scalar_one_or_none()
@@ -208,7 +211,21 @@ async def generate_report_marque(
         if str(old_path).startswith(str(Path(settings.PDF_STORAGE_PATH).resolve())) and old_path.is_file():
             old_path.unlink(missing_ok=True)
 
-    filename, sha256 = generate_marque_pdf(audit)
+    # Reformulations page 3 : cache partagé avec les endpoints de réécriture
+    priority_claims = marque_reformulation_claims(audit)
+    async with metered(db, audit.organization_id, "report_marque", audit_id=audit.id):
+        rewrites = await get_rewrites(
+            db,
+            [{"claim_text": c.claim_text, "reasons": non_conforming_reasons(c)} for c in priority_claims],
+            audit.sector,
+        )
+        reformulations_map = {
+            str(c.id): suggestions[0]
+            for c, suggestions in zip(priority_claims, rewrites)
+            if suggestions
+        }
+
+        filename, sha256 = generate_marque_pdf(audit, reformulations_map=reformulations_map)
 
     audit.pdf_marque_url    = filename
     audit.pdf_marque_sha256 = sha256
@@ -1,14 +1,11 @@
 from __future__ import annotations
 
-import hashlib
-import io
-import zipfile
 from datetime import datetime, timezone
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import Response
-from sqlalchemy import select
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -17,6 +14,9 @@ from app.database import get_db
 from app.models.audit import Audit
 from app.models.claim import Claim
 from app.models.client_access import ClientAccess
+from app.models.evidence import EvidenceFile
+from app.models.organization import Organization
+from app.services.evidence_export import collect_entries, zip_response
 
 router = APIRouter(prefix="/api/share", tags=["share"])
 
@@ -29,7 +29,6 @@ async def _get_client_access(token: str, db: AsyncSession) -> tuple[ClientAccess
         .where(ClientAccess.token == token, ClientAccess.is_revoked == False)  # noqa: E712
         .options(
             selectinload(ClientAccess.audit).selectinload(Audit.claims).selectinload(Claim.results),
-            selectinload(ClientAccess.audit).selectinload(Audit.claims).selectinload(Claim.evidence_files),
             selectinload(ClientAccess.audit).selectinload(Audit.organization),
         )
     )
@@ -50,6 +49,14 @@ async def get_shared_audit(token: str, db: AsyncSession = Depends(get_db)) -> di
     ca.last_opened_at = datetime.now(timezone.utc)
     await db.commit()
 
+    # Nombre de pièces par allégation : agrégat SQL, sans charger les pièces
+    evidence_counts = dict((await db.execute(
+        select(EvidenceFile.claim_id, func.count())
+        .join(Claim)
+        .where(Claim.audit_id == audit.id)
+        .group_by(EvidenceFile.claim_id)
+    )).all())
+
     org = audit.organization
     claims_data = []
     for c in audit.claims:
@@ -60,7 +67,7 @@ async def get_shared_audit(token: str, db: AsyncSession = Depends(get_db)) -> di
             "claim_text": c.claim_text,
             "overall_verdict": c.overall_verdict,
             "is_corrected": getattr(c, "is_corrected", False),
-            "evidence_count": len(c.evidence_files),
+            "evidence_count": evidence_counts.get(c.id, 0),
         })
 
     return {
@@ -77,13 +84,13 @@ async def get_shared_audit(token: str, db: AsyncSession = Depends(get_db)) -> di
         "non_conforming_claims": audit.non_conforming_claims,
         "completed_at": audit.completed_at.isoformat() if audit.completed_at else None,
         "has_pdf": bool(audit.pdf_url),
-        "has_evidence": any(len(c.evidence_files) > 0 for c in audit.claims),
+        "has_evidence": bool(evidence_counts),
         "claims": claims_data,
         "branding": {
             "cabinet_name": org.name if org else "GreenAudit",
             "primary_color": (org.brand_primary_color if org else None) or "#1a5c3a",
             "secondary_color": (org.brand_secondary_color if org else None) or "#2E7D32",
-            "has_logo": bool(org and org.logo_data),
+            "has_logo": bool(org and org.has_logo),
         },
     }
 
@@ -91,12 +98,15 @@ async def get_shared_audit(token: str, db: AsyncSession = Depends(get_db)) -> di
 @router.get("/{token}/logo")
 async def get_shared_logo(token: str, db: AsyncSession = Depends(get_db)) -> Response:
     ca, audit = await _get_client_access(token, db)
-    org = audit.organization
-    if not org or not org.logo_data:
+    logo = (await db.execute(
+        select(Organization.logo_data, Organization.logo_content_type)
+        .where(Organization.id == audit.organization_id)
+    )).one_or_none()
+    if not logo or not logo.logo_data:
         raise HTTPException(status_code=404, detail="Aucun logo")
     return Response(
-        content=org.logo_data,
-        media_type=org.logo_content_type or "image/png",
+        content=logo.logo_data,
+        media_type=logo.logo_content_type or "image/png",
         headers={"Cache-Control": "public, max-age=3600"},
     )
 
@@ -129,7 +139,7 @@ async def download_shared_pdf(token: str, db: AsyncSession = Depends(get_db)) ->
 
 
 @router.get("/{token}/zip")
-async def download_shared_zip(token: str, db: AsyncSession = Depends(get_db)) -> Response:
+async def download_shared_zip(token: str, db: AsyncSession = Depends(get_db)) -> StreamingResponse:
     """Téléchargement ZIP client. Met à jour zip_downloaded_at."""
     ca, audit = await _get_client_access(token, db)
     org = audit.organization
@@ -142,49 +152,12 @@ async def download_shared_zip(token: str, db: AsyncSession = Depends(get_db)) ->
     )
     claims = list(claims_result.scalars().all())
 
-    cabinet_name = org.name if org else "GreenAudit"
-    now = datetime.now(timezone.utc)
-    zip_buffer = io.BytesIO()
-    tracability_lines: list[str] = []
-    total = 0
-
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-        for i, claim in enumerate(claims, 1):
-            for evidence in claim.evidence_files:
-                folder = f"allegation_{i}_{claim.claim_text[:30].replace('/', '_').replace(' ', '_')}"
-                zf.writestr(f"{folder}/{evidence.filename}", evidence.file_data)
-                sha256 = hashlib.sha256(evidence.file_data).hexdigest()
-                tracability_lines.append(f"  [{evidence.filename}]  SHA-256 : {sha256}")
-                total += 1
-
-        if total == 0:
-            raise HTTPException(status_code=404, detail="Aucune pièce justificative disponible")
-
-        tracability_content = (
-            "DOSSIER DE PREUVES — TRACABILITE\n"
-            "=================================\n\n"
-            f"Entreprise auditee : {audit.company_name}\n"
-            f"Cabinet RSE        : {cabinet_name}\n"
-            f"Date               : {now.strftime('%d/%m/%Y')}\n"
-            f"Heure (UTC)        : {now.strftime('%H:%M:%S')}\n"
-            f"Nombre de fichiers : {total}\n\n"
-            "Empreintes SHA-256 des fichiers :\n"
-            "---------------------------------\n"
-            + "\n".join(tracability_lines)
-            + "\n\n"
-            "Ce fichier atteste de l'integrite des preuves deposees dans GreenAudit\n"
-            "et peut etre presente en cas de controle DGCCRF.\n"
-        )
-        zf.writestr("Tracabilite.txt", tracability_content.encode("utf-8"))
-
-    zip_buffer.seek(0)
-    filename = f"dossier_preuves_{audit.company_name.replace(' ', '_')}.zip"
+    entries = await collect_entries(db, claims)
+    if not entries:
+        raise HTTPException(status_code=404, detail="Aucune pièce justificative disponible")
 
     ca.zip_downloaded_at = datetime.now(timezone.utc)
     await db.commit()
 
-    return Response(
-        content=zip_buffer.read(),
-        media_type="application/zip",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
+    cabinet_name = org.name if org else "GreenAudit"
+    return zip_response(entries, audit, cabinet_name, datetime.now(timezone.utc))
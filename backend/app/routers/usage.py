@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.dependencies import get_current_user
+from app.database import get_db
+from app.models.organization import Organization
+from app.models.user import User
+from app.services.usage import (
+    get_usage_by_audit,
+    get_usage_by_day,
+    get_usage_totals,
+    month_bounds,
+    plan_budget,
+)
+
+router = APIRouter(prefix="/api/usage", tags=["usage"])
+
+
+class UsageTotals(BaseModel):
+    input_tokens: int
+    output_tokens: int
+    cached_tokens: int
+    llm_calls: int
+    firecrawl_pages: int
+    jina_calls: int
+    llm_tokens: int
+    scrape_pages: int
+
+
+class UsageDay(UsageTotals):
+    day: date
+
+
+class UsageAudit(UsageTotals):
+    audit_id: UUID
+
+
+class UsageDashboardResponse(BaseModel):
+    month: str
+    plan: str
+    budget: Dict[str, Optional[int]]
+    remaining: Dict[str, Optional[int]]
+    totals: UsageTotals
+    by_day: List[UsageDay]
+    by_audit: List[UsageAudit]
+
+
+@router.get("", response_model=UsageDashboardResponse)
+async def get_usage_dashboard(
+    month: Optional[str] = Query(default=None, description="Mois au format YYYY-MM (courant par défaut)"),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> UsageDashboardResponse:
+    """Consommation LLM / scraping de l'organisation sur un mois, par jour et par audit."""
+    if not user.organization_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Vous devez appartenir à une organisation",
+        )
+    try:
+        since, until = month_bounds(month)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Format de mois invalide (attendu : YYYY-MM)",
+        )
+
+    org = await db.get(Organization, user.organization_id)
+    plan = org.subscription_plan if org else "starter"
+    budget = plan_budget(plan)
+
+    totals = await get_usage_totals(db, user.organization_id, since, until)
+    by_day = await get_usage_by_day(db, user.organization_id, since, until)
+    by_audit = await get_usage_by_audit(db, user.organization_id, since, until)
+
+    return UsageDashboardResponse(
+        month=since.strftime("%Y-%m"),
+        plan=plan,
+        budget=budget,
+        remaining={
+            name: None if limit is None else max(limit - totals[name], 0)
+            for name, limit in budget.items()
+        },
+        totals=UsageTotals(**totals),
+        by_day=[UsageDay(**row) for row in by_day],
+        by_audit=[UsageAudit(**row) for row in sorted(by_audit, key=lambda r: -r["llm_tokens"])],
+    )
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class JobResponse(BaseModel):
+    """État d'un job asynchrone — result contient la réponse de l'endpoint synchrone équivalent."""
+
+    id: UUID
+    kind: str
+    status: str  # queued, running, succeeded, failed, cancelled
+    priority: str = "interactive"  # interactive, batch
+    stage: Optional[str] = None
+    progress: int = 0
+    audit_id: Optional[UUID] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None
+    attempts: int = 0
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
+class TenantQueueResponse(BaseModel):
+    """Profondeur de file d'une organisation (partage équitable des workers)."""
+
+    organization_id: UUID
+    plan: Optional[str] = None
+    weight: int
+    max_running: int
+    running: int
+    queued_interactive: int
+    queued_batch: int
+    oldest_queued_seconds: Optional[float] = None
@@ -32,5 +32,7 @@ class MonitoringConfigResponse(BaseModel):
     created_at: datetime
     unread_alerts_count: int = 0
     alerts: List[MonitoringAlertResponse] = []
+    # Curseur de GET /api/audits/{id}/monitoring/alerts pour les alertes suivantes
+    alerts_next_cursor: Optional[str] = None
 
     model_config = {"from_attributes": True}
@@ -0,0 +1,418 @@
+"""
+Pipelines d'audit exécutés en job asynchrone (voir services/jobs.py) :
+  - scan   : scrape du site → extraction des allégations → création de l'audit → analyse
+  - analyze: classification + 8 règles EmpCo sur les claims d'un audit → scoring
+
+Les erreurs métier sont levées en HTTPException : le job échoue avec le même
+status / detail que l'ancien endpoint synchrone (ex: 422 aucune allégation).
+
+Le budget du job (Deadline) est réparti entre les étapes : le scraping en
+consomme au plus _SCRAPE_BUDGET_SHARE, le reste est réservé à l'extraction et
+à l'analyse ; l'échéance est vérifiée avant toute écriture en base.
+"""
+from __future__ import annotations
+
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.audit import Audit
+from app.models.claim import Claim
+from app.models.claim_result import ClaimResult
+from app.models.evidence import EvidenceFile
+from app.schemas.claim_result import AuditResultsResponse, ClaimWithResultsResponse
+from app.services.analysis_engine import RULES_VERSION, analyze_claim
+from app.services.claim_persistence import claim_with_results, insert_claims, replace_results
+from app.services.jobs import JobContext, job_handler
+from app.services.monitoring_service import (
+    _PAGE_MARKER_RE,
+    extract_claims_lexical,
+    extract_claims_with_claude,
+    scrape_website,
+)
+from app.services.quota import reserve_audit
+from app.services.regulatory_classifier import classify_claim_regime
+from app.services.scoring import calculate_global_score, compute_verdict_counts
+from app.services.usage import UsageMeter, metered
+from app.utils.deadline import Deadline
+
+ProgressCallback = Callable[[str, int], Awaitable[None]]
+
+# Part du budget restant accordée au scraping (le reste : extraction + analyse)
+_SCRAPE_BUDGET_SHARE = 0.6
+
+# Espace de noms des id d'audit dérivés d'un job de scan (scan_audit_id)
+_SCAN_AUDIT_NAMESPACE = uuid.UUID("5f0c8e1a-2b7d-4c39-9a61-3e8f1d2b4c70")
+
+
+async def _no_progress(stage: str, percent: int) -> None:
+    return None
+
+
+def audit_results_response(
+    audit: Audit, claims: Optional[List[ClaimWithResultsResponse]] = None
+) -> AuditResultsResponse:
+    """
+    Réponse standard d'un audit analysé : claims fournies (lot en mémoire), ou
+    audit.claims avec leurs results chargés.
+    """
+    return AuditResultsResponse(
+        audit_id=audit.id,
+        company_name=audit.company_name,
+        status=audit.status,
+        website_url=audit.website_url,
+        total_claims=audit.total_claims,
+        conforming_claims=audit.conforming_claims,
+        non_conforming_claims=audit.non_conforming_claims,
+        at_risk_claims=audit.at_risk_claims,
+        global_score=float(audit.global_score) if audit.global_score is not None else None,
+        risk_level=audit.risk_level,
+        rules_version=audit.rules_version,
+        pdf_sha256=audit.pdf_sha256,
+        share_token=audit.share_token,
+        claims=audit.claims if claims is None else claims,
+    )
+
+
+async def analyze_audit_claims(
+    db: AsyncSession,
+    audit_id: UUID,
+    organization_id: UUID,
+    progress: ProgressCallback = _no_progress,
+    deadline: Optional[Deadline] = None,
+) -> AuditResultsResponse:
+    """
+    Lancer l'analyse : applique les 6 règles sur chaque claim,
+    calcule le scoring, met à jour le status de l'audit.
+    """
+    result = await db.execute(
+        select(Audit)
+        .where(Audit.id == audit_id, Audit.organization_id == organization_id)
+        .options(selectinload(Audit.claims))
+    )
+    audit = result.scalar_one_or_none()
+    if audit is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Audit introuvable",
+        )
+
+    if not audit.claims:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="L'audit ne contient aucune claim à analyser",
+        )
+
+    # Claims avec un écolabel dans le vault
+    claim_ids = [c.id for c in audit.claims]
+    evidence_result = await db.execute(
+        select(EvidenceFile.claim_id).where(
+            EvidenceFile.claim_id.in_(claim_ids),
+            EvidenceFile.document_type == "ecolabel",
+        )
+    )
+    evidence_by_claim: Dict[UUID, bool] = {claim_id: True for claim_id in evidence_result.scalars().all()}
+
+    await progress("analyse", 20)
+
+    # Analyser chaque claim
+    all_verdicts: List[str] = []
+    all_results: List[ClaimResult] = []
+    for claim in audit.claims:
+        has_ecolabel = evidence_by_claim.get(claim.id, False)
+
+        # Étape 2 — Classification du régime juridique (avant les 8 règles)
+        metadata = {
+            "has_label": claim.has_label,
+            "label_is_certified": claim.label_is_certified,
+            "scope": claim.scope,
+            "is_future_commitment": claim.is_future_commitment,
+            "has_proof": claim.has_proof,
+            "proof_type": claim.proof_type,
+        }
+        classification = await classify_claim_regime(claim.claim_text, metadata)
+        claim.regulatory_basis = classification["regulatory_basis"]
+        claim.regime = classification["regime"]
+
+        # Étape 3 — Évaluation (8 règles existantes, inchangées)
+        results, overall_verdict = analyze_claim(
+            claim,
+            has_ecolabel_evidence=has_ecolabel,
+            country=audit.country,
+        )
+        claim.overall_verdict = overall_verdict
+        # Exclure les faux positifs du scoring
+        if not claim.is_false_positive:
+            all_verdicts.append(overall_verdict)
+        all_results.extend(results)
+
+    # Calculer le scoring global (hors faux positifs)
+    counts = compute_verdict_counts(all_verdicts)
+    score, risk_level = calculate_global_score(
+        conforming=counts["conforme"],
+        at_risk=counts["risque"],
+        non_conforming=counts["non_conforme"],
+    )
+
+    active_claims = [c for c in audit.claims if not c.is_false_positive]
+
+    # Mettre à jour l'audit
+    audit.status = "completed"
+    audit.total_claims = len(active_claims)
+    audit.conforming_claims = counts["conforme"]
+    audit.non_conforming_claims = counts["non_conforme"]
+    audit.at_risk_claims = counts["risque"]
+    audit.global_score = score
+    audit.risk_level = risk_level
+    audit.rules_version = RULES_VERSION
+    audit.completed_at = datetime.now(timezone.utc)
+
+    await progress("enregistrement", 90)
+    if deadline is not None:
+        deadline.check("enregistrement")
+    # Anciens résultats remplacés (re-analyse) en un DELETE + un INSERT multi-lignes
+    results_by_claim = await replace_results(db, claim_ids, all_results)
+    await db.commit()
+
+    return audit_results_response(
+        audit, [claim_with_results(c, results_by_claim.get(c.id, [])) for c in audit.claims]
+    )
+
+
+async def scan_and_analyze(
+    db: AsyncSession,
+    organization_id: UUID,
+    user_id: Optional[UUID],
+    url: str,
+    company_name: str,
+    sector: str = "autre",
+    scan_mode: str = "llm",
+    meter: Optional[UsageMeter] = None,
+    progress: ProgressCallback = _no_progress,
+    deadline: Optional[Deadline] = None,
+    audit_id: Optional[UUID] = None,
+) -> AuditResultsResponse:
+    """
+    Scan complet d'un site web :
+    1. Scrape le site (Firecrawl, fallback Jina Reader)
+    2. Extrait les allégations environnementales (Claude Haiku ou extracteur lexical)
+    3. Crée un audit + claims automatiquement
+    4. Lance l'analyse des règles EmpCo
+
+    L'audit, ses claims et le quota sont écrits dans un seul commit final.
+    audit_id : identifiant imposé à l'audit créé (clé d'idempotence du job).
+    """
+    await progress("scraping", 5)
+    scrape_deadline = deadline.share(_SCRAPE_BUDGET_SHARE) if deadline is not None else None
+    page_text = await scrape_website(url, scrape_deadline, db=db)
+    if not page_text.strip():
+        if scrape_deadline is not None:
+            scrape_deadline.check("scraping")  # vide faute de temps : 504 plutôt que 422
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=(
+                "Impossible de récupérer le contenu du site. "
+                "Vérifiez que l'URL est publique et accessible sans connexion. "
+                "Essayez avec la page RSE ou développement durable du site (ex: https://exemple.fr/rse)."
+            ),
+        )
+
+    async def _extract(_text: str) -> list:
+        if scan_mode == "lexical":
+            return extract_claims_lexical(_text, [], audited_company_name=company_name)
+        return await extract_claims_with_claude(
+            _text, [],
+            audited_company_name=company_name,
+            audited_website_url=url,
+            lexical_fallback=True,
+            deadline=deadline,
+        )
+
+    await progress("extraction", 30)
+
+    # Traitement par section — source_url assignée directement depuis le marqueur
+    _parts = _PAGE_MARKER_RE.split(page_text)
+    if len(_parts) >= 3:
+        _sections = [
+            (_parts[i], _parts[i + 1].strip())
+            for i in range(1, len(_parts) - 1, 2)
+            if _parts[i + 1].strip()
+        ]
+        _results = await asyncio.gather(*[_extract(_text) for _, _text in _sections])
+        _seen: set = set()
+        claims_items: list = []
+        for (_url, _), _items in zip(_sections, _results):
+            for _item in _items:
+                _ct = _item["claim_text"]
+                _key = _ct.lower().strip().strip("«»\"'.,;:!?")
+                if _key not in _seen:
+                    _seen.add(_key)
+                    claims_items.append({"claim_text": _ct, "source_url": _url})
+
+        # Supprimer les claims qui sont un préfixe d'une claim plus longue
+        _norm_keys = [c["claim_text"].lower().strip().strip("«»\"'.,;:!?") for c in claims_items]
+        claims_items = [
+            item for i, item in enumerate(claims_items)
+            if not any(
+                j != i and _norm_keys[j].startswith(_norm_keys[i]) and len(_norm_keys[i]) >= 30
+                for j in range(len(_norm_keys))
+            )
+        ]
+    else:
+        claims_items = await _extract(page_text)
+
+    if deadline is not None:
+        deadline.check("extraction")
+    if not claims_items:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=(
+                "Aucune allégation environnementale détectée sur ce site. "
+                "Essayez avec une URL plus spécifique : page RSE, développement durable, engagements ou impact."
+            ),
+        )
+
+    # Créer l'audit
+    audit = Audit(
+        id=audit_id or uuid.uuid4(),
+        organization_id=organization_id,
+        company_name=company_name,
+        sector=sector,
+        website_url=url,
+        created_by_user_id=user_id,
+    )
+    db.add(audit)
+    await db.flush()
+    if meter is not None:
+        meter.audit_id = audit.id
+    await progress("analyse", 60)
+
+    # Compter l'audit dans le quota (limite des scans vérifiée à l'admission)
+    await reserve_audit(db, organization_id, enforce=False)
+
+    # Claims construites en mémoire (mode simplifié — scope web, pas de preuve
+    # déclarée), analysées, puis insérées en lot avec leurs résultats
+    claims = [
+        Claim(
+            id=uuid.uuid4(),
+            audit_id=audit.id,
+            claim_text=item["claim_text"],
+            source_url=item.get("source_url"),
+            support_type="web",
+            scope="entreprise",
+            has_proof=False,
+            proof_type="aucune",
+            has_label=False,
+            is_future_commitment=False,
+            has_independent_verification=False,
+            is_false_positive=False,
+        )
+        for item in claims_items
+    ]
+
+    # Analyser (scan = pas d'écolabel dans vault, country par défaut "fr")
+    all_verdicts: List[str] = []
+    all_results: List[ClaimResult] = []
+    for claim in claims:
+        metadata = {
+            "has_label": claim.has_label,
+            "label_is_certified": claim.label_is_certified,
+            "scope": claim.scope,
+            "is_future_commitment": claim.is_future_commitment,
+            "has_proof": claim.has_proof,
+            "proof_type": claim.proof_type,
+        }
+        classification = await classify_claim_regime(claim.claim_text, metadata)
+        claim.regulatory_basis = classification["regulatory_basis"]
+        claim.regime = classification["regime"]
+        results, overall_verdict = analyze_claim(claim, has_ecolabel_evidence=False, country="fr", scan_mode=True)
+        claim.overall_verdict = overall_verdict
+        if not claim.is_false_positive:
+            all_verdicts.append(overall_verdict)
+        all_results.extend(results)
+
+    counts = compute_verdict_counts(all_verdicts)
+    score, risk_level = calculate_global_score(
+        conforming=counts["conforme"],
+        at_risk=counts["risque"],
+        non_conforming=counts["non_conforme"],
+    )
+
+    active_claims = [c for c in claims if not c.is_false_positive]
+
+    # Scan → in_progress pour permettre à l'utilisateur d'ajouter des allégations manuellement
+    audit.status = "in_progress"
+    audit.total_claims = len(active_claims)
+    audit.conforming_claims = counts["conforme"]
+    audit.non_conforming_claims = counts["non_conforme"]
+    audit.at_risk_claims = counts["risque"]
+    audit.global_score = score
+    audit.risk_level = risk_level
+    audit.rules_version = RULES_VERSION
+
+    await progress("enregistrement", 90)
+    if deadline is not None:
+        deadline.check("enregistrement")
+    await insert_claims(db, claims)
+    results_by_claim = await replace_results(db, [], all_results)
+    await db.commit()
+
+    return audit_results_response(
+        audit, [claim_with_results(c, results_by_claim.get(c.id, [])) for c in claims]
+    )
+
+
+def scan_audit_id(job_id: UUID) -> UUID:
+    """Identifiant de l'audit créé par un job de scan, dérivé du job."""
+    return uuid.uuid5(_SCAN_AUDIT_NAMESPACE, str(job_id))
+
+
+@job_handler("scan")
+async def scan_job(ctx: JobContext) -> dict:
+    """
+    Rejouable : l'audit porte un id dérivé du job. Si une tentative précédente
+    l'a déjà validé (worker arrêté avant d'enregistrer le succès du job), il
+    est renvoyé tel quel — ni second audit, ni second quota consommé.
+    """
+    payload = ctx.payload
+    audit_id = scan_audit_id(ctx.job_id)
+    existing = (await ctx.db.execute(
+        select(Audit)
+        .where(Audit.id == audit_id)
+        .options(selectinload(Audit.claims).selectinload(Claim.results))
+    )).scalar_one_or_none()
+    if existing is not None:
+        ctx.audit_id = existing.id
+        return audit_results_response(existing).model_dump(mode="json")
+
+    async with metered(ctx.db, ctx.organization_id, "scan") as meter:
+        response = await scan_and_analyze(
+            ctx.db,
+            ctx.organization_id,
+            ctx.user_id,
+            url=payload["url"],
+            company_name=payload["company_name"],
+            sector=payload.get("sector", "autre"),
+            scan_mode=payload.get("scan_mode", "llm"),
+            meter=meter,
+            progress=ctx.progress,
+            deadline=ctx.deadline,
+            audit_id=audit_id,
+        )
+    ctx.audit_id = response.audit_id
+    return response.model_dump(mode="json")
+
+
+@job_handler("analyze")
+async def analyze_job(ctx: JobContext) -> dict:
+    response = await analyze_audit_claims(
+        ctx.db, ctx.audit_id, ctx.organization_id, progress=ctx.progress, deadline=ctx.deadline
+    )
+    return response.model_dump(mode="json")
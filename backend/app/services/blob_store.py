@@ -0,0 +1,313 @@
+"""
+Stockage des pièces justificatives hors de PostgreSQL, adressé par contenu.
+
+Chaque fichier est stocké une seule fois sous la clé sha256 de son contenu :
+un même certificat déposé sur plusieurs allégations ou audits ne prend qu'une
+place, et la ligne EvidenceFile ne garde que les métadonnées et l'empreinte.
+
+Backends (EVIDENCE_STORE) :
+  - local : arborescence EVIDENCE_STORE_PATH/ab/cd/<sha256>
+  - s3    : bucket S3 ou compatible (MinIO, Scaleway…) — boto3 requis
+
+Les méthodes des backends sont synchrones (utilisables depuis une migration
+Alembic) ; le code async passe par put_blob / put_blob_stream / get_blob /
+release_blob.
+
+Un envoi saute l'écriture d'un blob déjà présent, et release_blob supprime un
+blob qui n'est plus référencé : les deux verrouillent d'abord la ligne
+evidence_blobs de l'empreinte (_lock_blob), jusqu'au commit de l'appelant.
+L'envoi valide sa ligne evidence_files sous ce verrou ; la suppression compte
+les références après l'avoir obtenu, elle voit donc l'envoi concurrent.
+"""
+from __future__ import annotations
+
+import abc
+import asyncio
+import hashlib
+import os
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterable, BinaryIO, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.evidence import EvidenceBlob, EvidenceFile
+
+
+class BlobNotFound(Exception):
+    """Aucun blob pour cette empreinte."""
+
+
+class BlobTooLarge(Exception):
+    """Flux plus gros que la taille maximale autorisée."""
+
+
+def blob_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore(abc.ABC):
+    """
+    Interface d'un backend de stockage adressé par contenu (clé = sha256 hexadécimal).
+
+    Classe abstraite : un backend incomplet échoue dès son instanciation.
+    """
+
+    @abc.abstractmethod
+    def exists(self, sha256: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def write(self, sha256: str, data: bytes) -> None:
+        ...
+
+    def write_file(self, sha256: str, path: Path) -> None:
+        """Stocke le fichier path, déjà sur disque (le fichier peut être déplacé)."""
+        self.write(sha256, path.read_bytes())
+
+    def staging_dir(self) -> Optional[Path]:
+        """Répertoire des fichiers en cours de réception (None : répertoire temporaire système)."""
+        return None
+
+    @abc.abstractmethod
+    def read(self, sha256: str) -> bytes:
+        ...
+
+    @abc.abstractmethod
+    def open(self, sha256: str) -> BinaryIO:
+        """Flux de lecture (read(n) / close()) pour lire un blob par morceaux."""
+
+    @abc.abstractmethod
+    def remove(self, sha256: str) -> None:
+        ...
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs sur le système de fichiers local (volume persistant)."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def exists(self, sha256: str) -> bool:
+        return self._path(sha256).is_file()
+
+    def write(self, sha256: str, data: bytes) -> None:
+        path = self._path(sha256)
+        if path.is_file():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Écriture atomique : un lecteur ne voit jamais un fichier partiel
+        tmp = path.with_name(f".{sha256}.{uuid.uuid4().hex}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def write_file(self, sha256: str, path: Path) -> None:
+        target = self._path(sha256)
+        if target.is_file():
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # path est dans staging_dir() : même système de fichiers, déplacement atomique
+        os.replace(path, target)
+
+    def staging_dir(self) -> Optional[Path]:
+        return self.root / ".staging"
+
+    def read(self, sha256: str) -> bytes:
+        try:
+            return self._path(sha256).read_bytes()
+        except FileNotFoundError as exc:
+            raise BlobNotFound(sha256) from exc
+
+    def open(self, sha256: str) -> BinaryIO:
+        try:
+            return self._path(sha256).open("rb")
+        except FileNotFoundError as exc:
+            raise BlobNotFound(sha256) from exc
+
+    def remove(self, sha256: str) -> None:
+        self._path(sha256).unlink(missing_ok=True)
+
+
+def _is_missing(exc: Exception) -> bool:
+    """Erreur botocore « objet absent » (404 / NoSuchKey), sans importer botocore."""
+    error = getattr(exc, "response", {}).get("Error", {})
+    return str(error.get("Code")) in {"404", "NoSuchKey", "NotFound"}
+
+
+class S3BlobStore(BlobStore):
+    """Blobs dans un bucket S3 ou compatible. client : client boto3 (ou équivalent) déjà construit."""
+
+    def __init__(self, bucket: str, prefix: str = "evidence/", client: Any = None) -> None:
+        self.bucket = bucket
+        self.prefix = prefix
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            try:
+                import boto3
+            except ImportError as exc:
+                raise RuntimeError("EVIDENCE_STORE=s3 nécessite le paquet boto3") from exc
+            self._client = boto3.client(
+                "s3",
+                endpoint_url=settings.EVIDENCE_S3_ENDPOINT_URL,
+                region_name=settings.EVIDENCE_S3_REGION,
+                aws_access_key_id=settings.EVIDENCE_S3_ACCESS_KEY,
+                aws_secret_access_key=settings.EVIDENCE_S3_SECRET_KEY,
+            )
+        return self._client
+
+    def _key(self, sha256: str) -> str:
+        return f"{self.prefix}{sha256}"
+
+    def exists(self, sha256: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(sha256))
+        except Exception as exc:
+            if _is_missing(exc):
+                return False
+            raise
+        return True
+
+    def write(self, sha256: str, data: bytes) -> None:
+        if self.exists(sha256):
+            return
+        self.client.put_object(Bucket=self.bucket, Key=self._key(sha256), Body=data)
+
+    def write_file(self, sha256: str, path: Path) -> None:
+        if self.exists(sha256):
+            return
+        # upload_file : envoi multipart par morceaux, sans charger le fichier en mémoire
+        self.client.upload_file(str(path), self.bucket, self._key(sha256))
+
+    def read(self, sha256: str) -> bytes:
+        with self.open(sha256) as body:
+            return body.read()
+
+    def open(self, sha256: str) -> BinaryIO:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key(sha256))
+        except Exception as exc:
+            if _is_missing(exc):
+                raise BlobNotFound(sha256) from exc
+            raise
+        return response["Body"]
+
+    def remove(self, sha256: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(sha256))
+
+
+_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Backend configuré (EVIDENCE_STORE), construit au premier appel."""
+    global _store
+    if _store is None:
+        if settings.EVIDENCE_STORE == "s3":
+            if not settings.EVIDENCE_S3_BUCKET:
+                raise RuntimeError("EVIDENCE_STORE=s3 nécessite EVIDENCE_S3_BUCKET")
+            _store = S3BlobStore(settings.EVIDENCE_S3_BUCKET, prefix=settings.EVIDENCE_S3_PREFIX)
+        else:
+            _store = LocalBlobStore(settings.EVIDENCE_STORE_PATH)
+    return _store
+
+
+async def _lock_blob(db: AsyncSession, sha256: str) -> None:
+    """
+    Verrou de ligne sur l'empreinte, tenu jusqu'à la fin de la transaction de db.
+    Upsert plutôt que SELECT … FOR UPDATE : la ligne est créée au besoin, et
+    recréée si une suppression concurrente l'a retirée pendant l'attente.
+    """
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = insert(EvidenceBlob).values(sha256=sha256)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[EvidenceBlob.sha256], set_={"sha256": stmt.excluded.sha256},
+    ))
+
+
+async def put_blob(db: AsyncSession, data: bytes) -> str:
+    """
+    Stocke data (sans doublon) et retourne son sha256. Le blob est verrouillé
+    jusqu'au commit de db, qui doit enregistrer la pièce qui le référence.
+    """
+    sha256 = blob_key(data)
+    await _lock_blob(db, sha256)
+    await asyncio.to_thread(get_blob_store().write, sha256, data)
+    return sha256
+
+
+async def put_blob_stream(
+    db: AsyncSession, chunks: AsyncIterable[bytes], max_size: int
+) -> Tuple[str, int]:
+    """
+    Stocke un flux sans le charger en mémoire : les morceaux sont écrits dans un
+    fichier de réception pendant que sha256 et taille sont calculés à la volée.
+    Lève BlobTooLarge dès que max_size est dépassé (rien n'est stocké).
+    Comme put_blob, le blob reste verrouillé jusqu'au commit de db.
+    Retourne (sha256, taille).
+    """
+    store = get_blob_store()
+    staging = store.staging_dir()
+    if staging is not None:
+        staging.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=staging, suffix=".upload")
+    tmp = Path(tmp_name)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_size:
+                    raise BlobTooLarge(max_size)
+                digest.update(chunk)
+                out.write(chunk)
+        sha256 = digest.hexdigest()
+        await _lock_blob(db, sha256)
+        await asyncio.to_thread(store.write_file, sha256, tmp)
+        return sha256, size
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+async def get_blob(sha256: str) -> bytes:
+    return await asyncio.to_thread(get_blob_store().read, sha256)
+
+
+async def read_evidence(db: AsyncSession, evidence: EvidenceFile) -> bytes:
+    """
+    Contenu d'une pièce : blob store, ou colonne file_data pour une ligne pas encore
+    migrée (colonne différée, lue ici par une requête dédiée).
+    """
+    if evidence.sha256:
+        return await get_blob(evidence.sha256)
+    data = await db.scalar(select(EvidenceFile.file_data).where(EvidenceFile.id == evidence.id))
+    return data or b""
+
+
+async def release_blob(db: AsyncSession, sha256: Optional[str]) -> bool:
+    """
+    Supprime le blob s'il n'est plus référencé par aucune pièce (à appeler après
+    le commit de la suppression, puis valider db pour libérer le verrou).
+    Retourne True si le blob a été supprimé.
+    """
+    if not sha256:
+        return False
+    await _lock_blob(db, sha256)
+    references = (await db.execute(
+        select(func.count()).select_from(EvidenceFile).where(EvidenceFile.sha256 == sha256)
+    )).scalar_one()
+    if references:
+        return False
+    await asyncio.to_thread(get_blob_store().remove, sha256)
+    await db.execute(delete(EvidenceBlob).where(EvidenceBlob.sha256 == sha256))
+    return True
@@ -0,0 +1,115 @@
+"""
+Index de déduplication des allégations — empreinte normalisée et quasi-doublons.
+
+Utilisé par le monitoring pour écarter, après l'extraction, les allégations
+déjà connues : claims de l'audit et alertes déjà levées pour la config. Le
+prompt d'extraction n'a ainsi plus à lister les allégations connues (sa taille
+ne croît plus avec l'audit) et une même allégation ne relance pas d'alerte
+chaque semaine.
+
+Deux textes sont considérés comme la même allégation si :
+  - leur empreinte est identique (casse, accents, ponctuation, guillemets et
+    espaces ignorés) ;
+  - ou leurs mots significatifs se recouvrent à NEAR_DUPLICATE_THRESHOLD
+    (indice de Jaccard) ;
+  - ou l'un est la version tronquée ("…") de l'autre.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set
+
+from app.utils.blacklist import _normalize
+
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+_WORD_RE = re.compile(r"[a-z0-9%]+")
+# Mots trop courts pour discriminer deux allégations (le, de, à, en…)
+_MIN_WORD_LEN = 3
+# Préfixe minimal pour rapprocher une allégation tronquée de sa version complète
+_MIN_PREFIX_LEN = 40
+
+
+def _words(text: str) -> List[str]:
+    # "100 %" et "100%" : même mot
+    return _WORD_RE.findall(re.sub(r"\s+%", "%", _normalize(text)))
+
+
+def claim_fingerprint(text: str) -> str:
+    """Empreinte normalisée d'une allégation (stable d'un scan à l'autre)."""
+    return hashlib.sha1(" ".join(_words(text)).encode()).hexdigest()
+
+
+def _is_truncated(text: str) -> bool:
+    return text.rstrip().endswith(("…", "..."))
+
+
+class ClaimIndex:
+    """Allégations connues, interrogeables par empreinte et par similarité."""
+
+    def __init__(self, texts: Iterable[str] = (), threshold: float = NEAR_DUPLICATE_THRESHOLD) -> None:
+        self.threshold = threshold
+        self._fingerprints: Set[str] = set()
+        self._token_sets: List[Set[str]] = []
+        self._normalized: List[str] = []
+        self._truncated: List[bool] = []
+        self._by_token: Dict[str, Set[int]] = defaultdict(set)
+        for text in texts:
+            self.add(text)
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def add(self, text: str) -> None:
+        fingerprint = claim_fingerprint(text)
+        if fingerprint in self._fingerprints:
+            return
+        self._fingerprints.add(fingerprint)
+        words = _words(text)
+        tokens = {w for w in words if len(w) >= _MIN_WORD_LEN}
+        position = len(self._token_sets)
+        self._token_sets.append(tokens)
+        self._normalized.append(" ".join(words))
+        self._truncated.append(_is_truncated(text))
+        for token in tokens:
+            self._by_token[token].add(position)
+
+    def contains(self, text: str) -> bool:
+        """Vrai si text est une allégation déjà connue (identique ou quasi-identique)."""
+        if claim_fingerprint(text) in self._fingerprints:
+            return True
+        words = _words(text)
+        tokens = {w for w in words if len(w) >= _MIN_WORD_LEN}
+        if not tokens:
+            return False
+
+        candidates: Set[int] = set()
+        for token in tokens:
+            candidates |= self._by_token.get(token, set())
+        normalized = " ".join(words)
+        truncated = _is_truncated(text)
+        for position in candidates:
+            known = self._token_sets[position]
+            if len(tokens & known) / len(tokens | known) >= self.threshold:
+                return True
+            # Version tronquée d'une allégation connue, ou l'inverse
+            other = self._normalized[position]
+            if len(normalized) <= len(other):
+                shorter, longer, shorter_truncated = normalized, other, truncated
+            else:
+                shorter, longer, shorter_truncated = other, normalized, self._truncated[position]
+            if shorter_truncated and len(shorter) >= _MIN_PREFIX_LEN and longer.startswith(shorter):
+                return True
+        return False
+
+    def filter_new(self, texts: Iterable[str]) -> List[str]:
+        """Textes inconnus de l'index (dédupliqués entre eux), ajoutés à l'index."""
+        fresh: List[str] = []
+        for text in texts:
+            if self.contains(text):
+                continue
+            self.add(text)
+            fresh.append(text)
+        return fresh
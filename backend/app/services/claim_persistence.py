@@ -0,0 +1,98 @@
+"""
+Écriture en lot des claims et de leurs résultats d'analyse (scan et analyse d'audit).
+
+Un scan crée des dizaines de claims et 7 à 8 ClaimResult par claim : les écrire
+objet par objet (db.add puis flush) émet une requête INSERT par ligne, suivie d'un
+rechargement complet de l'audit pour construire la réponse. Ici :
+
+  - insert_claims()    un seul INSERT pour toutes les claims (executemany asyncpg) ;
+  - replace_results()  un DELETE des anciens résultats, puis un INSERT multi-lignes
+                       … RETURNING (id et created_at générés à l'insertion) ;
+  - claim_with_results() construit la réponse depuis le lot en mémoire, sans
+                       rechargement.
+
+Les objets Claim / ClaimResult passés en entrée ne sont pas ajoutés à la session.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Sequence
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, insert, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.claim import Claim
+from app.models.claim_result import ClaimResult
+from app.schemas.claim_result import ClaimResultResponse, ClaimWithResultsResponse
+
+
+def _insert_row(obj: Any) -> Dict[str, Any]:
+    """
+    Colonnes d'un objet transient. Les valeurs absentes des colonnes avec défaut sont
+    omises (défaut appliqué) ; les autres None sont insérés tels quels (render_nulls),
+    pour que toutes les lignes aient les mêmes clés et partent dans le même INSERT.
+    """
+    row: Dict[str, Any] = {}
+    for attr in inspect(obj).mapper.column_attrs:
+        column = attr.columns[0]
+        value = getattr(obj, attr.key)
+        if value is None and (column.default is not None or column.server_default is not None):
+            continue
+        row[attr.key] = value
+    return row
+
+
+async def insert_claims(db: AsyncSession, claims: Sequence[Claim]) -> None:
+    """Insère les claims (id déjà attribués) en une requête."""
+    if claims:
+        await db.execute(
+            insert(Claim).execution_options(render_nulls=True),
+            [_insert_row(claim) for claim in claims],
+        )
+
+
+async def replace_results(
+    db: AsyncSession,
+    claim_ids: Iterable[UUID],
+    results: Sequence[ClaimResult],
+) -> Dict[UUID, List[ClaimResultResponse]]:
+    """
+    Remplace les résultats des claims claim_ids par results.
+    Retourne les résultats insérés par claim_id, prêts pour la réponse.
+    """
+    claim_ids = list(claim_ids)
+    if claim_ids:
+        await db.execute(delete(ClaimResult).where(ClaimResult.claim_id.in_(claim_ids)))
+
+    by_claim: Dict[UUID, List[ClaimResultResponse]] = defaultdict(list)
+    if not results:
+        return by_claim
+    # id attribués ici : les lignes RETURNING sont rapprochées par id, sans dépendre
+    # de leur ordre (qui forcerait une requête par ligne faute de colonne sentinelle)
+    rows = [{**_insert_row(result), "id": result.id or uuid4()} for result in results]
+    inserted = await db.execute(
+        insert(ClaimResult)
+        .returning(ClaimResult.id, ClaimResult.created_at)
+        .execution_options(render_nulls=True),
+        rows,
+    )
+    created_at = dict(inserted.all())
+    for row in rows:
+        by_claim[row["claim_id"]].append(
+            ClaimResultResponse(**row, created_at=created_at[row["id"]])
+        )
+    return by_claim
+
+
+def claim_with_results(claim: Claim, results: List[ClaimResultResponse]) -> ClaimWithResultsResponse:
+    return ClaimWithResultsResponse(
+        id=claim.id,
+        claim_text=claim.claim_text,
+        support_type=claim.support_type,
+        scope=claim.scope,
+        product_name=claim.product_name,
+        overall_verdict=claim.overall_verdict,
+        source_url=claim.source_url,
+        results=results,
+    )
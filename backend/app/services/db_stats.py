@@ -0,0 +1,167 @@
+"""
+Instrumentation des requêtes SQL : nombre, temps passé en base et requêtes les
+plus lentes, par requête HTTP et par route.
+
+Des hooks SQLAlchemy (before/after_cursor_execute, posés sur la classe Engine :
+tous les moteurs du process, y compris ceux des tests) mesurent chaque appel au
+driver et l'ajoutent aux collecteurs actifs — un QueryStats ouvert par track(),
+porté par une ContextVar (le middleware en ouvre un par requête HTTP). Un
+executemany compte pour un seul aller-retour.
+
+  - requête SQL lente (≥ DB_SLOW_QUERY_MS)   → log warning immédiat ;
+  - même requête répétée ≥ DB_N_PLUS_ONE_THRESHOLD fois dans une requête HTTP
+                                             → log warning « N+1 probable » ;
+  - agrégats par route (db_stats)            → GET /api/admin/db/stats ;
+  - en-têtes X-DB-* sur chaque réponse       → si DB_STATS_HEADERS (debug).
+
+Comme scrape_stats, les agrégats sont propres au process, sur une fenêtre glissante.
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Requêtes les plus lentes conservées par collecteur
+_SLOWEST_KEPT = 3
+# Requêtes HTTP conservées par route pour les percentiles
+_WINDOW = 500
+
+
+def _one_line(statement: str, width: int = 200) -> str:
+    return " ".join(statement.split())[:width]
+
+
+class QueryStats:
+    """Requêtes SQL émises pendant un bloc track() (une requête HTTP, un test…)."""
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.seconds = 0.0
+        self.slowest: List[Tuple[float, str]] = []  # tas (durée, requête), les plus lentes
+        self.by_statement: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.statements += 1
+        self.seconds += seconds
+        self.by_statement[statement] += 1
+        if len(self.slowest) < _SLOWEST_KEPT:
+            heapq.heappush(self.slowest, (seconds, statement))
+        else:
+            heapq.heappushpop(self.slowest, (seconds, statement))
+
+    def slowest_first(self) -> List[Tuple[float, str]]:
+        return sorted(self.slowest, reverse=True)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Requêtes émises au moins threshold fois (motif N+1)."""
+        return [(s, n) for s, n in self.by_statement.most_common() if n >= threshold]
+
+    def describe(self) -> str:
+        lines = [f"{self.statements} requêtes SQL, {self.seconds * 1000:.1f} ms :"]
+        lines += [f"  {n} × {_one_line(s)}" for s, n in self.by_statement.most_common()]
+        return "\n".join(lines)
+
+
+_active: ContextVar[Tuple[QueryStats, ...]] = ContextVar("db_query_stats", default=())
+
+
+@contextmanager
+def track() -> Iterator[QueryStats]:
+    """Collecte les requêtes SQL du bloc (les blocs imbriqués voient tous les mêmes requêtes)."""
+    stats = QueryStats()
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._db_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - context._db_stats_started
+    for stats in _active.get():
+        stats.record(statement, elapsed)
+    if elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        logger.warning("Requête SQL lente (%.0f ms) : %s", elapsed * 1000, _one_line(statement, 500))
+
+
+def install() -> None:
+    """Pose les hooks sur tous les moteurs SQLAlchemy (idempotent)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class RouteDbStats:
+    """Requêtes SQL par requête HTTP, agrégées par route (fenêtre glissante)."""
+
+    def __init__(self, window: int = _WINDOW) -> None:
+        self._lock = threading.Lock()
+        self._statements: Dict[str, Deque[int]] = defaultdict(lambda: deque(maxlen=window))
+        self._millis: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._counters: Dict[str, Counter] = defaultdict(Counter)
+
+    def record_request(self, route: str, stats: QueryStats) -> None:
+        repeated = stats.repeated(settings.DB_N_PLUS_ONE_THRESHOLD)
+        for statement, count in repeated:
+            logger.warning("N+1 probable sur %s : %d × %s", route, count, _one_line(statement))
+        with self._lock:
+            self._statements[route].append(stats.statements)
+            self._millis[route].append(stats.seconds * 1000)
+            self._counters[route]["requests"] += 1
+            if repeated:
+                self._counters[route]["n_plus_one"] += 1
+
+    @staticmethod
+    def _percentile(values: List[float], q: float) -> Optional[float]:
+        if not values:
+            return None
+        values = sorted(values)
+        return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Vue par route pour le dashboard admin, routes les plus coûteuses d'abord."""
+        with self._lock:
+            routes = {
+                route: (list(self._statements[route]), list(self._millis[route]), dict(self._counters[route]))
+                for route in self._counters
+            }
+        snapshot = {
+            route: {
+                "requests": counters.get("requests", 0),
+                "n_plus_one": counters.get("n_plus_one", 0),
+                "statements_p50": self._percentile(statements, 0.5),
+                "statements_p90": self._percentile(statements, 0.9),
+                "statements_max": max(statements, default=0),
+                "db_ms_p50": self._percentile(millis, 0.5),
+                "db_ms_p90": self._percentile(millis, 0.9),
+            }
+            for route, (statements, millis, counters) in routes.items()
+        }
+        return dict(sorted(snapshot.items(), key=lambda item: -(item[1]["statements_p90"] or 0)))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self._millis.clear()
+            self._counters.clear()
+
+
+db_stats = RouteDbStats()
@@ -0,0 +1,182 @@
+"""
+Export ZIP du dossier de preuves (vault d'un audit) — côté cabinet et côté client.
+
+Le ZIP est produit en flux : chaque pièce est lue par morceaux depuis le blob
+store et chaque morceau compressé est envoyé aussitôt (StreamingResponse), sans
+jamais construire l'archive en mémoire. La mémoire reste constante quelle que
+soit la taille du dossier.
+
+  - Les formats déjà compressés (PDF, JPEG, PNG, WebP, DOCX) sont stockés tels
+    quels (ZIP_STORED) : les recompresser coûte du CPU pour quelques octets.
+  - Tracabilite.txt reprend les sha256 enregistrés à l'upload : aucun fichier
+    n'est rehaché au téléchargement.
+  - Les pièces pas encore migrées (file_data en base) sont d'abord versées dans
+    le blob store : le flux ne dépend plus de la session, fermée pendant l'envoi.
+  - La présence de chaque blob est vérifiée avant la réponse : une fois le flux
+    commencé, une pièce absente ne pourrait plus que tronquer l'archive.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.audit import Audit
+from app.models.claim import Claim
+from app.models.evidence import EvidenceFile
+from app.services.blob_store import get_blob_store, put_blob
+
+logger = logging.getLogger(__name__)
+
+# Taille des morceaux lus dans le blob store
+_CHUNK_SIZE = 256 * 1024
+
+_COMPRESSED_TYPES = {
+    "application/pdf",
+    "image/jpeg",
+    "image/png",
+    "image/webp",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+@dataclass
+class ExportEntry:
+    """Une pièce du dossier : chemin dans l'archive et métadonnées (sans contenu)."""
+
+    arcname: str
+    filename: str
+    sha256: str
+    size: int
+    content_type: str
+
+
+def _folder(index: int, claim: Claim) -> str:
+    return f"allegation_{index}_{claim.claim_text[:30].replace('/', '_').replace(' ', '_')}"
+
+
+async def _adopt_legacy(db: AsyncSession, evidence: EvidenceFile) -> None:
+    """Verse une pièce encore en base dans le blob store et enregistre son sha256."""
+    data = await db.scalar(select(EvidenceFile.file_data).where(EvidenceFile.id == evidence.id))
+    evidence.sha256 = await put_blob(db, data or b"")
+    evidence.file_data = None
+    await db.commit()
+
+
+async def collect_entries(db: AsyncSession, claims: Iterable[Claim]) -> List[ExportEntry]:
+    """
+    Entrées du dossier, dans l'ordre des allégations (claims chargées avec
+    evidence_files, métadonnées seules). Lève une HTTPException 500 si un blob
+    manque au blob store.
+    """
+    entries: List[ExportEntry] = []
+    for i, claim in enumerate(claims, 1):
+        for evidence in claim.evidence_files:
+            if not evidence.sha256:
+                await _adopt_legacy(db, evidence)
+            entries.append(ExportEntry(
+                arcname=f"{_folder(i, claim)}/{evidence.filename}",
+                filename=evidence.filename,
+                sha256=evidence.sha256,
+                size=evidence.file_size,
+                content_type=evidence.content_type,
+            ))
+
+    store = get_blob_store()
+    digests = list({entry.sha256 for entry in entries})
+    present = await asyncio.gather(*(asyncio.to_thread(store.exists, d) for d in digests))
+    missing = {d for d, ok in zip(digests, present) if not ok}
+    if missing:
+        filenames = [entry.filename for entry in entries if entry.sha256 in missing]
+        logger.error("Export du dossier de preuves : blob(s) absent(s) %s (%s)", sorted(missing), filenames)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Pièce(s) justificative(s) introuvable(s) dans le stockage : {', '.join(filenames)}",
+        )
+    return entries
+
+
+def tracability_text(entries: List[ExportEntry], audit: Audit, cabinet_name: str, now: datetime) -> str:
+    lines = [f"  [{entry.filename}]  SHA-256 : {entry.sha256}" for entry in entries]
+    return (
+        "DOSSIER DE PREUVES — TRACABILITE\n"
+        "=================================\n\n"
+        f"Entreprise auditee : {audit.company_name}\n"
+        f"Cabinet RSE        : {cabinet_name}\n"
+        f"Date               : {now.strftime('%d/%m/%Y')}\n"
+        f"Heure (UTC)        : {now.strftime('%H:%M:%S')}\n"
+        f"Nombre de fichiers : {len(entries)}\n\n"
+        "Empreintes SHA-256 des fichiers :\n"
+        "---------------------------------\n"
+        + "\n".join(lines)
+        + "\n\n"
+        "Ce fichier atteste de l'integrite des preuves deposees dans GreenAudit\n"
+        "et peut etre presente en cas de controle DGCCRF.\n"
+    )
+
+
+class _ZipSink:
+    """Sortie non seekable de zipfile : accumule les octets écrits, vidée à chaque morceau."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_zip(entries: List[ExportEntry], tracability: str, now: datetime) -> AsyncIterator[bytes]:
+    """Archive ZIP produite morceau par morceau (pièces lues dans le blob store)."""
+    store = get_blob_store()
+    sink = _ZipSink()
+    date_time = now.timetuple()[:6]
+    with zipfile.ZipFile(sink, "w") as zf:
+        for entry in entries:
+            info = zipfile.ZipInfo(entry.arcname, date_time=date_time)
+            info.compress_type = (
+                zipfile.ZIP_STORED if entry.content_type in _COMPRESSED_TYPES else zipfile.ZIP_DEFLATED
+            )
+            # Taille annoncée : zipfile décide seul du passage en ZIP64
+            info.file_size = entry.size
+            blob = await asyncio.to_thread(store.open, entry.sha256)
+            try:
+                with zf.open(info, "w") as dest:
+                    while chunk := await asyncio.to_thread(blob.read, _CHUNK_SIZE):
+                        dest.write(chunk)
+                        if data := sink.drain():
+                            yield data
+            finally:
+                blob.close()
+            yield sink.drain()
+
+        info = zipfile.ZipInfo("Tracabilite.txt", date_time=date_time)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        zf.writestr(info, tracability.encode("utf-8"))
+    # Répertoire central, écrit à la fermeture de l'archive
+    yield sink.drain()
+
+
+def zip_response(entries: List[ExportEntry], audit: Audit, cabinet_name: str, now: datetime) -> StreamingResponse:
+    filename = f"dossier_preuves_{audit.company_name.replace(' ', '_')}.zip"
+    return StreamingResponse(
+        stream_zip(entries, tracability_text(entries, audit, cabinet_name, now), now),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
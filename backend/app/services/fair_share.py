@@ -0,0 +1,70 @@
+"""
+Partage équitable pondéré des ressources coûteuses (scraping, LLM) entre organisations.
+
+Chaque organisation reçoit une part proportionnelle au poids de son plan et
+un plafond de travaux simultanés. À chaque place libre, le travail suivant est
+pris chez l'organisation la moins servie relativement à son poids
+(en cours / poids), à égalité la plus anciennement en attente : une agence qui
+enfile 200 scans n'occupe jamais plus que sa part, et une organisation sans
+travail en cours passe devant.
+
+Utilisé par la file des jobs (scan, analyse) et par le scheduler de monitoring.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from uuid import UUID
+
+# Poids relatif de chaque plan dans le partage des workers
+PLAN_WEIGHTS: Dict[str, int] = {
+    "starter": 1,
+    "essentiel": 2,
+    "partner": 2,
+    "pro": 4,
+    "enterprise": 8,
+}
+
+# Travaux simultanés maximum par organisation (jobs ou checks de monitoring)
+PLAN_CONCURRENCY: Dict[str, int] = {
+    "starter": 1,
+    "essentiel": 2,
+    "partner": 2,
+    "pro": 3,
+    "enterprise": 6,
+}
+
+
+def plan_weight(plan: Optional[str]) -> int:
+    return PLAN_WEIGHTS.get(plan or "starter", PLAN_WEIGHTS["starter"])
+
+
+def plan_concurrency(plan: Optional[str]) -> int:
+    return PLAN_CONCURRENCY.get(plan or "starter", PLAN_CONCURRENCY["starter"])
+
+
+@dataclass
+class TenantQueue:
+    """File d'attente d'une organisation : travaux en cours et ancienneté de la tête."""
+
+    organization_id: UUID
+    plan: Optional[str]
+    running: int
+    oldest: datetime
+    depth: int = 0
+
+
+def fair_key(running: int, plan: Optional[str]) -> float:
+    """Service reçu rapporté au poids — le plus petit est servi en premier."""
+    return running / plan_weight(plan)
+
+
+def pick_tenant(queues: Iterable[TenantQueue]) -> Optional[TenantQueue]:
+    """Organisation à servir : sous son plafond, la moins servie selon son poids, puis la plus ancienne."""
+    eligible = [q for q in queues if q.running < plan_concurrency(q.plan)]
+    return min(
+        eligible,
+        key=lambda q: (fair_key(q.running, q.plan), q.oldest),
+        default=None,
+    )
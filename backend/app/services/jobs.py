@@ -0,0 +1,607 @@
+"""
+Jobs asynchrones persistés (scan, analyse) — file d'attente en base + workers sous bail.
+
+Cycle de vie :
+  enqueue_job()  → ligne "queued" dans la table jobs
+  claim_job()    → UPDATE conditionnel (queued, ou running avec bail expiré)
+                   → "running", lease_owner = worker, attempts + 1
+  execute_job()  → exécute le handler du kind dans sa propre session ;
+                   le bail est prolongé à chaque étape (JobContext.progress)
+                   et par un heartbeat périodique
+  fin            → "succeeded" (result) ou "failed" (error, error_status).
+                   Une exception inattendue remet le job en file tant que
+                   attempts < max_attempts (en mode eager : nouvelle tentative
+                   immédiate dans la requête) ; une HTTPException est définitive.
+                   Les handlers doivent donc être rejouables (cf. scan_job).
+  cancel_job()   → "cancelled" : le worker le détecte (poll toutes les
+                   JOBS_CANCEL_POLL_SECONDS) et annule le handler en cours.
+
+Chaque exécution dispose d'un budget (JobContext.deadline, JOBS_DEADLINE_SECONDS)
+propagé au pipeline ; un dépassement échoue le job en 504, sans nouvelle tentative.
+
+Un worker qui meurt laisse son job "running" : à l'expiration du bail, un
+autre worker le réclame et le relance.
+
+Ordonnancement (fair_share) : un worker libre ne prend pas le job le plus
+ancien mais celui de l'organisation la moins servie relativement au poids de
+son plan, sous le plafond de jobs simultanés du plan. Les jobs "interactive"
+passent avant les "batch" (organisation dont la file dépasse
+JOBS_INTERACTIVE_QUEUE_DEPTH), limités à JOBS_MAX_RUNNING_BATCH workers.
+
+Modes (settings.JOBS_MODE) :
+  inprocess — JobWorkerPool démarré dans le lifespan du process web
+  external  — le web enfile seulement, workers lancés par `python -m app.worker`
+  eager     — exécution immédiate dans la requête (dev mono-process, tests)
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import async_session
+from app.models.job import Job
+from app.models.organization import Organization
+from app.services.fair_share import TenantQueue, pick_tenant, plan_concurrency, plan_weight
+from app.utils.deadline import Deadline, DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+SessionFactory = Callable[[], AsyncSession]
+JobHandler = Callable[["JobContext"], Awaitable[Any]]
+
+_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Décorateur : enregistre le handler d'un type de job."""
+    def _register(func: JobHandler) -> JobHandler:
+        _HANDLERS[kind] = func
+        return func
+    return _register
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _lease_delta() -> timedelta:
+    return timedelta(seconds=settings.JOBS_LEASE_SECONDS)
+
+
+def worker_id() -> str:
+    """Identifiant unique d'un worker (hôte, pid, suffixe aléatoire)."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+@dataclass
+class JobContext:
+    """Contexte passé au handler : session de travail + mise à jour de l'avancement."""
+
+    job_id: UUID
+    owner: str
+    kind: str
+    payload: dict
+    organization_id: UUID
+    user_id: Optional[UUID]
+    audit_id: Optional[UUID]
+    db: AsyncSession
+    _session_factory: SessionFactory
+    deadline: Optional[Deadline] = None
+
+    async def progress(self, stage: str, percent: int) -> None:
+        """Publie l'étape en cours (session séparée : n'engage pas le travail du handler)."""
+        if self.deadline is not None:
+            self.deadline.check(stage)
+        try:
+            async with self._session_factory() as status_db:
+                await status_db.execute(
+                    update(Job)
+                    .where(Job.id == self.job_id, Job.lease_owner == self.owner, Job.status == "running")
+                    .values(
+                        stage=stage,
+                        progress=max(0, min(percent, 100)),
+                        lease_expires_at=_now() + _lease_delta(),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                await status_db.commit()
+        except Exception as exc:
+            logger.warning(f"Job {self.job_id} : avancement non enregistré ({stage}) : {exc}")
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    kind: str,
+    payload: dict,
+    organization_id: UUID,
+    user_id: Optional[UUID] = None,
+    audit_id: Optional[UUID] = None,
+    priority: Optional[str] = None,
+) -> Job:
+    """
+    Crée un job "queued" (commit). En mode eager, l'exécute immédiatement.
+    Sans priorité explicite : "batch" si l'organisation a déjà
+    JOBS_INTERACTIVE_QUEUE_DEPTH jobs en attente, "interactive" sinon.
+    """
+    if kind not in _HANDLERS:
+        raise ValueError(f"Type de job inconnu : {kind}")
+
+    if priority is None:
+        queued = (await db.execute(
+            select(func.count(Job.id)).where(
+                Job.organization_id == organization_id, Job.status == "queued"
+            )
+        )).scalar_one()
+        priority = "batch" if queued >= settings.JOBS_INTERACTIVE_QUEUE_DEPTH else "interactive"
+
+    job = Job(
+        kind=kind,
+        status="queued",
+        priority=priority,
+        stage="en_attente",
+        payload=payload,
+        organization_id=organization_id,
+        user_id=user_id,
+        audit_id=audit_id,
+        max_attempts=settings.JOBS_MAX_ATTEMPTS,
+    )
+    db.add(job)
+    await db.commit()
+
+    if settings.JOBS_MODE == "eager":
+        # Liée à une connexion déjà en transaction (tests), chaque session du job
+        # travaille dans un savepoint : un rollback du job n'annule que son travail
+        factory = async_sessionmaker(
+            bind=db.bind, class_=AsyncSession, expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        owner = worker_id()
+        # Job remis en file après une erreur inattendue : aucun worker ne le
+        # reprendra, les tentatives restantes sont faites ici
+        while await claim_job(factory, owner, job_id=job.id):
+            await execute_job(factory, job.id, owner, heartbeat=False)
+        await db.refresh(job)
+    elif _pool is not None:
+        _pool.wake()
+
+    return job
+
+
+def _claimable(now: datetime):
+    return or_(
+        Job.status == "queued",
+        and_(Job.status == "running", Job.lease_expires_at < now),
+    )
+
+
+def _holds_lease(now: datetime):
+    return and_(Job.status == "running", Job.lease_expires_at >= now)
+
+
+async def _pick_fair_job(db: AsyncSession, now: datetime) -> Optional[UUID]:
+    """Prochain job selon le partage équitable pondéré (interactive d'abord)."""
+    heads = (await db.execute(
+        select(
+            Job.organization_id,
+            Job.priority,
+            func.min(Job.created_at).label("oldest"),
+            func.count(Job.id).label("depth"),
+        )
+        .where(_claimable(now))
+        .group_by(Job.organization_id, Job.priority)
+    )).all()
+    if not heads:
+        return None
+
+    running_rows = (await db.execute(
+        select(Job.organization_id, Job.priority, func.count(Job.id).label("running"))
+        .where(_holds_lease(now))
+        .group_by(Job.organization_id, Job.priority)
+    )).all()
+    running: Dict[UUID, int] = {}
+    running_batch = 0
+    for row in running_rows:
+        running[row.organization_id] = running.get(row.organization_id, 0) + row.running
+        if row.priority == "batch":
+            running_batch += row.running
+
+    plans = dict((await db.execute(
+        select(Organization.id, Organization.subscription_plan)
+        .where(Organization.id.in_({row.organization_id for row in heads}))
+    )).all())
+
+    for priority in ("interactive", "batch"):
+        if priority == "batch" and running_batch >= settings.JOBS_MAX_RUNNING_BATCH:
+            break
+        tenant = pick_tenant(
+            TenantQueue(
+                organization_id=row.organization_id,
+                plan=plans.get(row.organization_id),
+                running=running.get(row.organization_id, 0),
+                oldest=row.oldest,
+                depth=row.depth,
+            )
+            for row in heads
+            if row.priority == priority
+        )
+        if tenant is not None:
+            return (await db.execute(
+                select(Job.id)
+                .where(
+                    _claimable(now),
+                    Job.organization_id == tenant.organization_id,
+                    Job.priority == priority,
+                )
+                .order_by(Job.created_at)
+                .limit(1)
+            )).scalar_one_or_none()
+    return None
+
+
+async def claim_job(
+    session_factory: SessionFactory,
+    owner: str,
+    job_id: Optional[UUID] = None,
+) -> Optional[UUID]:
+    """
+    Réclame un job (job_id, ou le suivant selon le partage équitable) par
+    UPDATE conditionnel : un seul worker peut le passer en "running" sous son bail.
+    """
+    now = _now()
+    for _ in range(3):  # job pris entre-temps par un autre worker : on en choisit un autre
+        async with session_factory() as db:
+            target = job_id or await _pick_fair_job(db, now)
+            if target is None:
+                await db.commit()
+                return None
+
+            result = await db.execute(
+                update(Job)
+                .where(Job.id == target, _claimable(now))
+                .values(
+                    status="running",
+                    lease_owner=owner,
+                    lease_expires_at=now + _lease_delta(),
+                    attempts=Job.attempts + 1,
+                    started_at=now,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            if result.rowcount == 1:
+                return target
+            if job_id is not None:
+                return None
+    return None
+
+
+async def queue_depths(db: AsyncSession, organization_id: Optional[UUID] = None) -> List[dict]:
+    """Files par organisation : jobs en attente (interactive / batch), en cours, part du plan."""
+    now = _now()
+    query = (
+        select(
+            Job.organization_id,
+            Job.priority,
+            Job.status,
+            func.count(Job.id).label("count"),
+            func.min(Job.created_at).label("oldest"),
+        )
+        .where(or_(Job.status == "queued", _holds_lease(now)))
+        .group_by(Job.organization_id, Job.priority, Job.status)
+    )
+    if organization_id is not None:
+        query = query.where(Job.organization_id == organization_id)
+    rows = (await db.execute(query)).all()
+
+    plans = dict((await db.execute(
+        select(Organization.id, Organization.subscription_plan)
+        .where(Organization.id.in_({row.organization_id for row in rows}))
+    )).all()) if rows else {}
+
+    tenants: Dict[UUID, dict] = {}
+    for row in rows:
+        plan = plans.get(row.organization_id)
+        entry = tenants.setdefault(row.organization_id, {
+            "organization_id": row.organization_id,
+            "plan": plan,
+            "weight": plan_weight(plan),
+            "max_running": plan_concurrency(plan),
+            "running": 0,
+            "queued_interactive": 0,
+            "queued_batch": 0,
+            "oldest_queued_seconds": None,
+        })
+        if row.status == "running":
+            entry["running"] += row.count
+            continue
+        entry[f"queued_{row.priority}"] += row.count
+        oldest = row.oldest if row.oldest.tzinfo else row.oldest.replace(tzinfo=timezone.utc)
+        age = max((now - oldest).total_seconds(), 0.0)
+        entry["oldest_queued_seconds"] = max(entry["oldest_queued_seconds"] or 0.0, age)
+
+    return sorted(
+        tenants.values(),
+        key=lambda t: t["queued_interactive"] + t["queued_batch"],
+        reverse=True,
+    )
+
+
+async def _finish(
+    session_factory: SessionFactory,
+    job_id: UUID,
+    owner: str,
+    **values: Any,
+) -> None:
+    """Écrit l'état final — ignoré si le bail a été repris par un autre worker ou le job annulé."""
+    if values.get("status") in ("succeeded", "failed"):
+        values["finished_at"] = _now()
+    values.setdefault("lease_owner", None)
+    values.setdefault("lease_expires_at", None)
+    async with session_factory() as db:
+        await db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.lease_owner == owner, Job.status == "running")
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+
+async def _heartbeat(session_factory: SessionFactory, job_id: UUID, owner: str) -> None:
+    interval = max(settings.JOBS_LEASE_SECONDS / 3, 1)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory() as db:
+                await db.execute(
+                    update(Job)
+                    .where(Job.id == job_id, Job.lease_owner == owner)
+                    .values(lease_expires_at=_now() + _lease_delta())
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        except Exception as exc:
+            logger.warning(f"Job {job_id} : heartbeat impossible : {exc}")
+
+
+async def _watch_cancellation(
+    session_factory: SessionFactory,
+    job_id: UUID,
+    owner: str,
+    deadline: Deadline,
+    work: asyncio.Task,
+) -> None:
+    """Annule le handler si le job est annulé (cancel_job) ou si le bail a été perdu."""
+    while not work.done():
+        await asyncio.sleep(settings.JOBS_CANCEL_POLL_SECONDS)
+        try:
+            async with session_factory() as db:
+                row = (await db.execute(
+                    select(Job.status, Job.lease_owner).where(Job.id == job_id)
+                )).one_or_none()
+        except Exception as exc:
+            logger.warning(f"Job {job_id} : état d'annulation illisible : {exc}")
+            continue
+        if row is None or row.status != "running" or row.lease_owner != owner:
+            reason = "job annulé" if row is not None and row.status == "cancelled" else "bail perdu"
+            deadline.cancel(reason)
+            work.cancel()
+            return
+
+
+async def cancel_job(db: AsyncSession, job_id: UUID, organization_id: UUID) -> Optional[Job]:
+    """
+    Annule un job en attente ou en cours (client parti, abandon utilisateur).
+    Un job en cours est interrompu par son worker au prochain poll.
+    Retourne le job, ou None s'il n'appartient pas à l'organisation.
+    """
+    job = (await db.execute(
+        select(Job).where(Job.id == job_id, Job.organization_id == organization_id)
+    )).scalar_one_or_none()
+    if job is None:
+        return None
+    if job.status in ("queued", "running"):
+        await db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status.in_(("queued", "running")))
+            .values(
+                status="cancelled",
+                stage="annule",
+                error="Annulé par l'utilisateur",
+                finished_at=_now(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        await db.refresh(job)
+    return job
+
+
+async def execute_job(
+    session_factory: SessionFactory,
+    job_id: UUID,
+    owner: str,
+    heartbeat: bool = True,
+) -> None:
+    """Exécute un job déjà réclamé par owner et enregistre son issue."""
+    async with session_factory() as db:
+        job = await db.get(Job, job_id)
+        if job is None or job.lease_owner != owner:
+            return
+        snapshot = (job.kind, dict(job.payload or {}), job.organization_id, job.user_id,
+                    job.audit_id, job.attempts, job.max_attempts)
+    kind, payload, organization_id, user_id, audit_id, attempts, max_attempts = snapshot
+
+    if attempts > max_attempts:
+        await _finish(
+            session_factory, job_id, owner,
+            status="failed", error="Nombre maximal de tentatives atteint", error_status=500,
+        )
+        return
+
+    handler = _HANDLERS.get(kind)
+    if handler is None:
+        await _finish(
+            session_factory, job_id, owner,
+            status="failed", error=f"Type de job inconnu : {kind}", error_status=500,
+        )
+        return
+
+    heartbeat_task = (
+        asyncio.create_task(_heartbeat(session_factory, job_id, owner)) if heartbeat else None
+    )
+    watcher: Optional[asyncio.Task] = None
+    deadline = Deadline.after(settings.JOBS_DEADLINE_SECONDS)
+    ctx: Optional[JobContext] = None
+    try:
+        async with session_factory() as work_db:
+            ctx = JobContext(
+                job_id=job_id,
+                owner=owner,
+                kind=kind,
+                payload=payload,
+                organization_id=organization_id,
+                user_id=user_id,
+                audit_id=audit_id,
+                db=work_db,
+                _session_factory=session_factory,
+                deadline=deadline,
+            )
+            work = asyncio.create_task(handler(ctx))
+            if heartbeat:
+                watcher = asyncio.create_task(
+                    _watch_cancellation(session_factory, job_id, owner, deadline, work)
+                )
+            result = await deadline.run(work, kind)
+    except asyncio.CancelledError:
+        if not deadline.cancelled:
+            raise  # arrêt du worker : le bail expirera et un autre worker reprendra le job
+        logger.info(f"Job {job_id} ({kind}) interrompu : {deadline.cancel_reason}")
+    except DeadlineExceeded as exc:
+        if deadline.cancelled:
+            logger.info(f"Job {job_id} ({kind}) interrompu : {deadline.cancel_reason}")
+        else:
+            logger.warning(f"Job {job_id} ({kind}) : {exc}")
+            await _finish(
+                session_factory, job_id, owner,
+                status="failed", stage="erreur",
+                error="Délai de traitement dépassé", error_status=504,
+            )
+    except HTTPException as exc:
+        logger.info(f"Job {job_id} ({kind}) refusé : {exc.status_code} {exc.detail}")
+        await _finish(
+            session_factory, job_id, owner,
+            status="failed", error=str(exc.detail), error_status=exc.status_code,
+        )
+    except Exception as exc:
+        retry = attempts < max_attempts
+        logger.exception(
+            f"Job {job_id} ({kind}) en erreur (tentative {attempts}/{max_attempts}) : {exc}"
+        )
+        await _finish(
+            session_factory, job_id, owner,
+            status="queued" if retry else "failed",
+            stage="en_attente" if retry else "erreur",
+            error=str(exc) or exc.__class__.__name__,
+            error_status=None if retry else 500,
+        )
+    else:
+        await _finish(
+            session_factory, job_id, owner,
+            status="succeeded",
+            stage="termine",
+            progress=100,
+            result=result,
+            audit_id=ctx.audit_id if ctx else audit_id,
+            error=None,
+            error_status=None,
+        )
+    finally:
+        for task in (heartbeat_task, watcher):
+            if task is not None:
+                task.cancel()
+
+
+class JobWorkerPool:
+    """Pool de workers asyncio : chacun réclame et exécute des jobs en boucle."""
+
+    def __init__(
+        self,
+        session_factory: SessionFactory = async_session,
+        concurrency: Optional[int] = None,
+        poll_seconds: Optional[float] = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.concurrency = concurrency or settings.JOBS_CONCURRENCY
+        self.poll_seconds = poll_seconds or settings.JOBS_POLL_SECONDS
+        self.owner = worker_id()
+        self._tasks: List[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self._stopping = False
+
+    def wake(self) -> None:
+        """Réveille les workers en attente (nouveau job enfilé dans ce process)."""
+        self._wake.set()
+
+    async def start(self) -> None:
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._run(i)) for i in range(self.concurrency)
+        ]
+        logger.info(f"Workers jobs démarrés ({self.concurrency}) — {self.owner}")
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, index: int) -> None:
+        owner = f"{self.owner}#{index}"
+        while not self._stopping:
+            try:
+                job_id = await claim_job(self.session_factory, owner)
+            except Exception as exc:
+                logger.error(f"Worker {owner} : réclamation impossible : {exc}")
+                job_id = None
+
+            if job_id is not None:
+                await execute_job(self.session_factory, job_id, owner)
+                continue
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+
+_pool: Optional[JobWorkerPool] = None
+
+
+async def start_worker_pool(**kwargs: Any) -> JobWorkerPool:
+    """Démarre le pool du process (mode inprocess ou worker externe)."""
+    global _pool
+    _pool = JobWorkerPool(**kwargs)
+    await _pool.start()
+    return _pool
+
+
+async def stop_worker_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.stop()
+        _pool = None
@@ -0,0 +1,245 @@
+"""
+Planification des checks de monitoring — lissage de la charge sur les créneaux horaires.
+
+Sans lissage, next_check_at = maintenant + frequency_days : les configs activées
+ensemble (ou toutes celles rattrapées après une panne) restent groupées à vie et
+un même tick horaire reçoit des centaines de checks quand les autres n'en ont aucun.
+
+Le planificateur raisonne en créneaux d'une heure (un par tick du scheduler),
+chacun d'une capacité de MONITORING_SLOT_CAPACITY checks :
+  - plan_next_check()   choisit, dans une fenêtre autour de l'échéance nominale
+                        (± 10 % de la période, 12 h max), le créneau le moins
+                        chargé — d'abord sous la capacité, puis le moins chargé
+                        pour l'organisation (équité entre clients), puis au total —
+                        avec une minute déterministe dans le créneau (jitter).
+  - rebalance_backlog() après une panne, garde dans le tick courant autant de
+                        checks en retard que la capacité le permet, servis à tour
+                        de rôle par organisation, et reporte le reste sur les
+                        créneaux suivants disponibles.
+  - projected_load()    histogramme de la charge prévue par heure (dashboard admin),
+                        pour dimensionner les workers sur la moyenne plutôt que le pic.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+from collections import Counter, OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.audit import Audit
+from app.models.monitoring_config import MonitoringConfig
+
+logger = logging.getLogger(__name__)
+
+SLOT = timedelta(hours=1)
+# Fenêtre de placement autour de l'échéance nominale
+_SPREAD_RATIO = 0.1
+_MAX_SPREAD = timedelta(hours=12)
+# Horizon maximal de report du backlog après une panne
+_BACKLOG_HORIZON_SLOTS = 7 * 24
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _slot_start(value: datetime) -> datetime:
+    return _as_utc(value).replace(minute=0, second=0, microsecond=0)
+
+
+def _jitter(key: UUID, salt: str = "") -> float:
+    """Valeur déterministe dans [0, 1) : stable d'un calcul à l'autre pour une même config."""
+    digest = hashlib.sha256(f"{key}:{salt}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+
+def _in_slot(slot: datetime, key: UUID) -> datetime:
+    """Minute déterministe à l'intérieur du créneau."""
+    return slot + timedelta(seconds=int(_jitter(key, "minute") * SLOT.total_seconds()))
+
+
+async def _slot_loads(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    organization_id: Optional[UUID] = None,
+    exclude_config_id: Optional[UUID] = None,
+) -> Tuple[Counter, Counter]:
+    """Checks actifs planifiés sur [start, end[ : (charge totale, charge de l'organisation) par créneau."""
+    query = (
+        select(MonitoringConfig.next_check_at, Audit.organization_id)
+        .join(Audit, Audit.id == MonitoringConfig.audit_id)
+        .where(
+            MonitoringConfig.is_active == True,  # noqa: E712
+            MonitoringConfig.next_check_at >= start,
+            MonitoringConfig.next_check_at < end,
+        )
+    )
+    if exclude_config_id is not None:
+        query = query.where(MonitoringConfig.id != exclude_config_id)
+    total: Counter = Counter()
+    per_org: Counter = Counter()
+    for row in (await db.execute(query)).all():
+        slot = _slot_start(row.next_check_at)
+        total[slot] += 1
+        if organization_id is not None and row.organization_id == organization_id:
+            per_org[slot] += 1
+    return total, per_org
+
+
+async def plan_next_check(
+    db: AsyncSession,
+    config: MonitoringConfig,
+    organization_id: UUID,
+    base: Optional[datetime] = None,
+    period: Optional[timedelta] = None,
+) -> datetime:
+    """
+    Prochaine échéance lissée pour config (base + period, déplacée dans la fenêtre).
+    period : frequency_days de la config par défaut (ex: report plus court d'un check).
+    """
+    base = _as_utc(base) or datetime.now(timezone.utc)
+    period = period or timedelta(days=config.frequency_days or 7)
+    target = base + period
+    spread = min(period * _SPREAD_RATIO, _MAX_SPREAD)
+    first, last = _slot_start(target - spread), _slot_start(target + spread)
+
+    total, per_org = await _slot_loads(
+        db, first, last + SLOT, organization_id, exclude_config_id=config.id
+    )
+    capacity = settings.MONITORING_SLOT_CAPACITY
+    slots = [first + SLOT * i for i in range(int((last - first) / SLOT) + 1)]
+    key = config.audit_id
+
+    def _cost(slot: datetime) -> tuple:
+        return (
+            total[slot] >= capacity,
+            per_org[slot],
+            total[slot],
+            abs((slot - _slot_start(target)) / SLOT),
+            _jitter(key, slot.isoformat()),
+        )
+
+    return _in_slot(min(slots, key=_cost), key)
+
+
+async def schedule_next_check(db: AsyncSession, config: MonitoringConfig, organization_id: UUID) -> None:
+    """Après un check : met à jour last_checked_at et planifie next_check_at (lissé)."""
+    now = datetime.now(timezone.utc)
+    config.last_checked_at = now
+    config.next_check_at = await plan_next_check(db, config, organization_id, base=now)
+
+
+def _round_robin(by_org: "OrderedDict[UUID, Deque]") -> List:
+    """Entrelace les files des organisations : une config de chaque, à tour de rôle."""
+    ordered = []
+    while by_org:
+        for org_id in list(by_org):
+            queue = by_org[org_id]
+            ordered.append(queue.popleft())
+            if not queue:
+                del by_org[org_id]
+    return ordered
+
+
+async def rebalance_backlog(db: AsyncSession, now: Optional[datetime] = None) -> int:
+    """
+    Étale le retard accumulé (panne, redéploiement) quand il dépasse la capacité
+    d'un créneau. Retourne le nombre de checks reportés.
+
+    Les configs sous bail valide (check en cours) ne sont pas touchées ; chaque
+    report est un UPDATE conditionnel sur l'ancienne échéance, sans effet si une
+    autre réplique a déjà déplacé ou pris la config.
+    """
+    now = _as_utc(now) or datetime.now(timezone.utc)
+    capacity = settings.MONITORING_SLOT_CAPACITY
+    rows = (await db.execute(
+        select(MonitoringConfig.id, MonitoringConfig.audit_id, MonitoringConfig.next_check_at, Audit.organization_id)
+        .join(Audit, Audit.id == MonitoringConfig.audit_id)
+        .where(
+            MonitoringConfig.is_active == True,  # noqa: E712
+            MonitoringConfig.next_check_at <= now,
+            or_(
+                MonitoringConfig.lease_owner.is_(None),
+                MonitoringConfig.lease_expires_at < now,
+            ),
+        )
+        .order_by(MonitoringConfig.next_check_at)
+    )).all()
+    if len(rows) <= capacity:
+        return 0
+
+    by_org: "OrderedDict[UUID, Deque]" = OrderedDict()
+    for row in rows:
+        by_org.setdefault(row.organization_id, deque()).append(row)
+    backlog = _round_robin(by_org)[capacity:]
+
+    current = _slot_start(now)
+    horizon = current + SLOT * (_BACKLOG_HORIZON_SLOTS + 1)
+    planned, _ = await _slot_loads(db, current + SLOT, horizon)
+
+    moved = 0
+    slot = current + SLOT
+    for index, row in enumerate(backlog):
+        while slot < horizon and planned[slot] >= capacity:
+            slot += SLOT
+        if slot >= horizon:
+            logger.warning(
+                f"Backlog monitoring : {len(backlog) - index} check(s) au-delà de l'horizon, laissés dus"
+            )
+            break
+        planned[slot] += 1
+        result = await db.execute(
+            update(MonitoringConfig)
+            .where(
+                MonitoringConfig.id == row.id,
+                MonitoringConfig.next_check_at == row.next_check_at,
+                or_(
+                    MonitoringConfig.lease_owner.is_(None),
+                    MonitoringConfig.lease_expires_at < now,
+                ),
+            )
+            .values(next_check_at=_in_slot(slot, row.audit_id))
+            .execution_options(synchronize_session=False)
+        )
+        moved += result.rowcount
+    await db.commit()
+
+    logger.info(f"Backlog monitoring : {len(rows)} checks en retard, {moved} reportés (capacité {capacity}/h)")
+    return moved
+
+
+async def projected_load(db: AsyncSession, hours: int = 168, now: Optional[datetime] = None) -> Dict:
+    """Histogramme de la charge prévue par créneau horaire (le retard compte dans le créneau courant)."""
+    now = _as_utc(now) or datetime.now(timezone.utc)
+    current = _slot_start(now)
+    end = current + SLOT * hours
+    rows = (await db.execute(
+        select(MonitoringConfig.next_check_at).where(
+            MonitoringConfig.is_active == True,  # noqa: E712
+            MonitoringConfig.next_check_at.is_not(None),
+            MonitoringConfig.next_check_at < end,
+        )
+    )).scalars().all()
+
+    counts: Counter = Counter(max(_slot_start(value), current) for value in rows)
+    slots = [
+        {"hour": (current + SLOT * i).isoformat(), "checks": counts[current + SLOT * i]}
+        for i in range(hours)
+    ]
+    values = [s["checks"] for s in slots]
+    return {
+        "capacity": settings.MONITORING_SLOT_CAPACITY,
+        "peak": max(values, default=0),
+        "average": round(sum(values) / len(values), 2) if values else 0.0,
+        "over_capacity_slots": sum(1 for v in values if v > settings.MONITORING_SLOT_CAPACITY),
+        "slots": slots,
+    }
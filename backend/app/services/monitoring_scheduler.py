@@ -0,0 +1,345 @@
+"""
+Scheduler du monitoring continu — dispatch des checks dus vers un pool borné.
+
+À chaque tick (APScheduler, toutes les heures, dans chaque process) :
+  1. Prise de bail sur les configs actives dont next_check_at est échu, les
+     plus en retard d'abord (les reports du tick précédent passent en tête),
+     par lots au fil de la libération du pool. Le bail (lease_owner /
+     lease_expires_at) est pris par SELECT … FOR UPDATE SKIP LOCKED puis
+     UPDATE conditionnel : plusieurs workers uvicorn ou réplicas se partagent
+     les checks, chacun n'étant exécuté qu'une fois par période.
+  2. Lancement concurrent via un pool borné :
+       - MONITORING_CONCURRENCY checks simultanés au total
+       - MONITORING_DOMAIN_CONCURRENCY checks simultanés par domaine
+         (ménage les sites audités et les quotas Firecrawl / Jina)
+       - plafond par organisation selon son plan ; à chaque place libre,
+         l'organisation la moins servie relativement à son poids passe
+         en premier (fair_share) — une agence qui surveille 200 sites ne
+         retarde pas les autres clients
+  3. Chaque check est borné par MONITORING_CHECK_TIMEOUT_SECONDS, le run entier
+     par MONITORING_RUN_DEADLINE_SECONDS : à l'échéance, plus aucun lancement
+     et les checks en cours sont annulés. Un heartbeat prolonge les baux
+     détenus tant que le run tourne.
+  4. En fin de run les baux sont rendus ; les configs non terminées gardent
+     leur next_check_at échu et sont reprises au tick suivant. Un process
+     mort laisse ses baux expirer (MONITORING_LEASE_SECONDS).
+  5. Les statistiques du run sont enregistrées dans monitoring_runs.
+
+En amont du tick, un retard supérieur à la capacité d'un créneau (panne) est
+étalé sur les créneaux suivants (monitoring_planner.rebalance_backlog).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Deque, Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+from uuid import UUID
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.models.audit import Audit
+from app.models.monitoring_config import MonitoringConfig
+from app.models.monitoring_run import MonitoringRun
+from app.models.organization import Organization
+from app.services import monitoring_service
+from app.services.fair_share import fair_key, plan_concurrency
+from app.services.jobs import worker_id
+from app.services.monitoring_planner import _as_utc, rebalance_backlog
+from app.utils.deadline import Deadline
+
+logger = logging.getLogger(__name__)
+
+SessionFactory = Callable[[], AsyncSession]
+
+# Baux pris d'avance (× taille du pool) : laisse au partage équitable un choix
+# entre organisations au lieu du seul ordre des échéances
+_LEASE_LOOKAHEAD = 4
+
+
+@dataclass
+class _DueCheck:
+    config_id: UUID
+    domain: str
+    next_check_at: Optional[datetime]
+    organization_id: Optional[UUID] = None
+    plan: Optional[str] = None
+
+
+def _domain_of(url: Optional[str]) -> str:
+    netloc = urlparse(url or "").netloc.lower()
+    return netloc[4:] if netloc.startswith("www.") else netloc
+
+
+def _lease_delta() -> timedelta:
+    return timedelta(seconds=settings.MONITORING_LEASE_SECONDS)
+
+
+def _leasable(now: datetime):
+    """Config due et sans bail valide (libre, ou bail expiré)."""
+    return and_(
+        MonitoringConfig.is_active == True,  # noqa: E712
+        MonitoringConfig.next_check_at <= now,
+        or_(
+            MonitoringConfig.lease_owner.is_(None),
+            MonitoringConfig.lease_expires_at < now,
+        ),
+    )
+
+
+async def _lease_due_checks(
+    session_factory: SessionFactory, owner: str, now: datetime, limit: int
+) -> List[_DueCheck]:
+    """
+    Prend le bail d'au plus `limit` configs dues, les plus en retard d'abord.
+
+    Postgres : FOR UPDATE SKIP LOCKED — deux réplicas ne verrouillent jamais
+    les mêmes lignes. SQLite (tests) ignore la clause ; l'UPDATE conditionnel
+    sur _leasable garantit seul l'exclusivité (écritures sérialisées).
+    """
+    while True:
+        async with session_factory() as db:
+            candidates = (await db.execute(
+                select(MonitoringConfig.id)
+                .where(_leasable(now))
+                .order_by(MonitoringConfig.next_check_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )).scalars().all()
+            if not candidates:
+                await db.commit()
+                return []
+
+            await db.execute(
+                update(MonitoringConfig)
+                .where(MonitoringConfig.id.in_(candidates), _leasable(now))
+                .values(lease_owner=owner, lease_expires_at=now + _lease_delta())
+                .execution_options(synchronize_session=False)
+            )
+            result = await db.execute(
+                select(
+                    MonitoringConfig.id,
+                    MonitoringConfig.next_check_at,
+                    Audit.website_url,
+                    Audit.organization_id,
+                    Organization.subscription_plan,
+                )
+                .join(Audit, Audit.id == MonitoringConfig.audit_id)
+                .outerjoin(Organization, Organization.id == Audit.organization_id)
+                .where(MonitoringConfig.id.in_(candidates), MonitoringConfig.lease_owner == owner)
+                .order_by(MonitoringConfig.next_check_at)
+            )
+            leased = [
+                _DueCheck(
+                    config_id=row.id,
+                    domain=_domain_of(row.website_url),
+                    next_check_at=_as_utc(row.next_check_at),
+                    organization_id=row.organization_id,
+                    plan=row.subscription_plan,
+                )
+                for row in result.all()
+            ]
+            await db.commit()
+        if leased:
+            return leased
+        # Lot entièrement pris par une autre réplique entre SELECT et UPDATE : suivant
+
+
+async def _release_leases(
+    session_factory: SessionFactory, owner: str, config_ids: Optional[Sequence[UUID]] = None
+) -> None:
+    """Rend les baux détenus par owner (tous, ou seulement config_ids)."""
+    query = update(MonitoringConfig).where(MonitoringConfig.lease_owner == owner)
+    if config_ids is not None:
+        query = query.where(MonitoringConfig.id.in_(config_ids))
+    try:
+        async with session_factory() as db:
+            await db.execute(
+                query.values(lease_owner=None, lease_expires_at=None)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+    except Exception as exc:
+        logger.warning(f"Scheduler monitoring : baux non rendus ({owner}), expiration naturelle : {exc}")
+
+
+async def _heartbeat(session_factory: SessionFactory, owner: str) -> None:
+    """Prolonge les baux détenus par owner tant que le run est en cours."""
+    interval = max(settings.MONITORING_LEASE_SECONDS / 3, 1)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory() as db:
+                await db.execute(
+                    update(MonitoringConfig)
+                    .where(MonitoringConfig.lease_owner == owner)
+                    .values(lease_expires_at=datetime.now(timezone.utc) + _lease_delta())
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        except Exception as exc:
+            logger.warning(f"Scheduler monitoring : heartbeat impossible ({owner}) : {exc}")
+
+
+async def _run_check(session_factory: SessionFactory, config_id: UUID, owner: str, timeout: float) -> int:
+    """Un check dans sa propre session, borné par timeout (budget propagé au scraping et au LLM)."""
+    deadline = Deadline.after(timeout)
+    async with session_factory() as db:
+        return await asyncio.wait_for(
+            monitoring_service.run_monitoring_check(config_id, db, lease_owner=owner, deadline=deadline),
+            timeout=timeout,
+        )
+
+
+async def run_due_monitoring_checks(
+    session_factory: SessionFactory = async_session,
+    concurrency: Optional[int] = None,
+    domain_concurrency: Optional[int] = None,
+    check_timeout: Optional[float] = None,
+    run_deadline: Optional[float] = None,
+    owner: Optional[str] = None,
+) -> Optional[MonitoringRun]:
+    """
+    Job scheduler : exécute en parallèle borné les checks de monitoring dus
+    dont ce process obtient le bail. Appelé toutes les heures par APScheduler,
+    dans chaque réplica. Retourne les statistiques du run (None si aucun
+    check n'a été obtenu).
+    """
+    concurrency = concurrency or settings.MONITORING_CONCURRENCY
+    domain_concurrency = domain_concurrency or settings.MONITORING_DOMAIN_CONCURRENCY
+    check_timeout = check_timeout or settings.MONITORING_CHECK_TIMEOUT_SECONDS
+    run_deadline = run_deadline or settings.MONITORING_RUN_DEADLINE_SECONDS
+    owner = owner or worker_id()
+
+    started_at = datetime.now(timezone.utc)
+    deadline = time.monotonic() + run_deadline
+
+    run = MonitoringRun(
+        started_at=started_at, due=0, started=0, completed=0, failed=0,
+        timed_out=0, carried_over=0, alerts_created=0, deadline_hit=False,
+    )
+    lags: List[float] = []
+    pending: Deque[_DueCheck] = deque()
+    running: Dict[asyncio.Task, _DueCheck] = {}
+    per_domain: Dict[str, int] = {}
+    per_org: Dict[Optional[UUID], int] = {}
+    served: Dict[Optional[UUID], int] = {}  # checks lancés par organisation sur ce run
+    exhausted = False
+
+    # Retard au-delà de la capacité d'un créneau (panne) : étalé sur les créneaux suivants
+    try:
+        async with session_factory() as db:
+            await rebalance_backlog(db, started_at)
+    except Exception as exc:
+        logger.error(f"Scheduler monitoring : lissage du backlog impossible : {exc}")
+
+    heartbeat_task = asyncio.create_task(_heartbeat(session_factory, owner))
+    try:
+        while True:
+            # Nouveau lot de baux quand le pool a de la place
+            if not exhausted and len(pending) < concurrency * _LEASE_LOOKAHEAD and time.monotonic() < deadline:
+                limit = concurrency * _LEASE_LOOKAHEAD - len(pending)
+                batch = await _lease_due_checks(
+                    session_factory, owner, datetime.now(timezone.utc), limit
+                )
+                exhausted = not batch
+                if batch and not run.due:
+                    logger.info(
+                        f"Scheduler monitoring ({owner}) : premiers checks dus obtenus "
+                        f"(pool {concurrency}, {domain_concurrency}/domaine)"
+                    )
+                pending.extend(batch)
+                run.due += len(batch)
+
+            # Lancer autant de checks que le permettent les plafonds global, par domaine
+            # et par organisation — la moins servie sur ce run selon son poids d'abord
+            while len(running) < concurrency and time.monotonic() < deadline:
+                launchable = [
+                    (position, c) for position, c in enumerate(pending)
+                    if per_domain.get(c.domain, 0) < domain_concurrency
+                    and per_org.get(c.organization_id, 0) < plan_concurrency(c.plan)
+                ]
+                if not launchable:
+                    break
+                _, item = min(
+                    launchable,
+                    key=lambda pc: (fair_key(served.get(pc[1].organization_id, 0), pc[1].plan), pc[0]),
+                )
+                pending.remove(item)
+                per_domain[item.domain] = per_domain.get(item.domain, 0) + 1
+                per_org[item.organization_id] = per_org.get(item.organization_id, 0) + 1
+                served[item.organization_id] = served.get(item.organization_id, 0) + 1
+                launched_at = datetime.now(timezone.utc)
+                if item.next_check_at is not None:
+                    lags.append(max((launched_at - item.next_check_at).total_seconds(), 0.0))
+                task = asyncio.create_task(
+                    _run_check(session_factory, item.config_id, owner, check_timeout)
+                )
+                running[task] = item
+                run.started += 1
+
+            if not running:
+                break  # plus rien à obtenir, ou échéance atteinte : le reste est reporté
+
+            remaining = deadline - time.monotonic()
+            done, _ = await asyncio.wait(
+                running, timeout=max(remaining, 0), return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if not done:
+                # Échéance du run : annuler les checks en cours, reportés au tick suivant
+                run.deadline_hit = True
+                for task in running:
+                    task.cancel()
+                await asyncio.gather(*running, return_exceptions=True)
+                run.carried_over += len(running)
+                running.clear()
+                break
+
+            for task in done:
+                item = running.pop(task)
+                per_domain[item.domain] -= 1
+                per_org[item.organization_id] -= 1
+                try:
+                    run.alerts_created += task.result()
+                    run.completed += 1
+                except asyncio.TimeoutError:
+                    run.timed_out += 1
+                    logger.warning(f"Monitoring {item.config_id} : timeout ({check_timeout}s)")
+                except Exception as exc:
+                    run.failed += 1
+                    logger.error(f"Erreur monitoring check {item.config_id}: {exc}")
+    finally:
+        heartbeat_task.cancel()
+        for task in running:
+            task.cancel()
+        await asyncio.gather(heartbeat_task, *running, return_exceptions=True)
+        await _release_leases(session_factory, owner)
+
+    if not run.due:
+        return None
+
+    run.carried_over += len(pending)
+    if pending:
+        run.deadline_hit = True
+    run.max_lag_seconds = max(lags, default=0.0)
+    run.avg_lag_seconds = sum(lags) / len(lags) if lags else 0.0
+    run.finished_at = datetime.now(timezone.utc)
+
+    async with session_factory() as db:
+        db.add(run)
+        await db.commit()
+
+    logger.info(
+        f"Scheduler monitoring terminé ({owner}) : {run.completed}/{run.due} ok, "
+        f"{run.failed} erreur(s), {run.timed_out} timeout(s), {run.carried_over} reporté(s), "
+        f"retard max {run.max_lag_seconds:.0f}s"
+    )
+    return run
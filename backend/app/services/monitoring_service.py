@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import asyncio
+import codecs
+import hashlib
 import json
 import logging
 import re
+import time
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 from uuid import UUID
 
@@ -16,43 +19,94 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.config import settings
-from app.database import async_session
 from app.models.audit import Audit
 from app.models.monitoring_alert import MonitoringAlert
 from app.models.monitoring_config import MonitoringConfig
+from app.models.organization import Organization
+from app.services.claim_index import ClaimIndex
+from app.services.monitoring_planner import plan_next_check, schedule_next_check
+from app.services.regulatory_classifier import _FUTURE_COMMITMENT_PATTERNS
+from app.services.scrape_profiles import (
+    OUTCOME_CONTENT,
+    OUTCOME_ERROR,
+    PathOutcome,
+    plan_paths,
+    record_outcomes,
+)
+from app.services.scrape_stats import scrape_stats
+from app.services.usage import check_usage_budget, metered, record_llm_usage, record_scrape
+from app.utils.deadline import Deadline, DeadlineExceeded, gather_within, stage_timeout
+from app.utils.blacklist import (
+    BLACKLIST_TERMS_NORMALIZED,
+    CARBON_NEUTRAL_TERMS,
+    LEGAL_REQUIREMENT_PATTERNS,
+    QUALIFICATION_PATTERNS,
+    _normalize,
+)
 
 logger = logging.getLogger(__name__)
 
 
-async def scrape_website(url: str) -> str:
+async def scrape_website(
+    url: str,
+    deadline: Optional[Deadline] = None,
+    db: Optional[AsyncSession] = None,
+) -> str:
     """
     Scrape le site via Firecrawl (crawl récursif automatique).
     Firecrawl découvre les pages RSE peu importe leur URL, exécute le JS
     et retourne du Markdown propre — fonctionne sur React/Next.js/Shopify.
-    Retourne le texte concaténé, limité à 15 000 caractères.
+    Retourne le texte concaténé, limité au budget du backend.
     Fallback sur Jina Reader si FIRECRAWL_API_KEY non configurée.
+    Le boilerplate répété entre pages (header, footer, menus) est retiré avant
+    la troncature au budget : il n'en consomme pas.
+    deadline : budget de l'opération — les timeouts de chaque requête en sont
+    dérivés ; à l'échéance, les pages déjà récupérées sont retournées.
+    db : si fourni, le profil du site (scrape_profiles) limite le scrape aux
+    chemins productifs et il est mis à jour avec les résultats (commit laissé
+    à l'appelant). Si les chemins productifs ne donnent plus rien (site refondu),
+    les autres chemins sont sondés dans la foulée.
     """
     if not url.startswith(("http://", "https://")):
         url = f"https://{url}"
 
-    if settings.FIRECRAWL_API_KEY:
-        return await _scrape_firecrawl(url)
-    return await _scrape_jina(url)
+    plan = await plan_paths(db, url, _FC_RSE_PATHS) if db is not None else None
+    outcomes: Dict[str, PathOutcome] = {}
+
+    async def _scrape(paths: Optional[List[str]], backends: Dict[str, str]) -> str:
+        if settings.FIRECRAWL_API_KEY:
+            return await _scrape_firecrawl(url, deadline, paths, backends, outcomes)
+        return await _scrape_jina(url, deadline, paths, outcomes)
 
+    page_text = await _scrape(plan.paths if plan else None, plan.backends if plan else {})
+    if (
+        plan is not None and plan.productive and plan.skipped and not page_text.strip()
+        and not (deadline is not None and deadline.should_stop("scrape"))
+    ):
+        logger.info(f"Profil de scraping périmé pour {url} : sonde des {len(plan.skipped)} autres chemins")
+        page_text = await _scrape(plan.skipped, {})
+    if db is not None:
+        await record_outcomes(db, url, outcomes)
+    return page_text
 
+
+# Mots entiers (ou préfixes en début de mot) : "rse" ne doit pas matcher course,
+# ni "vert" ouvert / couverture. Sert aux URLs du sitemap et au pré-filtre.
 _RSE_KEYWORDS = re.compile(
-    r"rse|durabilit|engagement|sustainab|environnement|climat|impact|"
-    r"ecolog|responsab|green|vert|carbone|carbon|biodiversit|recyclage|"
-    r"empreinte|transition|net.?zero|neutralit",
+    r"\b(?:rse|csr|esg|durabilit\w*|engagements?|sustainab\w*|environnement\w*|"
+    r"climat\w*|impacts?|[ée]colog\w*|responsabilit\w*|green|verte?s?|carbone|carbon|"
+    r"biodiversit\w*|recyclage|empreinte|transition|net.?z[ée]ro|neutralit\w*)\b",
     re.IGNORECASE,
 )
 
 
-async def _fetch_sitemap_urls(base_url: str) -> List[str]:
+async def _fetch_sitemap_urls(base_url: str, deadline: Optional[Deadline] = None) -> List[str]:
     """
     Récupère les URLs RSE depuis le sitemap XML du site.
     Essaie sitemap.xml puis sitemap_index.xml. Filtre par mots-clés RSE.
     Retourne au max 10 URLs pour ne pas surcharger Firecrawl.
+    Le XML est parsé au fil de l'eau et la lecture s'arrête à
+    SCRAPE_SITEMAP_MAX_BYTES (les URLs déjà lues sont gardées).
     """
     parsed = urlparse(base_url)
     root_url = f"{parsed.scheme}://{parsed.netloc}"
@@ -61,30 +115,90 @@ async def _fetch_sitemap_urls(base_url: str) -> List[str]:
 
     async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
         for sitemap_url in candidates:
+            if deadline is not None and deadline.should_stop("sitemap"):
+                break
             try:
-                resp = await client.get(sitemap_url)
-                if resp.status_code != 200:
-                    continue
-                root = ET.fromstring(resp.text)
-                # Gère les namespaces XML (xmlns="http://www.sitemaps.org/schemas/sitemap/0.9")
-                ns = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-                locs = [el.text for el in root.findall(".//sm:loc", ns) if el.text]
-                if not locs:
-                    # Fallback sans namespace
-                    locs = [el.text for el in root.findall(".//loc") if el.text]
+                async with client.stream(
+                    "GET", sitemap_url, timeout=stage_timeout(deadline, 10.0)
+                ) as resp:
+                    if resp.status_code != 200:
+                        continue
+                    locs, read = await _stream_sitemap_locs(resp, settings.SCRAPE_SITEMAP_MAX_BYTES)
 
                 rse_urls = [u for u in locs if _RSE_KEYWORDS.search(u)]
+                scrape_stats.record_bytes("sitemap", read, sum(len(u) for u in rse_urls[:10]))
                 logger.info(
                     f"Sitemap {sitemap_url} : {len(locs)} URLs, {len(rse_urls)} RSE"
                 )
                 if rse_urls:
                     break
+            except DeadlineExceeded:
+                break
             except Exception as exc:
                 logger.debug(f"Sitemap inaccessible ({sitemap_url}): {exc}")
 
     return rse_urls[:10]
 
 
+async def _stream_sitemap_locs(response: httpx.Response, max_bytes: int) -> Tuple[List[str], int]:
+    """
+    <loc> d'un sitemap lus au fil de l'eau (avec ou sans namespace), sans garder
+    l'arbre XML en mémoire. Retourne (URLs, octets lus).
+    """
+    parser = ET.XMLPullParser(events=("end",))
+    locs: List[str] = []
+    read = 0
+    try:
+        async for chunk in response.aiter_bytes():
+            chunk = chunk[: max_bytes - read]
+            read += len(chunk)
+            parser.feed(chunk)
+            for _, element in parser.read_events():
+                if element.tag == "loc" or element.tag.endswith("}loc"):
+                    if element.text:
+                        locs.append(element.text.strip())
+                element.clear()
+            if read >= max_bytes:
+                logger.info(f"Sitemap {response.url} tronqué à {max_bytes} octets")
+                break
+    except ET.ParseError as exc:
+        logger.debug(f"Sitemap mal formé ({response.url}): {exc}")
+    return locs, read
+
+
+async def _stream_text(response: httpx.Response, max_chars: int, max_bytes: int) -> Tuple[str, int]:
+    """
+    Corps décodé au fil de l'eau, arrêté dès max_chars caractères ou max_bytes
+    octets lus — une page énorme n'est jamais chargée en entier. Retourne
+    (texte, octets lus).
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parts: List[str] = []
+    chars = 0
+    read = 0
+    async for chunk in response.aiter_bytes():
+        chunk = chunk[: max_bytes - read]
+        read += len(chunk)
+        part = decoder.decode(chunk)
+        parts.append(part)
+        chars += len(part)
+        if chars >= max_chars or read >= max_bytes:
+            break
+    else:
+        parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)[:max_chars], read
+
+
+# Budgets de texte par scrape, appliqués après retrait du boilerplate inter-pages
+_FIRECRAWL_MAX_CHARS = 20000
+_JINA_MAX_CHARS = 8000
+# Lecture maximale d'une page : au-delà du budget, de quoi compenser le
+# boilerplate retiré ensuite
+_FIRECRAWL_PAGE_MAX_CHARS = 2 * _FIRECRAWL_MAX_CHARS
+
 _FC_RSE_PATHS = [
     "", "/rse", "/developpement-durable", "/engagement", "/engagements",
     "/sustainability", "/environnement",
@@ -94,87 +208,151 @@ _FC_RSE_PATHS = [
 ]
 
 
-async def _scrape_firecrawl(url: str) -> str:
+_FIRECRAWL_SCRAPE_URL = "https://api.firecrawl.dev/v2/scrape"
+
+
+def _firecrawl_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=20.0,
+        headers={"Authorization": f"Bearer {settings.FIRECRAWL_API_KEY}"},
+    )
+
+
+async def _fetch_firecrawl_page(
+    client: httpx.AsyncClient,
+    target_url: str,
+    timeout_s: float = 15.0,
+    redirects: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    Markdown d'une page via l'API Firecrawl (POST /v2/scrape), tronqué à
+    _FIRECRAWL_PAGE_MAX_CHARS. Client async : annuler la tâche (requête couverte
+    perdante, échéance) interrompt la requête HTTP. Lève une exception si
+    Firecrawl répond en erreur. redirects : reçoit l'URL finale si elle diffère.
     """
-    Scrape ciblé des pages RSE via Firecrawl (scrape() individuel par chemin,
+    response = await client.post(
+        _FIRECRAWL_SCRAPE_URL,
+        json={
+            "url": target_url,
+            "formats": ["markdown"],
+            "onlyMainContent": True,
+            "timeout": int(timeout_s * 1000),
+        },
+        timeout=timeout_s + 5.0,
+    )
+    record_scrape("firecrawl")
+    response.raise_for_status()
+    data = response.json().get("data") or {}
+    markdown = data.get("markdown") or ""
+    page = markdown[:_FIRECRAWL_PAGE_MAX_CHARS]
+    scrape_stats.record_bytes("firecrawl", len(response.content), len(page.encode()))
+    final_url = (data.get("metadata") or {}).get("url")
+    if redirects is not None and final_url and final_url.rstrip("/") != target_url.rstrip("/"):
+        redirects[target_url] = final_url
+    return page
+
+
+async def _scrape_firecrawl(
+    url: str,
+    deadline: Optional[Deadline] = None,
+    paths: Optional[List[str]] = None,
+    backends: Optional[Dict[str, str]] = None,
+    outcomes: Optional[Dict[str, PathOutcome]] = None,
+) -> str:
+    """
+    Scrape ciblé des pages RSE via Firecrawl (POST /v2/scrape par chemin,
     parallélisé). Firecrawl gère le rendu JS, les cookies et les protections bot.
     Fallback Jina si erreur ou clé manquante.
+    Timeout Firecrawl de chaque page = min(15 s, budget restant) ; les scrapes
+    inachevés à l'échéance sont abandonnés.
+    Chaque page est une requête couverte (_hedged_fetch) : Jina prend le relais
+    d'une page Firecrawl trop lente, le premier contenu exploitable est gardé.
+    paths : chemins à scraper (défaut _FC_RSE_PATHS) ; backends : backend à
+    solliciter en premier par chemin ; outcomes : rempli avec le résultat de
+    chaque chemin (profil du domaine).
     """
     try:
-        from firecrawl import FirecrawlApp
-
-        app = FirecrawlApp(api_key=settings.FIRECRAWL_API_KEY)
-
-        def _do_scrape(target_url: str) -> str:
-            result = app.scrape(
-                target_url,
-                formats=["markdown"],
-                only_main_content=True,
-                timeout=15000,
-            )
-            return getattr(result, "markdown", "") or ""
-
+        redirects: Dict[str, str] = {}
         base_url = url.rstrip("/")
 
         # Sitemap RSE discovery en parallèle des scrapes
-        sitemap_task = asyncio.create_task(_fetch_sitemap_urls(url))
+        sitemap_task = asyncio.create_task(_fetch_sitemap_urls(url, deadline))
 
         # Scrape ciblé — 8 premiers chemins en parallèle
+        paths = _FC_RSE_PATHS if paths is None else paths
+        backends = backends or {}
         target_urls = [
             f"{base_url}{p}" if p else base_url
-            for p in _FC_RSE_PATHS
+            for p in paths
         ]
-        scrape_tasks = [
-            asyncio.to_thread(_do_scrape, target_url)
-            for target_url in target_urls
-        ]
-        results = await asyncio.gather(*scrape_tasks, return_exceptions=True)
-
         sections: list = []
-        total = 0
         seen_urls: set = set()
 
-        for target_url, md in zip(target_urls, results):
-            if isinstance(md, Exception):
-                logger.debug(f"Firecrawl scrape failed ({target_url}): {md}")
-                continue
-            if not md or not md.strip():
-                continue
-            if _is_consent_or_bot_page(md):
-                logger.debug(f"Firecrawl skip consent/bot: {target_url}")
-                continue
-            sections.append(f"=== PAGE: {target_url} ===\n{md}")
-            seen_urls.add(target_url)
-            total += len(md)
-            if total >= 20000:
-                break
-
-        # Ajouter les URLs RSE du sitemap non couvertes
-        sitemap_urls = await sitemap_task
-        extra = [u for u in sitemap_urls if u not in seen_urls]
-        for extra_url in extra[:5]:
-            if total >= 20000:
-                break
-            try:
-                md = await asyncio.to_thread(_do_scrape, extra_url)
-                if md and md.strip() and not _is_consent_or_bot_page(md):
-                    sections.append(f"=== PAGE: {extra_url} ===\n{md}")
-                    total += len(md)
-                    logger.info(f"Firecrawl sitemap extra: {extra_url}")
-            except Exception as exc:
-                logger.debug(f"Firecrawl sitemap scrape failed ({extra_url}): {exc}")
+        async with _jina_client() as jina, _firecrawl_client() as fc:
+
+            def _hedged(target_url: str, timeout_s: float, preferred: Optional[str] = None, reports=None):
+                firecrawl = ("firecrawl", lambda: _fetch_firecrawl_page(fc, target_url, timeout_s, redirects))
+                jina_fetch = ("jina", lambda: _fetch_jina_page(jina, target_url, deadline, _FIRECRAWL_PAGE_MAX_CHARS))
+                if preferred == "jina":
+                    firecrawl, jina_fetch = jina_fetch, firecrawl
+                return _hedged_fetch(firecrawl, jina_fetch, deadline, reports)
+
+            page_timeout = stage_timeout(deadline, 15.0)
+            reports: Dict[str, List[PathOutcome]] = {path: [] for path in paths}
+            results = await gather_within(deadline, [
+                _hedged(target_url, page_timeout, backends.get(path), reports[path])
+                for path, target_url in zip(paths, target_urls)
+            ])
+            if outcomes is not None:
+                for path, target_url in zip(paths, target_urls):
+                    if reports[path]:
+                        outcomes[path] = _path_outcome(reports[path], redirects.get(target_url))
+
+            for target_url, md in zip(target_urls, results):
+                if isinstance(md, Exception):
+                    logger.debug(f"Firecrawl scrape failed ({target_url}): {md}")
+                    continue
+                if not md:
+                    continue
+                sections.append(f"=== PAGE: {target_url} ===\n{md}")
+                seen_urls.add(target_url)
+            # Budget compté sans le boilerplate : les pages suivantes le comblent
+            total = len(_join_pages(sections))
+
+            # Ajouter les URLs RSE du sitemap non couvertes
+            sitemap_urls = await sitemap_task
+            extra = [u for u in sitemap_urls if u not in seen_urls]
+            for extra_url in extra[:5]:
+                if total >= _FIRECRAWL_MAX_CHARS:
+                    break
+                if deadline is not None and deadline.should_stop("firecrawl"):
+                    break
+                try:
+                    timeout_s = stage_timeout(deadline, 15.0)
+                    md = await asyncio.wait_for(_hedged(extra_url, timeout_s), timeout=timeout_s + 1)
+                    if md:
+                        sections.append(f"=== PAGE: {extra_url} ===\n{md}")
+                        total = len(_join_pages(sections))
+                        logger.info(f"Firecrawl sitemap extra: {extra_url}")
+                except DeadlineExceeded:
+                    if deadline is not None and deadline.cancelled:
+                        raise
+                    break
+                except Exception as exc:
+                    logger.debug(f"Firecrawl sitemap scrape failed ({extra_url}): {exc}")
 
         if not sections:
             logger.warning(f"Firecrawl: aucun contenu RSE accessible pour {url}, fallback Jina")
-            return await _scrape_jina(url)
+            return await _scrape_jina(url, deadline, paths, outcomes)
 
-        collected = "\n\n".join(sections)
         logger.info(f"Firecrawl: {len(sections)} page(s) RSE — {url}")
-        return collected[:20000]
+        return _join_pages(sections, url)[:_FIRECRAWL_MAX_CHARS]
 
+    except DeadlineExceeded:
+        raise
     except Exception as exc:
         logger.error(f"Erreur Firecrawl pour {url}: {exc} — fallback Jina")
-        return await _scrape_jina(url)
+        return await _scrape_jina(url, deadline, paths, outcomes)
 
 
 _CONSENT_OR_BOT_RE = re.compile(
@@ -194,56 +372,84 @@ _NOT_FOUND_RE = re.compile(
 )
 
 
-def _is_consent_or_bot_page(text: str) -> bool:
+def _page_outcome(text: str) -> str:
+    """Nature d'une page scrapée : content, consent (consent/bot wall), empty ou not_found."""
     snippet = text[:1000]
     if bool(_CONSENT_OR_BOT_RE.search(snippet)):
-        return True
+        return "consent"
     # Contenus trop courts (navigation seule, redirect, texte vide)
     if len(text.strip()) < 80:
-        return True
+        return "empty"
     if bool(_NOT_FOUND_RE.search(snippet)):
-        return True
-    return False
+        return "not_found"
+    return OUTCOME_CONTENT
 
 
-async def _scrape_jina(url: str) -> str:
-    """Fallback Jina Reader — chemins RSE étendus, skip des pages consent/bot."""
-    _RSE_PATHS = [
-        "", "/rse", "/developpement-durable", "/engagement", "/engagements",
-        "/sustainability", "/environnement",
-        "/nos-engagements", "/responsabilite", "/responsabilite-societale",
-        "/impact", "/notre-impact", "/csr", "/esg",
-        "/developpement-responsable", "/engagements-environnementaux",
-    ]
+def _is_consent_or_bot_page(text: str) -> bool:
+    return _page_outcome(text) != OUTCOME_CONTENT
+
+
+# Résultat retenu pour le profil quand aucun backend n'a fourni de contenu
+_OUTCOME_RANK = ("not_found", "consent", "empty", OUTCOME_ERROR)
+
+
+def _path_outcome(reports: List[PathOutcome], redirect_to: Optional[str] = None) -> PathOutcome:
+    """Synthèse des réponses des backends pour un chemin (contenu s'il y en a eu un)."""
+    best = min(
+        reports,
+        key=lambda r: -1 if r.outcome == OUTCOME_CONTENT else _OUTCOME_RANK.index(r.outcome),
+    )
+    return PathOutcome(best.outcome, best.size, best.backend, redirect_to)
+
+
+async def _scrape_jina(
+    url: str,
+    deadline: Optional[Deadline] = None,
+    paths: Optional[List[str]] = None,
+    outcomes: Optional[Dict[str, PathOutcome]] = None,
+) -> str:
+    """
+    Fallback Jina Reader — chemins RSE étendus, skip des pages consent/bot.
+    Timeout de chaque requête = min(20 s, budget restant) ; à l'échéance, les
+    pages déjà lues sont retournées.
+    Chaque page est lue jusqu'à _JINA_MAX_CHARS : le budget restant n'est
+    connu qu'une fois le boilerplate commun aux pages retiré.
+    paths / outcomes : comme _scrape_firecrawl.
+    """
+    outcomes = {} if outcomes is None else outcomes
     base_url = url.rstrip("/")
     sections: list = []
-    total = 0
     skipped_consent = 0
 
-    async with httpx.AsyncClient(
-        timeout=20.0,
-        follow_redirects=True,
-        headers={"Accept": "text/plain", "X-Return-Format": "text"},
-    ) as client:
-        for path in _RSE_PATHS:
+    async with _jina_client() as client:
+        for path in _FC_RSE_PATHS if paths is None else paths:
+            if deadline is not None and deadline.should_stop("jina"):
+                logger.warning(f"Jina: budget épuisé pour {url}, {len(sections)} page(s) conservée(s)")
+                break
             page_url = f"{base_url}{path}" if path else base_url
-            target = f"https://r.jina.ai/{page_url}"
+            started = time.monotonic()
             try:
-                response = await client.get(target)
-                if response.status_code != 200:
-                    continue
-                text = response.text.strip()
+                text = await _fetch_jina_page(client, page_url, deadline, _JINA_MAX_CHARS)
+                outcome = _page_outcome(text) if text else "not_found"
+                usable = outcome == OUTCOME_CONTENT
+                scrape_stats.record("jina", time.monotonic() - started, ok=usable)
+                outcomes[path] = PathOutcome(outcome, len(text) if usable else 0, "jina")
                 if not text:
                     continue
-                if _is_consent_or_bot_page(text):
+                if not usable:
                     skipped_consent += 1
                     logger.debug(f"Jina skip consent/bot page: {page_url}")
                     continue
                 sections.append(f"=== PAGE: {page_url} ===\n{text}")
-                total += len(text)
-                if total >= 8000:
+                if len(_join_pages(sections)) >= _JINA_MAX_CHARS:
                     break
+            except DeadlineExceeded:
+                if deadline is not None and deadline.cancelled:
+                    raise
+                break
             except Exception as exc:
+                scrape_stats.record("jina", time.monotonic() - started, ok=False)
+                outcomes[path] = PathOutcome(OUTCOME_ERROR, backend="jina")
                 logger.debug(f"Jina impossible pour {page_url}: {exc}")
                 continue
 
@@ -254,7 +460,143 @@ async def _scrape_jina(url: str) -> str:
             "Conseil : utiliser l'URL directe de la page RSE du site."
         )
 
-    return "\n\n".join(sections)[:8000]
+    return _join_pages(sections, url)[:_JINA_MAX_CHARS]
+
+
+def _jina_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=20.0,
+        follow_redirects=True,
+        headers={"Accept": "text/plain", "X-Return-Format": "text"},
+    )
+
+
+async def _fetch_jina_page(
+    client: httpx.AsyncClient,
+    page_url: str,
+    deadline: Optional[Deadline] = None,
+    max_chars: int = _JINA_MAX_CHARS,
+) -> str:
+    """
+    Texte d'une page via Jina Reader ("" si statut non 200), lu en flux et
+    limité à max_chars caractères / SCRAPE_PAGE_MAX_BYTES octets.
+    """
+    async with client.stream(
+        "GET", f"https://r.jina.ai/{page_url}", timeout=stage_timeout(deadline, 20.0)
+    ) as response:
+        record_scrape("jina")
+        if response.status_code != 200:
+            return ""
+        text, read = await _stream_text(response, max_chars, settings.SCRAPE_PAGE_MAX_BYTES)
+    text = text.strip()
+    scrape_stats.record_bytes("jina", read, len(text.encode()))
+    return text
+
+
+# ---------------------------------------------------------------------------
+# Requêtes couvertes (hedged) — Firecrawl et Jina en course sur une même page
+# ---------------------------------------------------------------------------
+
+# Délai adaptatif : p90 des latences Firecrawl dès qu'elles sont assez nombreuses,
+# soit ~10 % de pages doublées au lieu de 100 %
+_HEDGE_MIN_SAMPLES = 20
+_HEDGE_PERCENTILE = 0.9
+_HEDGE_DELAY_BOUNDS = (0.5, 15.0)
+
+_Backend = Tuple[str, Callable[[], Awaitable[str]]]
+
+
+def hedge_delay(backend: str = "firecrawl") -> float:
+    """Attente avant la requête de secours : percentile des latences récentes, sinon la valeur configurée."""
+    if scrape_stats.samples(backend) >= _HEDGE_MIN_SAMPLES:
+        low, high = _HEDGE_DELAY_BOUNDS
+        return min(max(scrape_stats.percentile(backend, _HEDGE_PERCENTILE), low), high)
+    return settings.SCRAPE_HEDGE_DELAY_SECONDS
+
+
+async def _timed(
+    backend: str,
+    fetch: Callable[[], Awaitable[str]],
+    reports: Optional[List[PathOutcome]] = None,
+) -> Optional[str]:
+    """
+    Exécute fetch en mesurant sa latence ; None si erreur ou contenu inexploitable.
+    reports : reçoit le résultat (PathOutcome) de la requête.
+    """
+    reports = [] if reports is None else reports
+    started = time.monotonic()
+    try:
+        text = await fetch()
+    except asyncio.CancelledError:
+        raise
+    except DeadlineExceeded:
+        raise
+    except Exception as exc:
+        scrape_stats.record(backend, time.monotonic() - started, ok=False)
+        reports.append(PathOutcome(OUTCOME_ERROR, backend=backend))
+        logger.debug(f"Scrape {backend} échoué : {exc}")
+        return None
+    outcome = _page_outcome(text) if text and text.strip() else "not_found"
+    usable = outcome == OUTCOME_CONTENT
+    scrape_stats.record(backend, time.monotonic() - started, ok=usable)
+    reports.append(PathOutcome(outcome, len(text) if usable else 0, backend))
+    return text if usable else None
+
+
+async def _hedged_fetch(
+    primary: _Backend,
+    secondary: Optional[_Backend] = None,
+    deadline: Optional[Deadline] = None,
+    reports: Optional[List[PathOutcome]] = None,
+) -> Optional[str]:
+    """
+    Requête couverte sur une page : primary tout de suite, secondary si primary
+    n'a pas répondu après hedge_delay(). Le premier contenu exploitable (ni vide,
+    ni consent/bot, ni 404) gagne et l'autre requête est annulée : les deux
+    backends sont des requêtes httpx async, l'annulation les interrompt.
+
+    Un échec rapide de primary ne déclenche pas le secours : sur les chemins
+    inexistants (la majorité de _FC_RSE_PATHS) le coût n'est pas doublé, et le
+    fallback Jina complet reste assuré par _scrape_firecrawl.
+    Retourne None si aucun backend n'a fourni de contenu exploitable à temps.
+    reports : reçoit le résultat de chaque requête terminée.
+    """
+    name, fetch = primary
+    pending = {asyncio.create_task(_timed(name, fetch, reports)): name}
+    hedge_at = hedge_delay(name) if secondary is not None and settings.SCRAPE_HEDGING else None
+    started = time.monotonic()
+    raced = False
+    try:
+        while pending:
+            timeout = None
+            if hedge_at is not None:
+                timeout = max(hedge_at - (time.monotonic() - started), 0.0)
+            if deadline is not None:
+                remaining = deadline.remaining()
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                backend = pending.pop(task)
+                text = task.result()
+                if text is not None:
+                    if raced:
+                        scrape_stats.win(backend)
+                    return text
+            if deadline is not None and deadline.should_stop("scrape"):
+                return None
+            if hedge_at is not None and pending and time.monotonic() - started >= hedge_at:
+                name, fetch = secondary
+                scrape_stats.hedged(name)
+                pending[asyncio.create_task(_timed(name, fetch, reports))] = name
+                hedge_at = None
+                raced = True
+        return None
+    finally:
+        for task, backend in pending.items():
+            task.cancel()
+            scrape_stats.cancelled(backend)
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
 
 
 # ---------------------------------------------------------------------------
@@ -421,6 +763,205 @@ def filter_false_positives(claims: List[str], company_name: str = "") -> List[st
 _PAGE_MARKER_RE = re.compile(r"=== PAGE: (https?://\S+) ===")
 
 
+# ---------------------------------------------------------------------------
+# Boilerplate inter-pages — header, footer, menus, bandeaux cookies
+# ---------------------------------------------------------------------------
+
+# Un shingle (ligne normalisée) présent sur au moins N pages est du boilerplate
+_BOILERPLATE_MIN_PAGES = 2
+# Lignes trop courtes pour être hashées de façon fiable (puces, séparateurs)
+_BOILERPLATE_MIN_LINE_CHARS = 3
+
+
+def _join_pages(sections: List[str], url: str = "") -> str:
+    """Sections "=== PAGE: url ===" concaténées, boilerplate inter-pages retiré (avant toute troncature)."""
+    return strip_cross_page_boilerplate("\n\n".join(sections), url=url)
+
+
+def _shingle_hash(line: str) -> Optional[bytes]:
+    """Hash d'une ligne normalisée (casse, espaces, puces markdown), None si trop courte."""
+    norm = re.sub(r"[\s\u00a0]+", " ", line.lower()).strip(" #*->|_`[]()")
+    if len(norm) < _BOILERPLATE_MIN_LINE_CHARS:
+        return None
+    return hashlib.blake2b(norm.encode("utf-8"), digest_size=8).digest()
+
+
+def strip_cross_page_boilerplate(page_text: str, url: str = "") -> str:
+    """
+    Supprime les lignes répétées entre les sections (=== PAGE: url ===) d'un même scrape.
+
+    Chaque ligne est hashée puis comptée une fois par page. Les lignes présentes
+    sur au moins _BOILERPLATE_MIN_PAGES pages ne sont conservées qu'à leur
+    première occurrence : une allégation placée dans le footer reste extraite
+    une fois, mais n'est plus envoyée au modèle pour chaque page.
+    url : si fourni, le gain est journalisé.
+    """
+    parts = _PAGE_MARKER_RE.split(page_text)
+    if len(parts) < 5:  # moins de 2 pages — rien à comparer
+        return page_text
+
+    sections = [(parts[i], parts[i + 1]) for i in range(1, len(parts) - 1, 2)]
+
+    pages_per_shingle: dict = {}
+    for _, content in sections:
+        for h in {_shingle_hash(line) for line in content.splitlines()}:
+            if h is not None:
+                pages_per_shingle[h] = pages_per_shingle.get(h, 0) + 1
+
+    emitted: set = set()
+    cleaned: list = []
+    for page_url, content in sections:
+        kept_lines: list = []
+        for line in content.splitlines():
+            h = _shingle_hash(line)
+            if h is not None and pages_per_shingle.get(h, 0) >= _BOILERPLATE_MIN_PAGES:
+                if h in emitted:
+                    continue
+                emitted.add(h)
+            kept_lines.append(line)
+        body = re.sub(r"\n{3,}", "\n\n", "\n".join(kept_lines)).strip()
+        if body:
+            cleaned.append(f"=== PAGE: {page_url} ===\n{body}")
+
+    result = parts[0].strip()
+    result = "\n\n".join(([result] if result else []) + cleaned)
+
+    before, after = len(page_text), len(result)
+    if url and before:
+        logger.info(
+            f"Boilerplate inter-pages {url} : {before} → {after} caractères "
+            f"(-{(before - after) * 100 // before}%, {len(sections)} page(s))"
+        )
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Pré-filtre lexical — n'envoyer au modèle que les paragraphes candidats
+# ---------------------------------------------------------------------------
+
+# Vocabulaires EmpCo (blacklist.py) compilés une fois — blacklist et carbone
+# sont recherchés sur le texte normalisé (sans accents, minuscules)
+_BLACKLIST_RE = re.compile(
+    r"\b(" + "|".join(re.escape(norm) for norm, _ in BLACKLIST_TERMS_NORMALIZED) + r")s?\b"
+)
+# Termes génériques EmpCo aussi courants hors allégation ("responsables de votre
+# commande") : famille "generic", qui ne suffit pas seule au pré-filtre
+_GENERIC_BLACKLIST_TERMS = {"responsable", "responsible", "ethique", "ethical", "conscient", "conscious"}
+_CARBON_NEUTRAL_RE = re.compile(
+    "|".join(re.escape(_normalize(t)) for t in CARBON_NEUTRAL_TERMS)
+)
+_LEGAL_REQUIREMENT_RE = re.compile("|".join(LEGAL_REQUIREMENT_PATTERNS), re.IGNORECASE)
+_FUTURE_COMMITMENT_RE = re.compile("|".join(_FUTURE_COMMITMENT_PATTERNS), re.IGNORECASE)
+_QUALIFICATION_RE = re.compile("|".join(QUALIFICATION_PATTERNS), re.IGNORECASE)
+# Allégations de matière ou de filière (bio, recyclé, compostable, renouvelable) :
+# à elles seules des allégations environnementales spécifiques
+_MATERIAL_CLAIM_RE = re.compile(
+    r"\b(?:recycl|r[ée]employ|r[ée]utilis|upcycl|compost|biolog|bio\b|organic|"
+    r"renouvelable|renewable)",
+    re.IGNORECASE,
+)
+# Autres thèmes d'allégations absents des listes EmpCo (énergie, déchets, labels…)
+_CLAIM_TOPIC_RE = re.compile(
+    r"\b(?:solaire|solar|[ée]olien|co2\b|[ée]mission|"
+    r"plastique|plastic|d[ée]chet|waste|label|certifi|[ée]co-?label|planète|planet|"
+    r"for[êe]t|forest|oc[ée]an|eaux?\b|water)",
+    re.IGNORECASE,
+)
+
+# Un paragraphe est envoyé au modèle s'il porte un signal fort (vocabulaire EmpCo,
+# allégation de matière) ou au moins _PREFILTER_MIN_SCORE familles : un mot RSE
+# isolé ("responsable de votre commande", "impact") relève du texte de boutique
+_PREFILTER_STRONG_SIGNALS = {"blacklist", "carbon", "legal", "material"}
+_PREFILTER_MIN_SCORE = 2
+# Paragraphes voisins conservés de part et d'autre d'un paragraphe pertinent
+_PREFILTER_CONTEXT = 1
+# Au-delà, un paragraphe (texte sans lignes vides) est découpé ligne par ligne
+_PREFILTER_MAX_PARAGRAPH_CHARS = 800
+
+
+def _lexical_signals(text: str) -> set:
+    """Familles de vocabulaire environnemental présentes dans le texte."""
+    signals = set()
+    normalized = _normalize(text)
+    blacklisted = {m.group(1) for m in _BLACKLIST_RE.finditer(normalized)}
+    if blacklisted - _GENERIC_BLACKLIST_TERMS:
+        signals.add("blacklist")
+    elif blacklisted:
+        signals.add("generic")
+    if _CARBON_NEUTRAL_RE.search(normalized):
+        signals.add("carbon")
+    if _LEGAL_REQUIREMENT_RE.search(text):
+        signals.add("legal")
+    if _FUTURE_COMMITMENT_RE.search(text):
+        signals.add("future")
+    if _RSE_KEYWORDS.search(text):
+        signals.add("rse")
+    if _MATERIAL_CLAIM_RE.search(text):
+        signals.add("material")
+    if _CLAIM_TOPIC_RE.search(text):
+        signals.add("topic")
+    if _QUALIFICATION_RE.search(text):
+        signals.add("qualification")
+    return signals
+
+
+def _relevance_score(text: str) -> int:
+    """Nombre de familles détectées — une qualification seule (ex: "-30%") ne compte pas."""
+    signals = _lexical_signals(text)
+    if signals == {"qualification"}:
+        return 0
+    return len(signals)
+
+
+def _is_relevant(paragraph: str) -> bool:
+    signals = _lexical_signals(paragraph)
+    if signals & _PREFILTER_STRONG_SIGNALS:
+        return True
+    return _relevance_score(paragraph) >= _PREFILTER_MIN_SCORE
+
+
+def _split_paragraphs(content: str) -> List[str]:
+    paragraphs: List[str] = []
+    for block in re.split(r"\n\s*\n", content):
+        block = block.strip()
+        if not block:
+            continue
+        if len(block) > _PREFILTER_MAX_PARAGRAPH_CHARS:
+            paragraphs.extend(line.strip() for line in block.splitlines() if line.strip())
+        else:
+            paragraphs.append(block)
+    return paragraphs
+
+
+def prefilter_relevant_paragraphs(text: str) -> str:
+    """
+    Conserve les paragraphes lexicalement pertinents (signal fort, ou score >=
+    _PREFILTER_MIN_SCORE) et leurs voisins immédiats (_PREFILTER_CONTEXT). Les marqueurs === PAGE: url ===
+    sont conservés pour les sections qui gardent du contenu.
+    Retourne une chaîne vide si aucun paragraphe n'est pertinent.
+    """
+    parts = _PAGE_MARKER_RE.split(text)
+    if len(parts) >= 3:
+        sections = [(parts[i], parts[i + 1]) for i in range(1, len(parts) - 1, 2)]
+    else:
+        sections = [(None, text)]
+
+    kept_sections: List[str] = []
+    for page_url, content in sections:
+        paragraphs = _split_paragraphs(content)
+        keep: set = set()
+        for i, paragraph in enumerate(paragraphs):
+            if _is_relevant(paragraph):
+                keep.update(range(i - _PREFILTER_CONTEXT, i + _PREFILTER_CONTEXT + 1))
+        kept = [p for i, p in enumerate(paragraphs) if i in keep]
+        if not kept:
+            continue
+        body = "\n\n".join(kept)
+        kept_sections.append(f"=== PAGE: {page_url} ===\n{body}" if page_url else body)
+
+    return "\n\n".join(kept_sections)
+
+
 _FR_STOPWORDS = {
     "le", "la", "les", "un", "une", "des", "de", "du", "et", "ou", "en",
     "sur", "par", "pour", "avec", "sans", "dans", "au", "aux", "ce", "cet",
@@ -486,19 +1027,122 @@ def _find_source_url(claim_text: str, scraped_text: str) -> Optional[str]:
     return best_url if best_score >= threshold else None
 
 
+# ---------------------------------------------------------------------------
+# Extracteur lexical — déterministe, sans appel API
+# ---------------------------------------------------------------------------
+
+# Familles suffisantes seules ; "future" et "qualification" exigent un thème environnemental
+_LEXICAL_STRONG_SIGNALS = {"blacklist", "generic", "carbon", "legal"}
+_LEXICAL_WEAK_SIGNALS = {"future", "qualification"}
+_LEXICAL_TOPIC_SIGNALS = {"rse", "topic", "material"}
+
+_LEXICAL_MIN_CHARS = 20
+_LEXICAL_MAX_CHARS = 120  # même troncature que celle demandée au modèle
+
+_MD_IMAGE_RE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_MD_LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_MD_LINE_PREFIX_RE = re.compile(r"^\s*(?:#{1,6}|[-*+>|]|\d+[.)])\s+")
+_MD_EMPHASIS_RE = re.compile(r"(\*\*|__|\*|`)")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+(?=[A-ZÀ-ÖØ-Ý«\"])")
+
+
+def _iter_sentences(text: str):
+    for line in text.splitlines():
+        if _PAGE_MARKER_RE.search(line):
+            continue
+        line = _MD_IMAGE_RE.sub(" ", line)
+        line = _MD_LINK_RE.sub(r"\1", line)
+        line = _MD_LINE_PREFIX_RE.sub("", line)
+        line = _MD_EMPHASIS_RE.sub("", line)
+        line = re.sub(r"\s+", " ", line).strip(" |")
+        if not line:
+            continue
+        for sentence in _SENTENCE_SPLIT_RE.split(line):
+            sentence = sentence.strip()
+            if len(sentence) >= _LEXICAL_MIN_CHARS:
+                yield sentence
+
+
+def _is_lexical_claim(sentence: str) -> bool:
+    signals = _lexical_signals(sentence)
+    if signals & _LEXICAL_STRONG_SIGNALS:
+        return True
+    return bool(signals & _LEXICAL_WEAK_SIGNALS and signals & _LEXICAL_TOPIC_SIGNALS)
+
+
+def extract_claims_lexical(
+    text: str,
+    existing_claims: Optional[List[str]] = None,
+    audited_company_name: str = "",
+) -> list:
+    """
+    Extraction déterministe des allégations environnementales, sans appel API.
+    Découpe le texte scrapé en phrases et conserve celles qui déclenchent les
+    matchers blacklist, neutralité carbone ou exigence légale — ou un engagement
+    futur / une qualification chiffrée portant sur un thème environnemental.
+    Même format de sortie que extract_claims_with_claude().
+    """
+    if not text.strip():
+        return []
+
+    index = ClaimIndex(existing_claims or [])
+    candidates: List[str] = []
+    for sentence in _iter_sentences(text):
+        if not _is_lexical_claim(sentence):
+            continue
+        if len(sentence) > _LEXICAL_MAX_CHARS:
+            sentence = sentence[:_LEXICAL_MAX_CHARS].rsplit(" ", 1)[0] + "…"
+        if index.contains(sentence):
+            continue
+        index.add(sentence)
+        candidates.append(sentence)
+
+    filtered = filter_false_positives(candidates, company_name=audited_company_name)
+    logger.info(f"Extraction lexicale : {len(filtered)} allégation(s) sur {len(candidates)} candidate(s)")
+    return [
+        {"claim_text": c, "source_url": _find_source_url(c, text)}
+        for c in filtered
+    ]
+
+
+# Timeout maximal d'un appel d'extraction Claude (réduit au budget restant)
+_LLM_TIMEOUT_SECONDS = 60.0
+
+
 async def extract_claims_with_claude(
     text: str,
     existing_claims: List[str],
     audited_company_name: str = "",
     audited_website_url: str = "",
+    lexical_fallback: bool = False,
+    deadline: Optional[Deadline] = None,
 ) -> list:
     """
     Utilise Claude Haiku pour extraire les nouvelles allégations environnementales.
-    Retourne uniquement les claims absentes de existing_claims.
+    Retourne uniquement les claims absentes de existing_claims — filtrées après
+    l'appel par ClaimIndex (empreinte + quasi-doublons), elles ne sont pas
+    envoyées dans le prompt.
     audited_company_name et audited_website_url permettent à Haiku de discriminer
     les allégations auto-attribuées des mentions de marques tierces.
+    lexical_fallback : si la clé API est absente ou que l'appel échoue, bascule sur
+    extract_claims_lexical() au lieu de retourner une liste vide.
+    deadline : l'appel Claude est borné par le budget restant (_LLM_TIMEOUT_SECONDS
+    au plus) ; une annulation est propagée, pas rattrapée par le fallback.
     """
-    if not settings.ANTHROPIC_API_KEY or not text.strip():
+    if not text.strip():
+        return []
+    if deadline is not None:
+        deadline.check("extraction")
+    if not settings.ANTHROPIC_API_KEY:
+        if lexical_fallback:
+            return extract_claims_lexical(text, existing_claims, audited_company_name)
+        return []
+
+    relevant_text = prefilter_relevant_paragraphs(text)
+    logger.info(
+        f"Pré-filtre lexical : {len(text)} → {len(relevant_text)} caractères envoyés au modèle"
+    )
+    if not relevant_text.strip():
         return []
 
     try:
@@ -506,12 +1150,6 @@ async def extract_claims_with_claude(
 
         client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
 
-        existing_str = (
-            "\n".join(f"- {c}" for c in existing_claims)
-            if existing_claims
-            else "Aucune"
-        )
-
         company_name = audited_company_name or "l'entreprise auditée"
         company_url = audited_website_url or "inconnue"
         company_header = f"""ENTREPRISE AUDITÉE : {company_name}
@@ -603,13 +1241,10 @@ Copie chaque allégation EXACTEMENT telle qu'elle apparaît dans le texte de la
 Si le passage est trop long (plus de 120 caractères), garde le début exact et coupe avec "…".
 N'invente pas, ne reformule pas, ne résume pas.
 
-Allégations déjà connues (ne pas les répéter) :
-{existing_str}
-
 Texte du site :
-{text}
+{relevant_text}
 
-Retourne UNIQUEMENT les nouvelles allégations environnementales au format JSON :
+Retourne UNIQUEMENT les allégations environnementales au format JSON :
 {{"claims": ["allégation 1", "allégation 2"]}}
 
 Si aucune allégation environnementale, retourne : {{"claims": []}}
@@ -619,7 +1254,9 @@ Réponds UNIQUEMENT avec le JSON, sans texte autour."""
             model="claude-haiku-4-5-20251001",
             max_tokens=1024,
             messages=[{"role": "user", "content": prompt}],
+            timeout=stage_timeout(deadline, _LLM_TIMEOUT_SECONDS),
         )
+        record_llm_usage(message)
 
         response_text = message.content[0].text.strip()
 
@@ -631,7 +1268,7 @@ Réponds UNIQUEMENT avec le JSON, sans texte autour."""
                 response_text = response_text[4:]
 
         data = json.loads(response_text)
-        raw_claims = [str(c) for c in data.get("claims", [])]
+        raw_claims = ClaimIndex(existing_claims).filter_new(str(c) for c in data.get("claims", []))
         filtered = filter_false_positives(raw_claims, company_name=audited_company_name)
         return [
             {"claim_text": c, "source_url": _find_source_url(c, text)}
@@ -639,14 +1276,31 @@ Réponds UNIQUEMENT avec le JSON, sans texte autour."""
         ]
 
     except Exception as exc:
+        if deadline is not None and deadline.cancelled:
+            raise
         logger.error(f"Erreur Claude API lors de l'extraction: {exc}")
+        if lexical_fallback:
+            return extract_claims_lexical(text, existing_claims, audited_company_name)
         return []
 
 
-async def run_monitoring_check(config_id: UUID, db: AsyncSession) -> int:
+# Report d'un check de monitoring quand le budget mensuel de l'organisation est épuisé
+# (échéance lissée par le planificateur autour de maintenant + ce délai)
+_BUDGET_DEFER_DELAY = timedelta(days=1)
+
+
+async def run_monitoring_check(
+    config_id: UUID,
+    db: AsyncSession,
+    lease_owner: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+) -> int:
     """
     Exécute un check de monitoring pour une config donnée.
     Retourne le nombre d'alertes créées.
+    lease_owner : check lancé par le scheduler — ignoré si le bail a été
+    repris entre-temps par une autre réplique.
+    deadline : budget du check, propagé au scraping et à l'extraction.
     """
     result = await db.execute(
         select(MonitoringConfig)
@@ -658,29 +1312,56 @@ async def run_monitoring_check(config_id: UUID, db: AsyncSession) -> int:
     if config is None or not config.is_active:
         return 0
 
+    if lease_owner is not None and config.lease_owner != lease_owner:
+        logger.warning(f"Config {config_id} : bail repris par {config.lease_owner}, skip")
+        return 0
+
     audit = config.audit
     if not audit or not audit.website_url:
         logger.warning(f"Config {config_id} : audit sans website_url, skip")
         return 0
 
-    existing_claims = [claim.claim_text for claim in audit.claims]
-
-    logger.info(f"Monitoring check — audit {audit.id} ({audit.website_url})")
-    page_text = await scrape_website(audit.website_url)
+    # Contrôle d'admission : budget mensuel épuisé → check reporté
+    organization = await db.get(Organization, audit.organization_id)
+    if organization is not None:
+        exhausted = await check_usage_budget(db, organization)
+        if exhausted:
+            config.next_check_at = await plan_next_check(
+                db, config, audit.organization_id, period=_BUDGET_DEFER_DELAY
+            )
+            await db.commit()
+            logger.info(
+                f"Monitoring check reporté — audit {audit.id} : budget {exhausted} épuisé"
+            )
+            return 0
 
-    if not page_text.strip():
-        logger.warning(f"Aucun texte récupéré pour {audit.website_url}")
-        _update_timestamps(config)
-        await db.commit()
-        return 0
+    # Allégations connues : claims de l'audit et alertes déjà levées pour cette config
+    # (dédupliquées après l'extraction, hors prompt)
+    alert_texts = (await db.execute(
+        select(MonitoringAlert.claim_text).where(MonitoringAlert.monitoring_config_id == config.id)
+    )).scalars().all()
+    existing_claims = [claim.claim_text for claim in audit.claims] + list(alert_texts)
 
-    new_claims = await extract_claims_with_claude(
-        page_text,
-        existing_claims,
-        audited_company_name=audit.company_name or "",
-        audited_website_url=audit.website_url or "",
-    )
+    logger.info(f"Monitoring check — audit {audit.id} ({audit.website_url})")
+    async with metered(db, audit.organization_id, "monitoring", audit_id=audit.id):
+        page_text = await scrape_website(audit.website_url, deadline, db=db)
+
+        if not page_text.strip():
+            logger.warning(f"Aucun texte récupéré pour {audit.website_url}")
+            await schedule_next_check(db, config, audit.organization_id)
+            await db.commit()
+            return 0
+
+        new_claims = await extract_claims_with_claude(
+            page_text,
+            existing_claims,
+            audited_company_name=audit.company_name or "",
+            audited_website_url=audit.website_url or "",
+            deadline=deadline,
+        )
 
+    if deadline is not None:
+        deadline.check("enregistrement")
     alerts_created = 0
     for item in new_claims:
         alert = MonitoringAlert(
@@ -691,7 +1372,7 @@ async def run_monitoring_check(config_id: UUID, db: AsyncSession) -> int:
         db.add(alert)
         alerts_created += 1
 
-    _update_timestamps(config)
+    await schedule_next_check(db, config, audit.organization_id)
     await db.commit()
 
     logger.info(
@@ -699,41 +1380,3 @@ async def run_monitoring_check(config_id: UUID, db: AsyncSession) -> int:
     )
     return alerts_created
 
-
-async def run_due_monitoring_checks() -> None:
-    """
-    Job scheduler : vérifie et exécute tous les checks de monitoring dus.
-    Appelé toutes les heures par APScheduler.
-    """
-    now = datetime.now(timezone.utc)
-
-    # Récupérer les IDs des configs dues dans une première session
-    async with async_session() as db:
-        result = await db.execute(
-            select(MonitoringConfig.id).where(
-                MonitoringConfig.is_active == True,  # noqa: E712
-                MonitoringConfig.next_check_at <= now,
-            )
-        )
-        config_ids = list(result.scalars().all())
-
-    if not config_ids:
-        return
-
-    logger.info(f"Scheduler monitoring : {len(config_ids)} check(s) à lancer")
-
-    # Exécuter chaque check dans sa propre session pour isolation
-    for config_id in config_ids:
-        async with async_session() as db:
-            try:
-                count = await run_monitoring_check(config_id, db)
-                logger.info(f"Monitoring {config_id}: {count} alertes créées")
-            except Exception as exc:
-                logger.error(f"Erreur monitoring check {config_id}: {exc}")
-
-
-def _update_timestamps(config: MonitoringConfig) -> None:
-    """Met à jour last_checked_at et calcule next_check_at."""
-    now = datetime.now(timezone.utc)
-    config.last_checked_at = now
-    config.next_check_at = now + timedelta(days=config.frequency_days)
@@ -43,6 +43,7 @@ from app.services.pdf_generator import (
     _reformulation_hint,
     _rl_escape,
 )
+from app.services.usage import record_llm_usage
 
 # ── Palette GreenAudit ──────────────────────────────────────────────────────
 
@@ -786,6 +787,7 @@ def _generate_reformulations_batch(claims: list, sector: str) -> Dict[str, str]:
             max_tokens=1000,
             messages=[{"role": "user", "content": prompt}],
         )
+        record_llm_usage(resp)
 
         raw = resp.content[0].text.strip()
         # Strip markdown fences if model wraps the JSON
@@ -812,9 +814,19 @@ def _generate_reformulations_batch(claims: list, sector: str) -> Dict[str, str]:
 
 # ── Entry point ──────────────────────────────────────────────────────────────
 
-def generate_marque_pdf(audit: Audit) -> Tuple[str, str]:
+def marque_reformulation_claims(audit: Audit) -> list:
+    """Allégations prioritaires reformulées en page 3 du rapport marque."""
+    return _select_priority_claims(audit.claims or [], max_claims=6)[:4]
+
+
+def generate_marque_pdf(
+    audit: Audit,
+    reformulations_map: Optional[Dict[str, str]] = None,
+) -> Tuple[str, str]:
     """
     Génère le rapport commercial 4 pages pour la marque auditée.
+    reformulations_map : {str(claim.id): reformulation} pré-calculé (cache du
+    rewrite_engine) — si None, 1 appel Haiku batch est fait ici.
     Returns: (filename, sha256_hash)
     """
     storage = Path(settings.PDF_STORAGE_PATH)
@@ -849,9 +861,9 @@ def generate_marque_pdf(audit: Audit) -> Tuple[str, str]:
     doc.addPageTemplates([PageTemplate(id="all", frames=[frame], onPage=_footer)])
 
     # Pré-générer les reformulations (1 appel Haiku pour toutes les allégations prioritaires)
-    priority_claims = _select_priority_claims(audit.claims or [], max_claims=6)
-    sector = getattr(audit, "sector", "") or "non précisé"
-    reformulations_map = _generate_reformulations_batch(priority_claims[:4], sector)
+    if reformulations_map is None:
+        sector = getattr(audit, "sector", "") or "non précisé"
+        reformulations_map = _generate_reformulations_batch(marque_reformulation_claims(audit), sector)
 
     elements: list = []
     elements += _page1(audit, st)
@@ -0,0 +1,134 @@
+"""
+Quotas d'audits par organisation : vérification et consommation en une requête.
+
+Le compteur audits_this_month était lu (check_audit_limit) puis incrémenté en
+Python à la création de l'audit : deux requêtes concurrentes pouvaient passer
+la limite toutes les deux. reserve_audit() fait tout dans un seul
+UPDATE … WHERE compteur < limite RETURNING, dans la transaction qui crée
+l'audit :
+
+  - le verrou de ligne pris par l'UPDATE sérialise les créations concurrentes
+    d'une même organisation, la condition est réévaluée sur la valeur à jour ;
+  - la remise à zéro mensuelle (partner, pro) est faite dans le même UPDATE
+    quand audits_reset_month n'est pas le mois courant ;
+  - si la création de l'audit échoue, le rollback rend le quota consommé.
+
+La limite de scans Starter (reserve_scan) verrouille la ligne de l'organisation
+puis compte en SQL les audits et les scans en file, sans charger les lignes.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.audit import Audit
+from app.models.job import Job
+from app.models.organization import Organization
+
+# Audits par mois, remis à zéro le 1er du mois
+MONTHLY_AUDIT_LIMITS = {
+    "partner": 5,
+    "pro": 15,
+}
+UNLIMITED_PLANS = ("enterprise",)
+# Starter (ou tout autre plan) : audit unique, jamais réinitialisé
+STARTER_AUDIT_LIMIT = 1
+
+PAID_SCAN_PLANS = ("partner", "pro", "enterprise")
+STARTER_SCAN_LIMIT = 5
+
+
+def _current_month() -> str:
+    return datetime.utcnow().strftime("%Y-%m")
+
+
+async def reserve_audit(db: AsyncSession, organization_id: UUID, enforce: bool = True) -> None:
+    """
+    Consomme un audit du quota de l'organisation (sans commit : à valider avec
+    l'audit créé). enforce=False compte l'audit sans appliquer la limite
+    (superadmin, scans — limités par reserve_scan).
+    """
+    month = _current_month()
+    monthly = Organization.subscription_plan.in_(MONTHLY_AUDIT_LIMITS)
+    # Compteur d'un mois précédent : remis à zéro avant d'être comparé et incrémenté
+    stale = monthly & Organization.audits_reset_month.is_distinct_from(month)
+    used = case((stale, 0), else_=func.coalesce(Organization.audits_this_month, 0))
+    stmt = (
+        update(Organization)
+        .where(Organization.id == organization_id)
+        .values(
+            audits_this_month=used + 1,
+            audits_reset_month=case((monthly, month), else_=Organization.audits_reset_month),
+        )
+        .returning(Organization.audits_this_month)
+    )
+    if enforce:
+        limit = case(
+            *((Organization.subscription_plan == plan, n) for plan, n in MONTHLY_AUDIT_LIMITS.items()),
+            else_=STARTER_AUDIT_LIMIT,
+        )
+        stmt = stmt.where(or_(Organization.subscription_plan.in_(UNLIMITED_PLANS), used < limit))
+
+    if (await db.execute(stmt)).scalar_one_or_none() is None:
+        raise await _quota_error(db, organization_id)
+
+
+async def _quota_error(db: AsyncSession, organization_id: UUID) -> HTTPException:
+    plan = await db.scalar(
+        select(Organization.subscription_plan).where(Organization.id == organization_id)
+    )
+    if plan is None:
+        return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Organisation introuvable")
+    if plan in MONTHLY_AUDIT_LIMITS:
+        return HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=(
+                f"Limite de {MONTHLY_AUDIT_LIMITS[plan]} audits/mois atteinte. "
+                "Contactez-nous pour en ajouter."
+            ),
+        )
+    return HTTPException(status_code=status.HTTP_402_PAYMENT_REQUIRED, detail="upgrade_required")
+
+
+async def reserve_scan(db: AsyncSession, organization_id: UUID) -> None:
+    """
+    Limite Starter : 5 scans maximum (hors audits démo), à appeler dans la
+    transaction qui met le job de scan en file (sans commit : enqueue_job valide).
+
+    Le verrou sur la ligne de l'organisation, tenu jusqu'au commit du job,
+    sérialise les scans concurrents d'une même organisation ; le COUNT est une
+    seconde requête pour voir les jobs validés pendant l'attente du verrou.
+    Un scan en file ou en cours n'a pas encore d'audit : il est compté avec
+    les audits (au pire deux fois pendant l'instant où son audit est validé
+    avant le succès du job).
+    """
+    plan = await db.scalar(
+        select(Organization.subscription_plan)
+        .where(Organization.id == organization_id)
+        .with_for_update()
+    )
+    if plan is None or plan in PAID_SCAN_PLANS:
+        return
+
+    audits = (
+        select(func.count())
+        .select_from(Audit)
+        .where(Audit.organization_id == organization_id, ~Audit.company_name.contains("[DÉMO]"))
+        .scalar_subquery()
+    )
+    pending = (
+        select(func.count())
+        .select_from(Job)
+        .where(
+            Job.organization_id == organization_id,
+            Job.kind == "scan",
+            Job.status.in_(("queued", "running")),
+        )
+        .scalar_subquery()
+    )
+    if await db.scalar(select(audits + pending)) >= STARTER_SCAN_LIMIT:
+        raise HTTPException(status_code=status.HTTP_402_PAYMENT_REQUIRED, detail="upgrade_required")
@@ -1,44 +1,81 @@
 """
 Moteur de réécriture des allégations non conformes via Claude.
 Pour chaque claim non conforme, propose une version corrigée et conforme à EmpCo.
+
+Les suggestions sont générées par lots (un appel Claude pour plusieurs claims)
+et mises en cache dans la table rewrite_suggestions, par
+(texte normalisé, secteur, hash des raisons, version du prompt).
+Le cache est partagé par l'endpoint unitaire, l'endpoint batch de l'audit
+et le rapport marque.
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from typing import Dict, List
+
 import anthropic
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
+from app.models.rewrite_suggestion import RewriteSuggestion
+from app.services.usage import record_llm_usage
 
+logger = logging.getLogger(__name__)
 
-async def suggest_rewrite(
-    claim_text: str,
-    sector: str,
-    non_conforming_reasons: list[str],
-) -> list[str]:
-    """
-    Appelle Claude pour proposer 3 réécritures conformes de l'allégation.
+# À incrémenter à chaque modification du prompt — invalide le cache existant
+REWRITE_PROMPT_VERSION = "2"
 
-    Args:
-        claim_text: L'allégation originale
-        sector: Le secteur de l'entreprise (cosmetiques, alimentaire, etc.)
-        non_conforming_reasons: Liste des raisons de non-conformité
+# Nombre maximum d'allégations par appel Claude
+_BATCH_SIZE = 10
 
-    Returns:
-        Liste de 3 suggestions de réécriture conformes
-    """
-    if not settings.ANTHROPIC_API_KEY:
-        return ["Clé API Claude non configurée."]
 
-    reasons_text = "\n".join(f"- {r}" for r in non_conforming_reasons)
+def non_conforming_reasons(claim) -> List[str]:
+    """Raisons de non-conformité d'une claim (explications des critères non conformes / à risque)."""
+    return [
+        r.explanation
+        for r in claim.results
+        if r.verdict in ("non_conforme", "risque")
+    ]
+
+
+def _normalize_claim_text(text: str) -> str:
+    text = re.sub(r"\s+", " ", text.lower())
+    return text.strip().strip("«»\"'‘’“”.,;:!?… ")
+
 
-    prompt = f"""Tu es un expert juridique en droit de la consommation et en conformité à la directive européenne EmpCo (EU 2024/825) sur les allégations environnementales.
+def rewrite_cache_key(claim_text: str, sector: str, reasons: List[str]) -> str:
+    """Clé de cache : version du prompt + texte normalisé + secteur + hash des raisons."""
+    reasons_hash = hashlib.sha256(
+        "\n".join(sorted(r.strip() for r in reasons)).encode("utf-8")
+    ).hexdigest()
+    raw = "|".join([
+        REWRITE_PROMPT_VERSION,
+        _normalize_claim_text(claim_text),
+        (sector or "").strip().lower(),
+        reasons_hash,
+    ])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _build_batch_prompt(items: List[dict], sector: str) -> str:
+    allegations_block = "\n\n".join(
+        f"{i}. « {it['claim_text']} »\n"
+        + "\n".join(f"   - {r}" for r in it["reasons"])
+        for i, it in enumerate(items, 1)
+    )
+    return f"""Tu es un expert juridique en droit de la consommation et en conformité à la directive européenne EmpCo (EU 2024/825) sur les allégations environnementales.
 
-Une entreprise du secteur "{sector}" utilise l'allégation suivante :
-« {claim_text} »
+Une entreprise du secteur "{sector}" utilise les allégations suivantes, chacune NON CONFORME pour les raisons indiquées :
 
-Cette allégation est NON CONFORME pour les raisons suivantes :
-{reasons_text}
+{allegations_block}
 
-Propose EXACTEMENT 3 réécritures différentes de cette allégation, chacune :
+Pour CHAQUE allégation, propose EXACTEMENT 3 réécritures différentes, chacune :
 1. Conforme à EmpCo : spécifique, vérifiable, non générique
 2. Honnête : ne pas inventer de chiffres ou certifications inexistants
 3. Actionnable : utilisable directement par une agence de communication
@@ -46,31 +83,121 @@ Propose EXACTEMENT 3 réécritures différentes de cette allégation, chacune :
 5. D'un angle différent des deux autres (ex : une axée sur les chiffres, une sur la certification, une sur l'action concrète)
 
 Réponds TOUJOURS EN FRANÇAIS, quelle que soit la langue de l'allégation originale.
-Réponds UNIQUEMENT avec les 3 formulations numérotées, format strict :
-1. [première suggestion]
-2. [deuxième suggestion]
-3. [troisième suggestion]
-
-Sans explication, sans guillemets, sans préambule."""
-
-    client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
-    message = await client.messages.create(
-        model="claude-haiku-4-5-20251001",
-        max_tokens=400,
-        messages=[{"role": "user", "content": prompt}],
-    )
+Réponds UNIQUEMENT en JSON, format strict :
+{{"rewrites": [{{"index": 1, "suggestions": ["...", "...", "..."]}}, ...]}}
+
+Sans explication, sans texte avant ou après le JSON."""
+
+
+async def suggest_rewrites_batch(items: List[dict], sector: str) -> Dict[int, List[str]]:
+    """
+    Un seul appel Claude pour un lot d'allégations.
+
+    Args:
+        items: [{"claim_text": str, "reasons": [str, ...]}, ...]
+        sector: Le secteur de l'entreprise (cosmetiques, alimentaire, etc.)
 
-    raw = message.content[0].text.strip()
+    Returns:
+        {position dans items: [3 suggestions]} — dict vide si l'API est indisponible
+    """
+    if not items or not settings.ANTHROPIC_API_KEY:
+        return {}
+
+    try:
+        client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+        message = await client.messages.create(
+            model="claude-haiku-4-5-20251001",
+            max_tokens=200 + 250 * len(items),
+            messages=[{"role": "user", "content": _build_batch_prompt(items, sector)}],
+        )
+        record_llm_usage(message)
+
+        raw = message.content[0].text.strip()
+        # Strip markdown fences si le modèle entoure le JSON
+        if "```" in raw:
+            raw = raw.split("```")[1]
+            if raw.startswith("json"):
+                raw = raw[4:]
+
+        data = json.loads(raw)
+        result: Dict[int, List[str]] = {}
+        for entry in data.get("rewrites", []):
+            idx = int(entry.get("index", 0))
+            suggestions = [str(s).strip() for s in entry.get("suggestions", []) if str(s).strip()]
+            if 1 <= idx <= len(items) and suggestions:
+                result[idx - 1] = suggestions[:3]
+        return result
+
+    except Exception as exc:
+        logger.warning("Réécritures Claude indisponibles (%d allégation(s)) : %s", len(items), exc)
+        return {}
+
+
+async def get_rewrites(
+    db: AsyncSession,
+    items: List[dict],
+    sector: str,
+) -> List[List[str]]:
+    """
+    Retourne les suggestions pour chaque item (même ordre), via le cache puis
+    des appels Claude groupés par lots de _BATCH_SIZE pour les items manquants.
+    Liste vide pour un item si aucune suggestion n'a pu être générée.
+    Les nouvelles entrées du cache sont ajoutées sans commit : l'appelant valide.
 
-    # Parser les 3 suggestions numérotées
-    suggestions = []
-    for line in raw.split("\n"):
-        line = line.strip()
-        if line and line[0].isdigit() and ". " in line:
-            suggestions.append(line.split(". ", 1)[1].strip())
+    items: [{"claim_text": str, "reasons": [str, ...]}, ...]
+    """
+    if not items:
+        return []
 
-    # Fallback si le parsing échoue
-    if not suggestions:
-        suggestions = [raw]
+    keys = [rewrite_cache_key(it["claim_text"], sector, it["reasons"]) for it in items]
+    cached_result = await db.execute(
+        select(RewriteSuggestion).where(RewriteSuggestion.cache_key.in_(set(keys)))
+    )
+    by_key: Dict[str, List[str]] = {
+        row.cache_key: list(row.suggestions) for row in cached_result.scalars().all()
+    }
+
+    # Items manquants, dédupliqués par clé (claims identiques dans l'audit)
+    missing: Dict[str, dict] = {}
+    for key, it in zip(keys, items):
+        if key not in by_key and key not in missing:
+            missing[key] = it
+
+    if missing:
+        missing_keys = list(missing)
+        batches = [
+            missing_keys[i:i + _BATCH_SIZE]
+            for i in range(0, len(missing_keys), _BATCH_SIZE)
+        ]
+        batch_results = await asyncio.gather(*[
+            suggest_rewrites_batch([missing[k] for k in batch], sector)
+            for batch in batches
+        ])
+        new_rows: List[RewriteSuggestion] = []
+        for batch, result in zip(batches, batch_results):
+            for pos, suggestions in result.items():
+                key = batch[pos]
+                by_key[key] = suggestions
+                new_rows.append(RewriteSuggestion(
+                    cache_key=key,
+                    prompt_version=REWRITE_PROMPT_VERSION,
+                    sector=(sector or "")[:100],
+                    claim_text=missing[key]["claim_text"],
+                    suggestions=suggestions,
+                ))
+
+        if new_rows:
+            # SAVEPOINT : un conflit d'unicité (requête concurrente qui a déjà
+            # mis en cache ces clés) n'annule pas la transaction de l'appelant
+            try:
+                async with db.begin_nested():
+                    db.add_all(new_rows)
+            except IntegrityError:
+                logger.info("Réécritures déjà mises en cache par une requête concurrente")
+        logger.info(
+            "Réécritures : %d en cache, %d générées en %d appel(s)",
+            len(items) - len(missing), len(new_rows), len(batches),
+        )
+
+    return [by_key.get(key, []) for key in keys]
 
-    return suggestions[:3]
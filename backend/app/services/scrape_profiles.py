@@ -0,0 +1,149 @@
+"""
+Profil de scraping par site — chemins RSE productifs mémorisés d'un scan à l'autre.
+
+Les chemins sont relatifs à l'URL scannée : le profil est donc indexé par domaine
+et chemin de base (profile_key) — "" sous https://exemple.fr/rse désigne /rse, pas
+la page d'accueil, et un scan de la sous-section ne renseigne pas celui du site.
+
+Sur un site donné, 2 ou 3 des chemins de _FC_RSE_PATHS renvoient du contenu ;
+les autres tombent en 404 ou sur un consent wall. Le profil garde, pour chaque
+chemin, le résultat de la dernière sonde (content, not_found, consent, empty,
+error), la taille du contenu, le backend qui l'a fourni et l'URL finale en cas
+de redirection.
+
+  - plan_paths()      chemins à scraper : les productifs (plus gros d'abord), les
+                      inconnus ou en erreur, et quelques improductifs dont la sonde
+                      est la plus ancienne (re-sonde progressive après
+                      SCRAPE_PROFILE_REPROBE_DAYS).
+  - record_outcomes() fusionne les résultats d'un scrape dans le profil.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.scrape_profile import ScrapeProfile
+
+OUTCOME_CONTENT = "content"
+OUTCOME_ERROR = "error"
+
+# Chemins improductifs re-sondés au plus par scan
+_REPROBE_PER_SCAN = 3
+
+
+@dataclass
+class PathOutcome:
+    """Résultat de la sonde d'un chemin."""
+
+    outcome: str
+    size: int = 0
+    backend: Optional[str] = None
+    redirect_to: Optional[str] = None
+
+
+@dataclass
+class PathPlan:
+    """Chemins à scraper pour un site, d'après son profil."""
+
+    paths: List[str]
+    skipped: List[str] = field(default_factory=list)
+    backends: Dict[str, str] = field(default_factory=dict)  # backend qui a fourni le contenu
+    productive: int = 0
+
+
+def profile_key(url: str) -> str:
+    """Domaine (sans www.) suivi du chemin de base de url : "exemple.fr", "exemple.fr/rse"."""
+    if not url.startswith(("http://", "https://")):
+        url = f"https://{url}"
+    parsed = urlparse(url)
+    netloc = parsed.netloc.lower()
+    netloc = netloc[4:] if netloc.startswith("www.") else netloc
+    return f"{netloc}{parsed.path.rstrip('/')}"
+
+
+def _checked_at(entry: Dict) -> datetime:
+    try:
+        value = datetime.fromisoformat(entry.get("checked_at") or "")
+    except ValueError:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def _load(db: AsyncSession, key: str) -> Optional[ScrapeProfile]:
+    return (await db.execute(
+        select(ScrapeProfile)
+        .where(ScrapeProfile.domain == key)
+        .order_by(ScrapeProfile.updated_at.desc())
+        .limit(1)
+    )).scalar_one_or_none()
+
+
+async def plan_paths(
+    db: AsyncSession,
+    url: str,
+    paths: Iterable[str],
+    now: Optional[datetime] = None,
+) -> PathPlan:
+    """Chemins de paths à scraper sous url (tous si le site est inconnu)."""
+    paths = list(paths)
+    profile = await _load(db, profile_key(url))
+    if profile is None or not profile.paths:
+        return PathPlan(paths=paths)
+
+    now = now or datetime.now(timezone.utc)
+    entries = profile.paths
+    productive: List[str] = []
+    unknown: List[str] = []
+    unproductive: List[str] = []
+    for path in paths:
+        entry = entries.get(path)
+        if entry is None or entry.get("outcome") == OUTCOME_ERROR:
+            unknown.append(path)
+        elif entry.get("outcome") == OUTCOME_CONTENT:
+            productive.append(path)
+        else:
+            unproductive.append(path)
+
+    productive.sort(key=lambda p: entries[p].get("size", 0), reverse=True)
+    reprobe_before = now - timedelta(days=settings.SCRAPE_PROFILE_REPROBE_DAYS)
+    reprobe = sorted(
+        (p for p in unproductive if _checked_at(entries[p]) < reprobe_before),
+        key=lambda p: _checked_at(entries[p]),
+    )[:_REPROBE_PER_SCAN]
+
+    selected = productive + unknown + reprobe
+    return PathPlan(
+        paths=selected,
+        skipped=[p for p in paths if p not in selected],
+        backends={p: entries[p]["backend"] for p in productive if entries[p].get("backend")},
+        productive=len(productive),
+    )
+
+
+async def record_outcomes(
+    db: AsyncSession,
+    url: str,
+    outcomes: Dict[str, PathOutcome],
+    now: Optional[datetime] = None,
+) -> None:
+    """Fusionne les résultats dans le profil de url (commit laissé à l'appelant)."""
+    if not outcomes:
+        return
+    key = profile_key(url)
+    now = now or datetime.now(timezone.utc)
+    profile = await _load(db, key)
+    merged = dict(profile.paths or {}) if profile is not None else {}
+    for path, result in outcomes.items():
+        merged[path] = {**asdict(result), "checked_at": now.isoformat()}
+
+    if profile is None:
+        db.add(ScrapeProfile(domain=key, paths=merged, updated_at=now))
+    else:
+        profile.paths = merged
+        profile.updated_at = now
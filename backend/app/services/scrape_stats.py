@@ -0,0 +1,107 @@
+"""
+Statistiques des backends de scraping (Firecrawl, Jina, sitemap) — latences,
+victoires et volume lu (octets lus sur le réseau / octets gardés pour l'analyse).
+
+Alimentées par les requêtes couvertes (hedged) de monitoring_service : chaque
+requête terminée enregistre sa latence et son succès, chaque course gagnée
+crédite le backend vainqueur. Les percentiles de latence du backend principal
+servent à caler le délai avant d'envoyer la requête de secours.
+
+Les compteurs sont propres au process (chaque réplique a les siens) et les
+latences sont conservées sur une fenêtre glissante.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from collections import Counter, defaultdict, deque
+from typing import Deque, Dict, Optional
+
+# Nombre de latences conservées par backend
+_WINDOW = 500
+
+
+class ScrapeStats:
+    """Latences (fenêtre glissante) et compteurs par backend de scraping."""
+
+    def __init__(self, window: int = _WINDOW) -> None:
+        self._window = window
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self._window))
+        self._counters: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, backend: str, latency: float, ok: bool) -> None:
+        """Requête terminée (réponse utilisable ou non)."""
+        with self._lock:
+            self._latencies[backend].append(latency)
+            self._counters[backend]["requests"] += 1
+            if ok:
+                self._counters[backend]["ok"] += 1
+
+    def record_bytes(self, backend: str, read: int, used: int) -> None:
+        """Octets lus sur le réseau et octets effectivement gardés pour l'analyse."""
+        with self._lock:
+            self._counters[backend]["bytes_read"] += read
+            self._counters[backend]["bytes_used"] += used
+
+    def hedged(self, backend: str) -> None:
+        """Requête de secours envoyée sur backend."""
+        with self._lock:
+            self._counters[backend]["hedged"] += 1
+
+    def win(self, backend: str) -> None:
+        with self._lock:
+            self._counters[backend]["wins"] += 1
+
+    def cancelled(self, backend: str) -> None:
+        """Requête perdante annulée avant sa réponse."""
+        with self._lock:
+            self._counters[backend]["cancelled"] += 1
+
+    def samples(self, backend: str) -> int:
+        with self._lock:
+            return len(self._latencies.get(backend, ()))
+
+    def percentile(self, backend: str, q: float) -> Optional[float]:
+        """Percentile q (0–1) des latences récentes de backend, None sans mesure."""
+        with self._lock:
+            values = sorted(self._latencies.get(backend, ()))
+        if not values:
+            return None
+        index = min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))
+        return values[index]
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Vue par backend pour le dashboard admin."""
+        with self._lock:
+            backends = sorted(set(self._latencies) | set(self._counters))
+            counters = {b: dict(self._counters[b]) for b in backends}
+        total_wins = sum(c.get("wins", 0) for c in counters.values())
+        snapshot: Dict[str, Dict] = {}
+        for backend in backends:
+            c = counters[backend]
+            requests = c.get("requests", 0)
+            snapshot[backend] = {
+                "requests": requests,
+                "ok": c.get("ok", 0),
+                "hedged": c.get("hedged", 0),
+                "cancelled": c.get("cancelled", 0),
+                "wins": c.get("wins", 0),
+                "win_rate": round(c.get("wins", 0) / total_wins, 3) if total_wins else 0.0,
+                "success_rate": round(c.get("ok", 0) / requests, 3) if requests else 0.0,
+                "bytes_read": c.get("bytes_read", 0),
+                "bytes_used": c.get("bytes_used", 0),
+                "samples": self.samples(backend),
+                "p50": self.percentile(backend, 0.5),
+                "p90": self.percentile(backend, 0.9),
+                "p99": self.percentile(backend, 0.99),
+            }
+        return snapshot
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latencies.clear()
+            self._counters.clear()
+
+
+scrape_stats = ScrapeStats()
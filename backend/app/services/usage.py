@@ -0,0 +1,259 @@
+"""
+Registre de consommation LLM / scraping par organisation, et contrôle d'admission.
+
+Mesure :
+  Un compteur (UsageMeter) est porté par une ContextVar pendant une opération
+  (scan, check de monitoring, réécritures…). Les appels Claude et les scrapes
+  Firecrawl / Jina y ajoutent leur consommation via record_llm_usage() et
+  record_scrape(), y compris depuis les tâches asyncio.gather et les threads
+  asyncio.to_thread (qui héritent du contexte). En sortie de metered(), une
+  ligne UsageRecord est ajoutée au registre (append-only).
+
+Admission :
+  Chaque plan dispose d'un budget mensuel (tokens LLM, pages scrapées).
+  check_usage_budget() retourne le budget épuisé le cas échéant — le scan est
+  refusé (429), le check de monitoring est reporté.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import AsyncIterator, Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.organization import Organization
+from app.models.usage_record import UsageRecord
+
+logger = logging.getLogger(__name__)
+
+# Budgets mensuels par plan — None = illimité
+PLAN_USAGE_BUDGETS: Dict[str, Dict[str, Optional[int]]] = {
+    "starter": {"llm_tokens": 200_000, "scrape_pages": 150},
+    "essentiel": {"llm_tokens": 1_000_000, "scrape_pages": 750},
+    "partner": {"llm_tokens": 1_000_000, "scrape_pages": 750},
+    "pro": {"llm_tokens": 5_000_000, "scrape_pages": 4_000},
+    "enterprise": {"llm_tokens": None, "scrape_pages": None},
+}
+
+_USAGE_COLUMNS = (
+    "input_tokens", "output_tokens", "cached_tokens",
+    "llm_calls", "firecrawl_pages", "jina_calls",
+)
+
+
+@dataclass
+class UsageMeter:
+    """Compteur de consommation d'une opération en cours."""
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    llm_calls: int = 0
+    firecrawl_pages: int = 0
+    jina_calls: int = 0
+    audit_id: Optional[UUID] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, **counts: int) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def is_empty(self) -> bool:
+        return not any(getattr(self, name) for name in _USAGE_COLUMNS)
+
+
+_current_meter: ContextVar[Optional[UsageMeter]] = ContextVar("usage_meter", default=None)
+
+
+def record_llm_usage(message) -> None:
+    """À appeler après chaque messages.create() — lit message.usage (tokens in/out/cache)."""
+    meter = _current_meter.get()
+    usage = getattr(message, "usage", None)
+    if meter is None or usage is None:
+        return
+    meter.add(
+        input_tokens=getattr(usage, "input_tokens", 0) or 0,
+        output_tokens=getattr(usage, "output_tokens", 0) or 0,
+        cached_tokens=getattr(usage, "cache_read_input_tokens", 0) or 0,
+        llm_calls=1,
+    )
+
+
+def record_scrape(provider: str, pages: int = 1) -> None:
+    """À appeler après chaque page scrapée — provider : "firecrawl" ou "jina"."""
+    meter = _current_meter.get()
+    if meter is None:
+        return
+    if provider == "firecrawl":
+        meter.add(firecrawl_pages=pages)
+    elif provider == "jina":
+        meter.add(jina_calls=pages)
+
+
+@asynccontextmanager
+async def metered(
+    db: AsyncSession,
+    organization_id: Optional[UUID],
+    operation: str,
+    audit_id: Optional[UUID] = None,
+) -> AsyncIterator[UsageMeter]:
+    """
+    Mesure la consommation du bloc et l'inscrit au registre en sortie (commit),
+    y compris si le bloc lève une exception : la consommation réelle est
+    facturée même quand l'opération échoue (ex: aucune allégation détectée).
+    meter.audit_id peut être renseigné en cours de bloc (audit créé par le scan).
+
+    Si le bloc échoue (exception, annulation, échéance dépassée), le travail
+    partiel de l'appelant est annulé (rollback) avant l'écriture du registre :
+    seule la consommation est validée, jamais un audit ou un quota à moitié pris.
+    """
+    meter = UsageMeter(audit_id=audit_id)
+    token = _current_meter.set(meter)
+    failed = False
+    try:
+        yield meter
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        _current_meter.reset(token)
+        if failed:
+            try:
+                await db.rollback()
+            except Exception as exc:
+                logger.error(f"Registre de consommation — rollback impossible ({operation}): {exc}")
+            # Audit créé dans le bloc : annulé avec le reste
+            if meter.audit_id != audit_id:
+                meter.audit_id = None
+        if organization_id is not None and not meter.is_empty():
+            try:
+                db.add(UsageRecord(
+                    organization_id=organization_id,
+                    audit_id=meter.audit_id,
+                    day=datetime.now(timezone.utc).date(),
+                    operation=operation,
+                    **{name: getattr(meter, name) for name in _USAGE_COLUMNS},
+                ))
+                await db.commit()
+            except Exception as exc:
+                logger.error(f"Registre de consommation — écriture impossible ({operation}): {exc}")
+
+
+def _month_start(today: Optional[date] = None) -> date:
+    today = today or datetime.now(timezone.utc).date()
+    return today.replace(day=1)
+
+
+def month_bounds(month: Optional[str] = None) -> Tuple[date, date]:
+    """[1er du mois, 1er du mois suivant[ pour "YYYY-MM" (mois courant par défaut). ValueError si invalide."""
+    start = datetime.strptime(month, "%Y-%m").date() if month else _month_start()
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def _sum_columns():
+    return [func.coalesce(func.sum(getattr(UsageRecord, name)), 0).label(name) for name in _USAGE_COLUMNS]
+
+
+def _totals_from_row(row) -> Dict[str, int]:
+    totals = {name: int(getattr(row, name) or 0) for name in _USAGE_COLUMNS}
+    totals["llm_tokens"] = totals["input_tokens"] + totals["output_tokens"]
+    totals["scrape_pages"] = totals["firecrawl_pages"] + totals["jina_calls"]
+    return totals
+
+
+async def get_usage_totals(
+    db: AsyncSession,
+    organization_id: UUID,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+) -> Dict[str, int]:
+    """Totaux de consommation d'une organisation sur [since, until[ (mois courant par défaut)."""
+    since = since or _month_start()
+    query = select(*_sum_columns()).where(
+        UsageRecord.organization_id == organization_id,
+        UsageRecord.day >= since,
+    )
+    if until is not None:
+        query = query.where(UsageRecord.day < until)
+    row = (await db.execute(query)).one()
+    return _totals_from_row(row)
+
+
+async def get_usage_by_day(
+    db: AsyncSession, organization_id: UUID, since: date, until: Optional[date] = None
+) -> list:
+    query = (
+        select(UsageRecord.day, *_sum_columns())
+        .where(UsageRecord.organization_id == organization_id, UsageRecord.day >= since)
+        .group_by(UsageRecord.day)
+        .order_by(UsageRecord.day)
+    )
+    if until is not None:
+        query = query.where(UsageRecord.day < until)
+    rows = (await db.execute(query)).all()
+    return [{"day": row.day, **_totals_from_row(row)} for row in rows]
+
+
+async def get_usage_by_audit(
+    db: AsyncSession, organization_id: UUID, since: date, until: Optional[date] = None
+) -> list:
+    query = (
+        select(UsageRecord.audit_id, *_sum_columns())
+        .where(
+            UsageRecord.organization_id == organization_id,
+            UsageRecord.day >= since,
+            UsageRecord.audit_id.is_not(None),
+        )
+        .group_by(UsageRecord.audit_id)
+    )
+    if until is not None:
+        query = query.where(UsageRecord.day < until)
+    rows = (await db.execute(query)).all()
+    return [{"audit_id": row.audit_id, **_totals_from_row(row)} for row in rows]
+
+
+async def get_usage_by_organization(
+    db: AsyncSession, since: date, until: Optional[date] = None
+) -> Dict[UUID, Dict[str, int]]:
+    """Totaux par organisation (vue superadmin) — une seule requête agrégée."""
+    query = (
+        select(UsageRecord.organization_id, *_sum_columns())
+        .where(UsageRecord.day >= since)
+        .group_by(UsageRecord.organization_id)
+    )
+    if until is not None:
+        query = query.where(UsageRecord.day < until)
+    rows = (await db.execute(query)).all()
+    return {row.organization_id: _totals_from_row(row) for row in rows}
+
+
+def plan_budget(plan: Optional[str]) -> Dict[str, Optional[int]]:
+    return PLAN_USAGE_BUDGETS.get(plan or "starter", PLAN_USAGE_BUDGETS["starter"])
+
+
+async def check_usage_budget(db: AsyncSession, organization: Organization) -> Optional[str]:
+    """
+    Contrôle d'admission : retourne le nom du budget mensuel épuisé
+    ("llm_tokens" ou "scrape_pages"), ou None si l'opération peut démarrer.
+    """
+    budget = plan_budget(organization.subscription_plan)
+    if all(limit is None for limit in budget.values()):
+        return None
+    totals = await get_usage_totals(db, organization.id)
+    for name, limit in budget.items():
+        if limit is not None and totals[name] >= limit:
+            logger.info(
+                f"Budget {name} épuisé pour l'organisation {organization.id} "
+                f"({totals[name]} / {limit})"
+            )
+            return name
+    return None
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import re
+from typing import Callable
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+
+class RequestBodyTooLarge(HTTPException):
+    """Corps de requête au-delà de la limite de la route (413)."""
+
+    def __init__(self, detail: str) -> None:
+        super().__init__(status_code=413, detail=detail)
+
+
+class BodySizeLimitMiddleware:
+    """
+    Middleware ASGI pur : plafonne la taille du corps des requêtes dont le
+    chemin correspond à path_pattern, avant toute lecture par FastAPI.
+
+    FastAPI reçoit et met en tampon un UploadFile en entier avant d'appeler la
+    route : sans ce middleware, un envoi de plusieurs Go serait lu jusqu'au bout
+    avant le 413 de la route.
+
+    - Content-Length au-delà de max_size → 413 immédiat, corps jamais lu
+    - sinon les messages http.request sont comptés à la réception : la lecture
+      s'arrête (413) dès que max_size est franchi (envoi chunked, en-tête absent
+      ou mensonger)
+    """
+
+    def __init__(self, app: Callable, path_pattern: str, max_size: int, detail: str) -> None:
+        self.app = app
+        self.path_re = re.compile(path_pattern)
+        self.max_size = max_size
+        self.detail = detail
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not self.path_re.fullmatch(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope.get("headers", [])).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_size:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> dict:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size:
+                    # HTTPException : relancée telle quelle par l'analyse du formulaire FastAPI
+                    raise RequestBodyTooLarge(self.detail)
+            return message
+
+        async def send_tracking_start(message: dict) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, send_tracking_start)
+        except RequestBodyTooLarge:
+            if response_started:
+                raise
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope: dict, receive: Callable, send: Callable) -> None:
+        response = JSONResponse({"detail": self.detail}, status_code=413, headers={"connection": "close"})
+        await response(scope, receive, send)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from app.config import settings
+from app.services.db_stats import QueryStats, db_stats, track
+
+
+def _headers(stats: QueryStats) -> list:
+    headers = [
+        (b"x-db-queries", str(stats.statements).encode()),
+        (b"x-db-time-ms", f"{stats.seconds * 1000:.1f}".encode()),
+    ]
+    slowest = stats.slowest_first()
+    if slowest:
+        seconds, statement = slowest[0]
+        value = f"{seconds * 1000:.1f}ms {' '.join(statement.split())[:150]}"
+        headers.append((b"x-db-slowest", value.encode("latin-1", errors="replace")))
+    return headers
+
+
+class DbStatsMiddleware:
+    """
+    Middleware ASGI pur : collecte les requêtes SQL de chaque requête HTTP
+    (voir services/db_stats.py) et les agrège par route.
+
+    En-têtes ajoutés si DB_STATS_HEADERS (debug uniquement) :
+    - X-DB-Queries   → nombre de requêtes SQL avant l'envoi de la réponse
+    - X-DB-Time-Ms   → temps cumulé passé en base
+    - X-DB-Slowest   → requête la plus lente (durée + début du SQL)
+    """
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track() as stats:
+            async def send_with_db_headers(message: dict) -> None:
+                if message["type"] == "http.response.start" and settings.DB_STATS_HEADERS:
+                    existing = list(message.get("headers", []))
+                    message = {**message, "headers": existing + _headers(stats)}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_db_headers)
+            finally:
+                # Route résolue par le routeur FastAPI (scope partagé) ; 404 non agrégées
+                route = scope.get("route")
+                if route is not None:
+                    db_stats.record_request(f"{scope['method']} {route.path}", stats)
@@ -0,0 +1,132 @@
+"""
+Budget de temps d'une opération (scan, check de monitoring) propagé de bout en bout.
+
+Un Deadline est créé au démarrage du job et transmis à chaque étape
+(scrape_website → _scrape_firecrawl / _scrape_jina → extract_claims_with_claude
+→ persistance). Chaque étape dimensionne ses propres timeouts sur le temps
+restant (timeout(cap)) au lieu de valeurs fixes indépendantes, et vérifie
+l'échéance entre deux appels coûteux (check()).
+
+L'annulation est coopérative : cancel() (client parti, job annulé) fait lever
+DeadlineExceeded au prochain check(), y compris dans les sous-budgets créés
+par share().
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Budget de temps épuisé, ou opération annulée."""
+
+
+class Deadline:
+    """Échéance absolue (horloge monotone), annulable, avec sous-budgets."""
+
+    def __init__(self, seconds: float, parent: Optional["Deadline"] = None) -> None:
+        expires_at = time.monotonic() + max(seconds, 0.0)
+        if parent is not None:
+            expires_at = min(expires_at, parent.expires_at)
+        self.expires_at = expires_at
+        self.parent = parent
+        self._cancel_reason: Optional[str] = None
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(seconds)
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def cancel_reason(self) -> Optional[str]:
+        if self._cancel_reason is not None:
+            return self._cancel_reason
+        return self.parent.cancel_reason if self.parent is not None else None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_reason is not None
+
+    @property
+    def expired(self) -> bool:
+        return self.cancelled or self.remaining() <= 0
+
+    def cancel(self, reason: str = "annulé") -> None:
+        """Annulation coopérative — propagée aux sous-budgets."""
+        if self._cancel_reason is None:
+            self._cancel_reason = reason
+
+    def check(self, stage: str = "") -> None:
+        """Lève DeadlineExceeded si le budget est épuisé ou l'opération annulée."""
+        where = f" ({stage})" if stage else ""
+        if self.cancelled:
+            raise DeadlineExceeded(f"Opération annulée{where} : {self.cancel_reason}")
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(f"Délai dépassé{where}")
+
+    def should_stop(self, stage: str = "") -> bool:
+        """Vrai si le budget est épuisé (garder le travail fait) ; lève si l'opération a été annulée."""
+        if self.cancelled:
+            self.check(stage)
+        return self.remaining() <= 0
+
+    def timeout(self, cap: float, minimum: float = 0.5) -> float:
+        """Timeout d'un appel : cap, réduit au temps restant. Lève si moins de minimum secondes."""
+        self.check()
+        remaining = self.remaining()
+        if remaining < minimum:
+            raise DeadlineExceeded("Délai dépassé : budget restant insuffisant")
+        return min(cap, remaining)
+
+    def share(self, fraction: float) -> "Deadline":
+        """Sous-budget : fraction du temps restant (ex: réserver du temps pour l'étape suivante)."""
+        return Deadline(self.remaining() * fraction, parent=self)
+
+    async def run(self, awaitable: Awaitable[T], stage: str = "") -> T:
+        """Attend awaitable dans la limite du temps restant (annulé au-delà)."""
+        try:
+            self.check(stage)
+        except DeadlineExceeded:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise
+        try:
+            return await asyncio.wait_for(awaitable, timeout=self.remaining())
+        except asyncio.TimeoutError as exc:
+            if isinstance(exc, DeadlineExceeded):
+                raise
+            raise DeadlineExceeded(f"Délai dépassé ({stage})" if stage else "Délai dépassé") from exc
+
+
+def stage_timeout(deadline: Optional[Deadline], cap: float) -> float:
+    """Timeout d'une étape : cap sans budget, sinon réduit au temps restant."""
+    return deadline.timeout(cap) if deadline is not None else cap
+
+
+async def gather_within(deadline: Optional[Deadline], awaitables: Iterable[Awaitable[Any]]) -> List[Any]:
+    """
+    asyncio.gather(return_exceptions=True) borné par le budget : les résultats
+    obtenus à l'échéance sont conservés, les tâches inachevées sont annulées
+    et remplacées par DeadlineExceeded. Lève si l'opération a été annulée.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in awaitables]
+    if deadline is None:
+        return await asyncio.gather(*tasks, return_exceptions=True)
+    if tasks:
+        await asyncio.wait(tasks, timeout=deadline.remaining())
+    results: List[Any] = []
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+            results.append(DeadlineExceeded("Délai dépassé"))
+        elif task.cancelled():
+            results.append(DeadlineExceeded("Tâche annulée"))
+        else:
+            results.append(task.exception() or task.result())
+    deadline.should_stop()
+    return results
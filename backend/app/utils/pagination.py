@@ -0,0 +1,99 @@
+"""
+Pagination par curseur (keyset) des listes : audits, claims, alertes de monitoring.
+
+La page suivante est filtrée sur la dernière ligne vue — (date, id) strictement
+après le curseur — au lieu d'un OFFSET : la requête reste un parcours d'index
+borné quelle que soit la profondeur de la page, et une insertion entre deux
+pages ne décale ni ne duplique les lignes.
+
+Le corps des réponses reste une liste (compatibilité des clients existants) ;
+la pagination passe par les en-têtes :
+  - X-Next-Cursor  curseur opaque de la page suivante (absent sur la dernière page) ;
+  - X-Total-Count  nombre total de lignes, seulement si include_total=true
+                   (COUNT sur index, non calculé par défaut).
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+class PageParams:
+    """Paramètres de pagination communs (dépendance FastAPI)."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Taille de la page"),
+        cursor: Optional[str] = Query(None, description="Curseur X-Next-Cursor de la page précédente"),
+        include_total: bool = Query(False, description="Renvoyer le total dans X-Total-Count"),
+    ) -> None:
+        self.limit = limit
+        self.cursor = cursor
+        self.include_total = include_total
+
+
+def encode_cursor(sort_value: datetime, row_id: UUID) -> str:
+    raw = f"{sort_value.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        sort_value, row_id = raw.split("|")
+        return datetime.fromisoformat(sort_value), UUID(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Curseur de pagination invalide",
+        )
+
+
+def keyset(
+    stmt: Select,
+    sort_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    page: PageParams,
+    descending: bool = True,
+) -> Select:
+    """
+    Applique tri, filtre du curseur et limite à stmt. Une ligne de plus que
+    page.limit est demandée : sa présence signale une page suivante (cf. page_items).
+    """
+    if page.cursor:
+        after = tuple_(*decode_cursor(page.cursor))
+        key = tuple_(sort_column, id_column)
+        stmt = stmt.where(key < after if descending else key > after)
+    if descending:
+        stmt = stmt.order_by(sort_column.desc(), id_column.desc())
+    else:
+        stmt = stmt.order_by(sort_column.asc(), id_column.asc())
+    return stmt.limit(page.limit + 1)
+
+
+def page_items(
+    rows: Sequence[Any],
+    page: PageParams,
+    response: Response,
+    sort_key: str = "created_at",
+    total: Optional[int] = None,
+) -> List[Any]:
+    """Tronque rows à la page et pose les en-têtes X-Next-Cursor / X-Total-Count."""
+    items = list(rows[:page.limit])
+    if len(rows) > page.limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, sort_key), last.id)
+    if total is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
+    return items
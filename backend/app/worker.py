@@ -0,0 +1,37 @@
+"""
+Worker de jobs autonome (JOBS_MODE=external) :
+
+    python -m app.worker
+
+Réclame et exécute les jobs (scan, analyse) enfilés par le process web.
+Plusieurs workers peuvent tourner en parallèle : chaque job est pris sous bail.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+
+from app.database import engine
+from app.services import audit_pipeline as _  # noqa: F401 — enregistre les handlers scan / analyze
+from app.services.jobs import start_worker_pool, stop_worker_pool
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await start_worker_pool()
+    await stop.wait()
+    logger.info("Arrêt du worker de jobs")
+    await stop_worker_pool()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
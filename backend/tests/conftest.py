@@ -4,13 +4,15 @@ from __future__ import annotations
 
 import os
 import uuid
-from typing import AsyncGenerator
+from contextlib import contextmanager
+from typing import AsyncGenerator, Iterator
 
 # Définir les variables d'env AVANT tout import de l'app
 os.environ.setdefault("SECRET_KEY", "a-very-long-secret-key-for-testing-purposes-1234567")
 os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
 os.environ.setdefault("CORS_ORIGINS", "http://localhost:5173")
 os.environ.setdefault("SUPERADMIN_EMAIL", "superadmin@test.com")
+os.environ.setdefault("JOBS_MODE", "eager")  # jobs exécutés dans la requête
 
 import pytest
 from httpx import ASGITransport, AsyncClient
@@ -30,6 +32,7 @@ from app.models.audit import Audit
 from app.models.claim import Claim
 from app.models.organization import Organization
 from app.models.user import User
+from app.services import db_stats
 
 # ---------------------------------------------------------------------------
 # SQLite compat : remplacer les UUID PostgreSQL par des String(36)
@@ -86,6 +89,16 @@ async def setup_database():
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(autouse=True)
+def blob_store(tmp_path, monkeypatch):
+    """Blob store des pièces justificatives dans un répertoire temporaire."""
+    from app.services import blob_store as blob_store_module
+
+    store = blob_store_module.LocalBlobStore(tmp_path / "blobs")
+    monkeypatch.setattr(blob_store_module, "_store", store)
+    return store
+
+
 # ---------------------------------------------------------------------------
 # Fixtures DB / HTTP
 # ---------------------------------------------------------------------------
@@ -106,6 +119,25 @@ async def client() -> AsyncGenerator[AsyncClient, None]:
         yield ac
 
 
+@pytest.fixture
+def query_budget():
+    """
+    Plafond de requêtes SQL d'un bloc (hooks de services/db_stats.py) :
+
+        with query_budget(3):
+            resp = await client.get("/api/audits", headers=headers_a)
+
+    Échoue avec le détail des requêtes émises si le plafond est dépassé.
+    """
+    @contextmanager
+    def _budget(max_statements: int) -> Iterator[db_stats.QueryStats]:
+        with db_stats.track() as stats:
+            yield stats
+        assert stats.statements <= max_statements, stats.describe()
+
+    return _budget
+
+
 # ---------------------------------------------------------------------------
 # Helpers internes
 # ---------------------------------------------------------------------------
@@ -0,0 +1,109 @@
+"""Tests des statistiques admin (vue superadmin, membres) : requêtes agrégées, en nombre constant."""
+
+from __future__ import annotations
+
+import uuid
+from contextlib import contextmanager
+
+from httpx import AsyncClient
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.audit import Audit
+from app.models.organization import Organization
+from app.models.user import User
+
+
+@contextmanager
+def _selects(db: AsyncSession):
+    """Nombre de SELECT envoyés au driver pendant le bloc."""
+    counter = {"n": 0}
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            counter["n"] += 1
+
+    engine = db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+
+async def _add_orgs(db: AsyncSession, count: int, members: int = 2, audits: int = 3) -> list:
+    org_ids = [uuid.uuid4() for _ in range(count)]
+    users, rows = [], []
+    for org_id in org_ids:
+        user_ids = [uuid.uuid4() for _ in range(members)]
+        users.extend({
+            "id": user_id, "email": f"{user_id.hex}@test.com", "company_name": "Cabinet",
+            "hashed_password": "x", "organization_id": org_id, "role": "member",
+        } for user_id in user_ids)
+        rows.extend({
+            "id": uuid.uuid4(), "organization_id": org_id, "created_by_user_id": user_ids[0],
+            "company_name": f"Entreprise {i}", "sector": "textile",
+        } for i in range(audits))
+    await db.execute(insert(Organization), [
+        {"id": org_id, "name": f"Cabinet {org_id.hex[:6]}", "contact_email": "c@test.com"}
+        for org_id in org_ids
+    ])
+    await db.execute(insert(User), users)
+    await db.execute(insert(Audit), rows)
+    await db.commit()
+    return org_ids
+
+
+async def test_overview_query_count_is_independent_of_org_count(
+    client: AsyncClient, headers_a: dict, user_a: User, db_session: AsyncSession
+):
+    user_a.is_superadmin = True
+    await db_session.commit()
+
+    await _add_orgs(db_session, 3)
+    with _selects(db_session) as few:
+        response = await client.get("/api/admin/overview", headers=headers_a)
+    assert response.status_code == 200
+
+    org_ids = await _add_orgs(db_session, 25)
+    with _selects(db_session) as many:
+        response = await client.get("/api/admin/overview", headers=headers_a)
+    assert response.status_code == 200
+
+    assert many["n"] == few["n"]
+    orgs = {o["org_id"]: o for o in response.json()}
+    assert len(orgs) == 29
+    assert orgs[str(org_ids[0])]["total_audits"] == 3
+    assert len(orgs[str(org_ids[0])]["members"]) == 2
+    assert orgs[str(user_a.organization_id)]["admin_email"] == user_a.email
+    assert orgs[str(user_a.organization_id)]["total_audits"] == 0
+
+
+async def test_members_audit_counts_use_one_grouped_query(
+    client: AsyncClient, headers_a: dict, user_a: User, db_session: AsyncSession
+):
+    db_session.add(Audit(
+        organization_id=user_a.organization_id, created_by_user_id=user_a.id,
+        company_name="Entreprise A", sector="textile",
+    ))
+    await db_session.commit()
+    with _selects(db_session) as alone:
+        response = await client.get("/api/organizations/members", headers=headers_a)
+    assert response.json()[0]["audits_count"] == 1
+
+    await db_session.execute(insert(User), [
+        {
+            "id": uuid.uuid4(), "email": f"membre{i}@test.com", "company_name": "Cabinet",
+            "hashed_password": "x", "organization_id": user_a.organization_id, "role": "member",
+        }
+        for i in range(8)
+    ])
+    await db_session.commit()
+    with _selects(db_session) as team:
+        response = await client.get("/api/organizations/members", headers=headers_a)
+
+    assert team["n"] == alone["n"]
+    counts = {m["email"]: m["audits_count"] for m in response.json()}
+    assert len(counts) == 9
+    assert counts[user_a.email] == 1
+    assert counts["membre0@test.com"] == 0
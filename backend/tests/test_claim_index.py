@@ -0,0 +1,41 @@
+"""Tests de l'index de déduplication des allégations (empreinte + quasi-doublons)."""
+
+from __future__ import annotations
+
+from app.services.claim_index import ClaimIndex, claim_fingerprint
+
+
+def test_fingerprint_ignores_case_accents_punctuation() -> None:
+    assert claim_fingerprint("« Nos emballages sont 100 % recyclés. »") == claim_fingerprint(
+        "nos EMBALLAGES sont 100% recycles"
+    )
+    assert claim_fingerprint("Nos emballages sont recyclés") != claim_fingerprint(
+        "Nos emballages sont recyclables"
+    )
+
+
+def test_near_duplicate_and_distinct_claims() -> None:
+    index = ClaimIndex(["Nous réduisons nos émissions de CO2 de 40 % d'ici 2030 sur tous nos sites."])
+    assert index.contains("Nous réduisons nos émissions de CO2 de 40 % d'ici 2030 sur l'ensemble de nos sites")
+    assert not index.contains("Nos emballages sont compostables.")
+    assert not index.contains("Nous réduisons nos émissions d'eau.")
+
+
+def test_truncated_version_matches_full_claim() -> None:
+    full = "Notre collection printemps est fabriquée à partir de coton biologique certifié GOTS et de lin français."
+    index = ClaimIndex([full[:60] + "…"])
+    assert index.contains(full)
+    assert ClaimIndex([full]).contains(full[:60] + "…")
+    # Un simple préfixe sans marque de troncature reste une allégation distincte
+    assert not ClaimIndex(["Notre collection printemps est fabriquée à partir de coton"]).contains(full)
+
+
+def test_filter_new_dedups_within_batch() -> None:
+    index = ClaimIndex(["Neutre en carbone depuis 2022"])
+    fresh = index.filter_new([
+        "neutre en carbone depuis 2022 !",
+        "Zéro déchet d'ici 2025",
+        "Zéro déchet d’ici 2025.",
+    ])
+    assert fresh == ["Zéro déchet d'ici 2025"]
+    assert len(index) == 2
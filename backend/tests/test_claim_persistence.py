@@ -0,0 +1,110 @@
+"""Tests de la persistance en lot des claims et ClaimResult (scan et re-analyse)."""
+
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import contextmanager
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.audit import Audit
+from app.models.claim import Claim
+from app.models.user import User
+from app.services import audit_pipeline
+
+_CLAIMS = [
+    "Nos emballages sont 100 % recyclables",
+    "Neutre en carbone depuis 2022",
+    "Produits fabriqués avec des matériaux durables",
+    "Nous réduisons nos émissions de 40 % d'ici 2030",
+    "Coton biologique certifié GOTS",
+]
+
+
+@contextmanager
+def _writes(db: AsyncSession):
+    """Nombre d'appels au driver par type d'écriture (INSERT INTO claims, DELETE FROM claim_results…)."""
+    counts: Counter = Counter()
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        words = statement.split()
+        if words[0] in ("INSERT", "DELETE", "UPDATE"):
+            table = words[2] if words[0] in ("INSERT", "DELETE") else words[1]
+            counts[f"{words[0]} {table}"] += 1
+
+    engine = db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        yield counts
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+
+async def _reloaded(db: AsyncSession, audit_id) -> Audit:
+    db.expire_all()
+    return (await db.execute(
+        select(Audit)
+        .where(Audit.id == audit_id)
+        .options(selectinload(Audit.claims).selectinload(Claim.results))
+    )).scalar_one()
+
+
+def _as_db_view(response_claims) -> dict:
+    return {
+        c.id: (c.overall_verdict, sorted((r.id, r.criterion, r.verdict) for r in c.results))
+        for c in response_claims
+    }
+
+
+async def test_scan_inserts_claims_and_results_in_bulk(
+    db_session: AsyncSession, user_a: User, monkeypatch
+):
+    async def _page(url: str, deadline=None, db=None) -> str:
+        return " ".join(_CLAIMS)
+
+    monkeypatch.setattr(audit_pipeline, "scrape_website", _page)
+    monkeypatch.setattr(
+        audit_pipeline, "extract_claims_lexical",
+        lambda text, existing, audited_company_name="": [{"claim_text": c} for c in _CLAIMS],
+    )
+
+    with _writes(db_session) as writes:
+        response = await audit_pipeline.scan_and_analyze(
+            db_session, user_a.organization_id, user_a.id,
+            url="https://exemple.fr", company_name="Exemple", scan_mode="lexical",
+        )
+
+    assert writes["INSERT claims"] == 1
+    assert writes["INSERT claim_results"] == 1
+    assert len(response.claims) == len(_CLAIMS)
+    assert all(len(c.results) >= 7 for c in response.claims)
+
+    # Réponse construite en mémoire = état en base
+    audit = await _reloaded(db_session, response.audit_id)
+    assert audit.total_claims == len(_CLAIMS)
+    assert _as_db_view(audit.claims) == _as_db_view(response.claims)
+    assert all(c.status == "À traiter" and c.is_corrected is False for c in audit.claims)
+
+
+async def test_reanalysis_replaces_results_in_one_delete_and_insert(
+    db_session: AsyncSession, user_a: User, audit_a: Audit
+):
+    for text in _CLAIMS:
+        db_session.add(Claim(audit_id=audit_a.id, claim_text=text, support_type="web", scope="produit"))
+    await db_session.commit()
+
+    first = await audit_pipeline.analyze_audit_claims(db_session, audit_a.id, user_a.organization_id)
+    with _writes(db_session) as writes:
+        second = await audit_pipeline.analyze_audit_claims(db_session, audit_a.id, user_a.organization_id)
+
+    assert writes["DELETE claim_results"] == 1
+    assert writes["INSERT claim_results"] == 1
+    first_ids = {r.id for c in first.claims for r in c.results}
+    second_ids = {r.id for c in second.claims for r in c.results}
+    assert first_ids.isdisjoint(second_ids)
+
+    audit = await _reloaded(db_session, audit_a.id)
+    assert audit.status == "completed"
+    assert _as_db_view(audit.claims) == _as_db_view(second.claims)
@@ -0,0 +1,119 @@
+"""Tests de l'instrumentation SQL : budgets de requêtes par endpoint, en-têtes debug, logs lents / N+1."""
+
+from __future__ import annotations
+
+import logging
+import uuid
+
+from httpx import AsyncClient
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.audit import Audit
+from app.models.claim import Claim
+from app.models.claim_result import ClaimResult
+from app.models.user import User
+from app.services import db_stats
+
+# Requêtes SQL au plus par endpoint, authentification comprise — indépendant du
+# nombre d'audits, de claims ou de membres
+_BUDGETS = {
+    "/api/audits": 2,
+    "/api/audits/{audit_id}": 3,
+    "/api/audits/{audit_id}/claims": 4,
+    "/api/claims/{claim_id}/evidence": 3,
+    "/api/monitoring/unread-summary": 2,
+    "/api/organizations/members": 3,
+    "/api/admin/overview": 5,
+}
+
+
+async def _seed(db: AsyncSession, user: User, audit: Audit) -> None:
+    await db.execute(insert(Audit), [
+        {
+            "id": uuid.uuid4(), "organization_id": user.organization_id,
+            "company_name": f"Entreprise {i}", "sector": "textile", "created_by_user_id": user.id,
+        }
+        for i in range(10)
+    ])
+    claim_ids = [uuid.uuid4() for _ in range(10)]
+    await db.execute(insert(Claim), [
+        {"id": claim_id, "audit_id": audit.id, "claim_text": "Produit durable",
+         "support_type": "web", "scope": "produit"}
+        for claim_id in claim_ids
+    ])
+    await db.execute(insert(ClaimResult), [
+        {"id": uuid.uuid4(), "claim_id": claim_id, "criterion": criterion,
+         "verdict": "risque", "explanation": "—"}
+        for claim_id in claim_ids for criterion in ("specificite", "justification")
+    ])
+    await db.execute(insert(User), [
+        {"id": uuid.uuid4(), "email": f"membre{i}@test.com", "company_name": "Cabinet",
+         "hashed_password": "x", "organization_id": user.organization_id}
+        for i in range(5)
+    ])
+    await db.commit()
+
+
+async def test_endpoints_stay_within_query_budget(
+    client: AsyncClient, headers_a: dict, user_a: User, audit_a: Audit, claim_a: Claim,
+    db_session: AsyncSession, query_budget,
+):
+    user_a.is_superadmin = True
+    await _seed(db_session, user_a, audit_a)
+
+    for endpoint, budget in _BUDGETS.items():
+        with query_budget(budget):
+            response = await client.get(
+                endpoint.format(audit_id=audit_a.id, claim_id=claim_a.id), headers=headers_a,
+            )
+        assert response.status_code == 200, (endpoint, response.text)
+
+
+async def test_debug_headers_only_when_enabled(
+    client: AsyncClient, headers_a: dict, audit_a: Audit, monkeypatch
+):
+    response = await client.get("/api/audits", headers=headers_a)
+    assert "X-DB-Queries" not in response.headers
+
+    monkeypatch.setattr(db_stats.settings, "DB_STATS_HEADERS", True)
+    response = await client.get("/api/audits", headers=headers_a)
+    assert response.headers["X-DB-Queries"] == "2"
+    assert float(response.headers["X-DB-Time-Ms"]) >= 0
+    assert response.headers["X-DB-Slowest"].split(" ", 1)[1].startswith("SELECT")
+
+
+async def test_routes_are_aggregated_for_admin(
+    client: AsyncClient, headers_a: dict, user_a: User, audit_a: Audit, db_session: AsyncSession
+):
+    user_a.is_superadmin = True
+    await db_session.commit()
+    db_stats.db_stats.reset()
+
+    await client.get(f"/api/audits/{audit_a.id}", headers=headers_a)
+    await client.get(f"/api/audits/{uuid.uuid4()}", headers=headers_a)
+    response = await client.get("/api/admin/db/stats", headers=headers_a)
+
+    route = response.json()["routes"]["GET /api/audits/{audit_id}"]
+    assert route["requests"] == 2
+    assert route["statements_max"] == 3
+    assert route["n_plus_one"] == 0
+
+
+async def test_slow_queries_and_repeated_statements_are_logged(
+    db_session: AsyncSession, user_a: User, monkeypatch, caplog
+):
+    monkeypatch.setattr(db_stats.settings, "DB_SLOW_QUERY_MS", 0)
+    stats_by_route = db_stats.RouteDbStats()
+
+    with caplog.at_level(logging.WARNING, logger="app.services.db_stats"):
+        with db_stats.track() as stats:
+            for _ in range(12):
+                await db_session.execute(select(User).where(User.id == user_a.id))
+        stats_by_route.record_request("GET /api/exemple", stats)
+
+    assert stats.statements == 12
+    assert len(stats.slowest) == 3
+    assert sum("Requête SQL lente" in r.message for r in caplog.records) == 12
+    assert any("N+1 probable sur GET /api/exemple : 12 ×" in r.message for r in caplog.records)
+    assert stats_by_route.snapshot()["GET /api/exemple"]["n_plus_one"] == 1
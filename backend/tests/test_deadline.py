@@ -0,0 +1,86 @@
+"""Tests du budget de temps propagé (Deadline) — sous-budgets, annulation, scraping borné."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services import monitoring_service
+from app.utils.deadline import Deadline, DeadlineExceeded, gather_within, stage_timeout
+
+
+def test_share_is_capped_by_parent_and_inherits_cancellation() -> None:
+    parent = Deadline.after(10)
+    child = parent.share(0.5)
+    assert 4 < child.remaining() <= 5
+    assert Deadline(60, parent=parent).remaining() <= 10
+
+    parent.cancel("client parti")
+    assert child.cancelled and child.expired
+    with pytest.raises(DeadlineExceeded, match="client parti"):
+        child.check("scraping")
+    with pytest.raises(DeadlineExceeded):
+        child.should_stop()
+
+
+def test_stage_timeout_sized_from_remaining_budget() -> None:
+    assert stage_timeout(None, 15.0) == 15.0
+    assert stage_timeout(Deadline.after(3), 15.0) <= 3
+    assert stage_timeout(Deadline.after(100), 15.0) == 15.0
+    with pytest.raises(DeadlineExceeded):
+        stage_timeout(Deadline.after(0.1), 15.0)
+
+
+async def test_gather_within_keeps_finished_results() -> None:
+    async def _after(delay: float, value: str) -> str:
+        await asyncio.sleep(delay)
+        return value
+
+    async def _boom() -> str:
+        raise ValueError("404")
+
+    started = time.monotonic()
+    results = await gather_within(Deadline.after(0.2), [_after(0.01, "a"), _after(5, "b"), _boom()])
+    assert time.monotonic() - started < 1
+    assert results[0] == "a"
+    assert isinstance(results[1], DeadlineExceeded)
+    assert isinstance(results[2], ValueError)
+
+
+async def test_jina_scrape_bounded_by_deadline(monkeypatch) -> None:
+    timeouts = []
+
+    async def _slow_page(request: httpx.Request) -> httpx.Response:
+        timeouts.append(request.extensions["timeout"]["read"])
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, text="Nos emballages sont 100% recyclés. " * 5)
+
+    real_client = httpx.AsyncClient
+
+    def _client(*args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(_slow_page)
+        return real_client(*args, **kwargs)
+
+    monkeypatch.setattr(monitoring_service.httpx, "AsyncClient", _client)
+
+    started = time.monotonic()
+    text = await monitoring_service._scrape_jina("https://exemple.fr", Deadline.after(1.0))
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 1.5  # 16 chemins × 0,2 s sans budget
+    assert "=== PAGE: https://exemple.fr ===" in text  # pages déjà lues conservées
+    assert 1 <= len(timeouts) < 16
+    assert all(t <= 1.0 for t in timeouts)  # timeout de requête dérivé du budget
+
+
+async def test_cancelled_extraction_is_not_swallowed_by_fallback(monkeypatch) -> None:
+    monkeypatch.setattr(monitoring_service.settings, "ANTHROPIC_API_KEY", "sk-test")
+    deadline = Deadline.after(30)
+    deadline.cancel("client parti")
+    with pytest.raises(DeadlineExceeded):
+        await monitoring_service.extract_claims_with_claude(
+            "Nos emballages sont 100% recyclés.", [], lexical_fallback=True, deadline=deadline
+        )
@@ -0,0 +1,461 @@
+"""Tests du vault de preuves — blob store adressé par sha256, déduplication, backends."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import uuid
+import zipfile
+
+import re
+from contextlib import contextmanager
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.audit import Audit
+from app.models.claim import Claim
+from app.models.client_access import ClientAccess
+from app.models.evidence import EvidenceBlob, EvidenceFile
+from app.models.organization import Organization
+from app.models.user import User
+from app.services.blob_store import (
+    BlobNotFound,
+    BlobStore,
+    BlobTooLarge,
+    LocalBlobStore,
+    S3BlobStore,
+    blob_key,
+    put_blob_stream,
+)
+
+_PDF = b"%PDF-1.4 certificat GOTS " + b"x" * 2048
+
+
+async def _upload(client: AsyncClient, headers: dict, claim_id, data: bytes = _PDF, name: str = "gots.pdf"):
+    return await client.post(
+        f"/api/claims/{claim_id}/evidence",
+        headers=headers,
+        files={"file": (name, data, "application/pdf")},
+        data={"document_type": "certification"},
+    )
+
+
+async def _second_claim(db: AsyncSession, claim: Claim) -> Claim:
+    other = Claim(
+        id=uuid.uuid4(), audit_id=claim.audit_id, claim_text="Coton biologique certifié",
+        support_type="web", scope="produit",
+    )
+    db.add(other)
+    await db.commit()
+    return other
+
+
+async def test_identical_uploads_share_one_blob(
+    client: AsyncClient, headers_a: dict, claim_a: Claim, db_session: AsyncSession, blob_store
+):
+    other = await _second_claim(db_session, claim_a)
+    first = await _upload(client, headers_a, claim_a.id)
+    second = await _upload(client, headers_a, other.id, name="copie.pdf")
+    assert first.status_code == second.status_code == 201
+
+    rows = (await db_session.execute(select(EvidenceFile))).scalars().all()
+    sha256 = hashlib.sha256(_PDF).hexdigest()
+    assert {r.sha256 for r in rows} == {sha256}
+    stored = (await db_session.execute(select(EvidenceFile.file_data))).scalars().all()
+    assert stored == [None, None]  # contenu hors base
+    assert [p.name for p in blob_store.root.rglob("*") if p.is_file()] == [sha256]
+
+    download = await client.get(f"/api/evidence/{first.json()['id']}/download", headers=headers_a)
+    assert download.content == _PDF
+
+    # Blob conservé tant qu'une pièce le référence
+    await client.delete(f"/api/evidence/{first.json()['id']}", headers=headers_a)
+    assert blob_store.exists(sha256)
+    await client.delete(f"/api/evidence/{second.json()['id']}", headers=headers_a)
+    assert not blob_store.exists(sha256)
+
+
+async def test_zip_reads_blobs_and_legacy_rows(
+    client: AsyncClient, headers_a: dict, claim_a: Claim, db_session: AsyncSession
+):
+    """Une ligne pas encore migrée (file_data en base) reste téléchargeable."""
+    await _upload(client, headers_a, claim_a.id)
+    legacy = b"ancien rapport interne"
+    db_session.add(EvidenceFile(
+        claim_id=claim_a.id, filename="ancien.pdf", content_type="application/pdf",
+        file_data=legacy, file_size=len(legacy),
+    ))
+    await db_session.commit()
+
+    response = await client.get(f"/api/audits/{claim_a.audit_id}/evidence/download-zip", headers=headers_a)
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    contents = {name.rsplit("/", 1)[-1]: archive.read(name) for name in archive.namelist()}
+    assert contents["gots.pdf"] == _PDF
+    assert contents["ancien.pdf"] == legacy
+    assert hashlib.sha256(legacy).hexdigest() in contents["Tracabilite.txt"].decode()
+
+    # Ligne legacy versée dans le blob store au passage : plus rien en base
+    stored = (await db_session.execute(
+        select(EvidenceFile.sha256, EvidenceFile.file_data).where(EvidenceFile.filename == "ancien.pdf")
+    )).one()
+    assert stored == (hashlib.sha256(legacy).hexdigest(), None)
+
+
+async def test_zip_refused_before_streaming_when_a_blob_is_missing(
+    client: AsyncClient, headers_a: dict, claim_a: Claim, blob_store
+):
+    """Blob absent du store : erreur explicite au lieu d'une archive tronquée."""
+    await _upload(client, headers_a, claim_a.id)
+    blob_store.remove(blob_key(_PDF))
+
+    response = await client.get(f"/api/audits/{claim_a.audit_id}/evidence/download-zip", headers=headers_a)
+    assert response.status_code == 500
+    assert response.headers["content-type"] == "application/json"
+    assert "gots.pdf" in response.json()["detail"]
+
+
+async def test_zip_is_streamed_in_chunks_with_stored_pdfs(
+    client: AsyncClient, headers_a: dict, claim_a: Claim, db_session: AsyncSession, monkeypatch
+):
+    from app.services import evidence_export
+
+    big = b"%PDF-1.7 dossier " + bytes(range(256)) * 4000  # ~1 Mo
+    doc = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"texte word " * 500
+    await _upload(client, headers_a, claim_a.id, data=big, name="dossier.pdf")
+    await client.post(
+        f"/api/claims/{claim_a.id}/evidence", headers=headers_a,
+        files={"file": ("notes.doc", doc, "application/msword")},
+    )
+    db_session.add(ClientAccess(audit_id=claim_a.audit_id, token="z" * 40, client_email="client@test.com"))
+    await db_session.commit()
+
+    chunks: list[bytes] = []
+    stream_zip = evidence_export.stream_zip
+
+    async def _spy(*args):
+        async for chunk in stream_zip(*args):
+            chunks.append(chunk)
+            yield chunk
+
+    monkeypatch.setattr(evidence_export, "stream_zip", _spy)
+    for url, headers in (
+        (f"/api/audits/{claim_a.audit_id}/evidence/download-zip", headers_a),
+        (f"/api/share/{'z' * 40}/zip", {}),
+    ):
+        chunks.clear()
+        response = await client.get(url, headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        # Morceaux bornés : l'archive n'est jamais construite en mémoire
+        assert len(chunks) > 4
+        assert max(len(c) for c in chunks) <= evidence_export._CHUNK_SIZE + 1024
+
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert archive.testzip() is None
+        infos = {i.filename.rsplit("/", 1)[-1]: i for i in archive.infolist()}
+        assert infos["dossier.pdf"].compress_type == zipfile.ZIP_STORED
+        assert infos["notes.doc"].compress_type == zipfile.ZIP_DEFLATED
+        assert archive.read(infos["dossier.pdf"]) == big
+        tracability = archive.read("Tracabilite.txt").decode()
+        assert hashlib.sha256(big).hexdigest() in tracability
+        assert "Nombre de fichiers : 2" in tracability
+
+    access = (await db_session.execute(select(ClientAccess))).scalar_one()
+    await db_session.refresh(access)
+    assert access.zip_downloaded_at is not None
+
+
+@contextmanager
+def _binary_selects(db: AsyncSession):
+    """Requêtes SQL qui rapatrient file_data ou logo_data (has_logo = IS NOT NULL toléré)."""
+    selects: list[str] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return
+        columns = re.sub(r"logo_data IS NOT NULL", "", statement.split(" FROM ")[0])
+        if "file_data" in columns or "logo_data" in columns:
+            selects.append(statement)
+
+    engine = db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        yield selects
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+
+async def test_listing_endpoints_never_fetch_blob_bytes(
+    client: AsyncClient, headers_a: dict, user_a: User, claim_a: Claim, db_session: AsyncSession
+):
+    logo = b"\x89PNG logo cabinet"
+    await db_session.execute(
+        update(Organization).where(Organization.id == user_a.organization_id)
+        .values(logo_data=logo, logo_content_type="image/png")
+    )
+    db_session.add(EvidenceFile(
+        claim_id=claim_a.id, filename="ancien.pdf", content_type="application/pdf",
+        file_data=b"ancien rapport", file_size=14,
+    ))
+    db_session.add(ClientAccess(audit_id=claim_a.audit_id, token="t" * 40, client_email="client@test.com"))
+    await db_session.commit()
+    await _upload(client, headers_a, claim_a.id)
+
+    with _binary_selects(db_session) as selects:
+        shared = await client.get(f"/api/share/{'t' * 40}")
+        listed = await client.get(f"/api/claims/{claim_a.id}/evidence", headers=headers_a)
+        me = await client.get("/api/auth/me", headers=headers_a)
+        org = await client.get("/api/organizations/me", headers=headers_a)
+    assert selects == []
+
+    assert shared.json()["claims"][0]["evidence_count"] == 2
+    assert shared.json()["has_evidence"] is True
+    assert shared.json()["branding"]["has_logo"] is True
+    assert len(listed.json()) == 2
+    assert me.json()["organization"]["has_logo"] is True
+    assert org.json()["has_logo"] is True
+
+    # Les endpoints de contenu lisent toujours les octets, explicitement
+    assert (await client.get(f"/api/share/{'t' * 40}/logo")).content == logo
+    assert (await client.get(f"/api/organizations/logo/{user_a.organization_id}")).content == logo
+
+
+async def test_upload_streams_large_file_and_persists_hash(
+    client: AsyncClient, headers_a: dict, claim_a: Claim, db_session: AsyncSession, blob_store
+):
+    big = b"%PDF-1.7 rapport ACV " + bytes(range(256)) * 1200  # plusieurs morceaux de 64 Ko
+    response = await _upload(client, headers_a, claim_a.id, data=big, name="acv.pdf")
+    assert response.status_code == 201
+    assert response.json()["file_size"] == len(big)
+
+    row = (await db_session.execute(select(EvidenceFile))).scalar_one()
+    assert row.sha256 == hashlib.sha256(big).hexdigest()
+    assert blob_store.read(row.sha256) == big
+    assert not any(blob_store.staging_dir().iterdir())
+
+
+async def test_upload_rejects_oversized_and_mismatched_files(
+    client: AsyncClient, headers_a: dict, claim_a: Claim, db_session: AsyncSession, blob_store, monkeypatch
+):
+    from app.routers import evidence as evidence_router
+
+    monkeypatch.setattr(evidence_router, "MAX_FILE_SIZE", 100_000)
+    too_big = await _upload(client, headers_a, claim_a.id, data=b"%PDF" + b"x" * 100_000)
+    assert too_big.status_code == 413
+
+    fake_pdf = await _upload(client, headers_a, claim_a.id, data=b"MZ\x90\x00 executable")
+    assert fake_pdf.status_code == 400
+
+    assert (await db_session.execute(select(EvidenceFile))).first() is None
+    assert not [p for p in blob_store.root.rglob("*") if p.is_file()]
+
+
+async def test_oversized_upload_rejected_before_route(
+    client: AsyncClient, headers_a: dict, claim_a: Claim, db_session: AsyncSession, blob_store
+):
+    from app.routers import evidence as evidence_router
+
+    response = await _upload(
+        client, headers_a, claim_a.id, data=b"%PDF" + b"x" * evidence_router.MAX_UPLOAD_BODY_SIZE
+    )
+    assert response.status_code == 413
+    assert response.json()["detail"] == evidence_router.UPLOAD_TOO_LARGE_DETAIL
+    assert (await db_session.execute(select(EvidenceFile))).first() is None
+
+
+async def _run_limited(headers: list, chunk_count: int = 1000):
+    """Envoi par morceaux de 64 Ko à travers BodySizeLimitMiddleware (limite 256 Ko)."""
+    from app.utils.body_limit import BodySizeLimitMiddleware
+
+    pulled: list = []
+    reached_end: list = []
+    sent: list = []
+
+    async def receive():
+        pulled.append(True)
+        return {"type": "http.request", "body": b"x" * 65536, "more_body": len(pulled) < chunk_count}
+
+    async def send(message):
+        sent.append(message)
+
+    async def app(scope, receive, send):
+        while (await receive()).get("more_body"):
+            pass
+        reached_end.append(True)
+
+    middleware = BodySizeLimitMiddleware(app, r"/upload", max_size=256 * 1024, detail="Trop gros")
+    scope = {"type": "http", "method": "POST", "path": "/upload", "headers": headers}
+    await middleware(scope, receive, send)
+    return len(pulled), reached_end, sent[0]["status"]
+
+
+async def test_body_limit_stops_reading_once_crossed() -> None:
+    pulled, reached_end, status = await _run_limited([])
+    assert status == 413
+    assert not reached_end
+    assert pulled == 5  # 4 morceaux tiennent dans la limite, le 5e la franchit
+
+
+async def test_body_limit_rejects_declared_length_without_reading() -> None:
+    pulled, reached_end, status = await _run_limited([(b"content-length", str(1000 * 65536).encode())])
+    assert status == 413
+    assert pulled == 0 and not reached_end
+
+
+async def test_put_blob_stream_aborts_as_soon_as_limit_is_crossed(blob_store, db_session: AsyncSession):
+    consumed = []
+
+    async def _chunks():
+        for i in range(10):
+            consumed.append(i)
+            yield b"x" * 1000
+
+    with pytest.raises(BlobTooLarge):
+        await put_blob_stream(db_session, _chunks(), max_size=2500)
+    assert consumed == [0, 1, 2]
+    assert not [p for p in blob_store.root.rglob("*") if p.is_file()]
+
+
+async def test_blob_is_locked_from_write_to_release(
+    client: AsyncClient, headers_a: dict, claim_a: Claim, db_session: AsyncSession,
+    blob_store, monkeypatch,
+):
+    """Envoi et suppression verrouillent l'empreinte avant d'écrire / compter / supprimer le blob."""
+    events: list[str] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if "evidence_blobs" in statement or "count(" in statement.lower():
+            events.append(statement.split()[0].upper())
+
+    for name in ("write_file", "remove"):
+        original = getattr(blob_store, name)
+
+        def _traced(*args, _original=original, _name=name):
+            events.append(_name)
+            return _original(*args)
+
+        monkeypatch.setattr(blob_store, name, _traced)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        evidence_id = (await _upload(client, headers_a, claim_a.id)).json()["id"]
+        assert events == ["INSERT", "write_file"]
+        events.clear()
+        await client.delete(f"/api/evidence/{evidence_id}", headers=headers_a)
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+    # Verrou, comptage des références, suppression du blob puis de sa ligne
+    assert events[:4] == ["INSERT", "SELECT", "remove", "DELETE"]
+    assert not blob_store.exists(blob_key(_PDF))
+    assert (await db_session.execute(select(EvidenceBlob))).scalars().all() == []
+
+
+class _MissingKey(Exception):
+    response = {"Error": {"Code": "404"}}
+
+
+class _FakeS3:
+    """Stand-in S3 en mémoire (API boto3 : head/put/get/delete_object, upload_file)."""
+
+    def __init__(self) -> None:
+        self.objects: dict = {}
+        self.puts = 0
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise _MissingKey()
+        return {"ContentLength": len(self.objects[(Bucket, Key)])}
+
+    def put_object(self, Bucket, Key, Body):
+        self.puts += 1
+        self.objects[(Bucket, Key)] = bytes(Body)
+
+    def upload_file(self, Filename, Bucket, Key):
+        with open(Filename, "rb") as f:
+            self.put_object(Bucket, Key, f.read())
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise _MissingKey()
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+def test_incomplete_blob_store_rejected_at_instantiation() -> None:
+    class _NoRemove(BlobStore):
+        def exists(self, sha256):
+            return False
+
+        def write(self, sha256, data):
+            pass
+
+        def read(self, sha256):
+            raise BlobNotFound(sha256)
+
+        def open(self, sha256):
+            raise BlobNotFound(sha256)
+
+    with pytest.raises(TypeError):
+        _NoRemove()
+
+
+@pytest.mark.parametrize("backend", ["local", "s3"])
+def test_blob_store_backends(backend: str, tmp_path) -> None:
+    fake = _FakeS3()
+    store = LocalBlobStore(tmp_path) if backend == "local" else S3BlobStore("preuves", client=fake)
+    sha256 = blob_key(_PDF)
+
+    assert not store.exists(sha256)
+    with pytest.raises(BlobNotFound):
+        store.read(sha256)
+    store.write(sha256, _PDF)
+    store.write(sha256, _PDF)
+    assert store.exists(sha256) and store.read(sha256) == _PDF
+    if backend == "s3":
+        assert fake.puts == 1  # déjà présent : pas de second envoi
+        assert ("preuves", f"evidence/{sha256}") in fake.objects
+    store.remove(sha256)
+    assert not store.exists(sha256)
+
+    # Fichier reçu par morceaux : déplacé (local) ou envoyé par upload_file (S3)
+    received = tmp_path / "reception.upload"
+    received.write_bytes(_PDF)
+    store.write_file(sha256, received)
+    assert store.read(sha256) == _PDF
+
+
+async def test_upload_rescores_audit_from_claim_verdicts(
+    client: AsyncClient, headers_a: dict, claim_a: Claim, db_session: AsyncSession, query_budget
+):
+    # Audit analysé : justification « non_conforme » (aucune preuve), puis certification déposée
+    await client.post(f"/api/audits/{claim_a.audit_id}/analyze", headers=headers_a)
+    second = await _second_claim(db_session, claim_a)
+    second.overall_verdict, second.is_false_positive = "non_conforme", True
+    await db_session.execute(
+        update(Audit).where(Audit.id == claim_a.audit_id)
+        .values(conforming_claims=0, at_risk_claims=0, non_conforming_claims=5)
+    )
+    await db_session.commit()
+
+    # Dont le verrou de l'empreinte (upsert evidence_blobs)
+    with query_budget(13):
+        assert (await _upload(client, headers_a, claim_a.id)).status_code == 201
+
+    claims = (await client.get(f"/api/audits/{claim_a.audit_id}/claims", headers=headers_a)).json()
+    verdict = next(c["overall_verdict"] for c in claims if c["id"] == str(claim_a.id))
+    audit = (await client.get(f"/api/audits/{claim_a.audit_id}", headers=headers_a)).json()
+    counts = {
+        "conforme": audit["conforming_claims"], "risque": audit["at_risk_claims"],
+        "non_conforme": audit["non_conforming_claims"],
+    }
+    # Seule la claim analysée compte (faux positif exclu)
+    assert sum(counts.values()) == 1
+    assert counts[verdict] == 1
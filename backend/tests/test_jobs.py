@@ -0,0 +1,331 @@
+"""Tests des jobs asynchrones — 202 + suivi, erreurs, bail (lease), reprise, partage équitable, budget et annulation."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.limiter import limiter
+from app.models.audit import Audit
+from app.models.claim import Claim
+from app.models.job import Job
+from app.models.organization import Organization
+from app.models.user import User
+from app.services import audit_pipeline, jobs
+from app.services.jobs import claim_job, execute_job
+
+
+@pytest.fixture(autouse=True)
+def _reset_limiter():
+    limiter.reset()
+    yield
+    limiter.reset()
+
+
+@pytest.fixture
+def session_factory(db_session: AsyncSession):
+    """Sessions sur la connexion de test (comme les workers en production)."""
+    return async_sessionmaker(bind=db_session.bind, class_=AsyncSession, expire_on_commit=False)
+
+
+async def test_analyze_returns_202_and_job_result(
+    client: AsyncClient, db_session: AsyncSession, audit_a: Audit, claim_a: Claim, headers_a: dict
+):
+    resp = await client.post(f"/api/audits/{audit_a.id}/analyze", headers=headers_a)
+    assert resp.status_code == 202, resp.text
+    job_id = resp.json()["id"]
+
+    resp = await client.get(f"/api/jobs/{job_id}", headers=headers_a)
+    assert resp.status_code == 200
+    job = resp.json()
+    assert job["status"] == "succeeded"
+    assert job["progress"] == 100
+    assert job["audit_id"] == str(audit_a.id)
+    assert job["result"]["status"] == "completed"
+    assert job["result"]["total_claims"] == 1
+
+    await db_session.refresh(audit_a)
+    assert audit_a.status == "completed"
+
+
+async def test_scan_failure_reported_on_job(client: AsyncClient, headers_a: dict, monkeypatch):
+    async def _empty(url: str, deadline=None, db=None) -> str:
+        return ""
+
+    monkeypatch.setattr(audit_pipeline, "scrape_website", _empty)
+    resp = await client.post("/api/audits/scan", json={
+        "url": "https://exemple.fr",
+        "company_name": "Exemple",
+    }, headers=headers_a)
+    assert resp.status_code == 202, resp.text
+    job = resp.json()
+    assert job["status"] == "failed"
+    assert job["error_status"] == 422
+    assert "Impossible de récupérer" in job["error"]
+
+
+async def test_job_tenant_isolation(
+    client: AsyncClient, audit_a: Audit, claim_a: Claim, headers_a: dict, headers_b: dict
+):
+    resp = await client.post(f"/api/audits/{audit_a.id}/analyze", headers=headers_a)
+    job_id = resp.json()["id"]
+    resp = await client.get(f"/api/jobs/{job_id}", headers=headers_b)
+    assert resp.status_code == 404
+
+
+async def test_expired_lease_is_reclaimed(
+    db_session: AsyncSession, session_factory, user_a: User, audit_a: Audit, claim_a: Claim
+):
+    now = datetime.now(timezone.utc)
+    stale = Job(
+        kind="analyze", status="running", organization_id=user_a.organization_id,
+        audit_id=audit_a.id, attempts=1, lease_owner="worker-mort",
+        lease_expires_at=now - timedelta(minutes=5),
+    )
+    live = Job(
+        kind="analyze", status="running", organization_id=user_a.organization_id,
+        audit_id=audit_a.id, attempts=1, lease_owner="worker-actif",
+        lease_expires_at=now + timedelta(minutes=5),
+    )
+    db_session.add_all([stale, live])
+    await db_session.commit()
+
+    assert await claim_job(session_factory, "worker-2", job_id=live.id) is None
+    assert await claim_job(session_factory, "worker-2") == stale.id
+    # Un second worker ne peut pas réclamer le même job
+    assert await claim_job(session_factory, "worker-3", job_id=stale.id) is None
+
+    await execute_job(session_factory, stale.id, "worker-2", heartbeat=False)
+    await db_session.refresh(stale)
+    assert stale.status == "succeeded"
+    assert stale.attempts == 2
+    assert stale.lease_owner is None
+
+
+async def test_unexpected_error_is_retried_then_failed(
+    db_session: AsyncSession, session_factory, user_a: User, monkeypatch
+):
+    calls = []
+
+    async def _boom(ctx):
+        calls.append(ctx.job_id)
+        raise RuntimeError("panne réseau")
+
+    monkeypatch.setitem(jobs._HANDLERS, "test_boom", _boom)
+    monkeypatch.setattr(jobs.settings, "JOBS_MODE", "external")
+    job = await jobs.enqueue_job(db_session, "test_boom", {}, organization_id=user_a.organization_id)
+    assert job.status == "queued"
+
+    for attempt in range(1, job.max_attempts + 1):
+        assert await claim_job(session_factory, "worker") == job.id
+        await execute_job(session_factory, job.id, "worker", heartbeat=False)
+        await db_session.refresh(job)
+        expected = "failed" if attempt == job.max_attempts else "queued"
+        assert job.status == expected, attempt
+
+    assert len(calls) == job.max_attempts
+    assert job.error == "panne réseau"
+    assert job.error_status == 500
+    assert await claim_job(session_factory, "worker") is None
+
+
+async def test_eager_mode_retries_inline_instead_of_leaving_job_queued(
+    db_session: AsyncSession, user_a: User, monkeypatch
+):
+    calls = []
+
+    async def _flaky(ctx):
+        calls.append(ctx.job_id)
+        if len(calls) == 1:
+            raise RuntimeError("panne passagère")
+        return {"ok": True}
+
+    async def _boom(ctx):
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(jobs._HANDLERS, "test_flaky", _flaky)
+    monkeypatch.setitem(jobs._HANDLERS, "test_boom", _boom)
+
+    job = await jobs.enqueue_job(db_session, "test_flaky", {}, organization_id=user_a.organization_id)
+    assert (job.status, job.attempts, job.result) == ("succeeded", 2, {"ok": True})
+
+    job = await jobs.enqueue_job(db_session, "test_boom", {}, organization_id=user_a.organization_id)
+    assert (job.status, job.attempts, job.error) == ("failed", job.max_attempts, "boom")
+
+
+async def test_replayed_scan_job_reuses_its_audit(
+    db_session: AsyncSession, session_factory, user_a: User, monkeypatch
+):
+    async def _page(url: str, deadline=None, db=None) -> str:
+        return "Nos emballages sont 100 % recyclables."
+
+    monkeypatch.setattr(audit_pipeline, "scrape_website", _page)
+    monkeypatch.setattr(jobs.settings, "JOBS_MODE", "external")
+    job = await jobs.enqueue_job(db_session, "scan", {
+        "url": "https://exemple.fr", "company_name": "Exemple", "scan_mode": "lexical",
+    }, organization_id=user_a.organization_id, user_id=user_a.id)
+
+    assert await claim_job(session_factory, "worker") == job.id
+    await execute_job(session_factory, job.id, "worker", heartbeat=False)
+    # Worker arrêté après le commit du scan mais avant l'issue du job : rejoué
+    await db_session.execute(
+        update(Job).where(Job.id == job.id).values(status="queued", result=None, audit_id=None)
+    )
+    await db_session.commit()
+    assert await claim_job(session_factory, "worker-2") == job.id
+    await execute_job(session_factory, job.id, "worker-2", heartbeat=False)
+
+    await db_session.refresh(job)
+    audits = (await db_session.execute(select(Audit))).scalars().all()
+    assert [a.id for a in audits] == [audit_pipeline.scan_audit_id(job.id)]
+    assert (job.status, job.audit_id) == ("succeeded", audits[0].id)
+    assert job.result["total_claims"] == 1
+    org = await db_session.get(Organization, user_a.organization_id)
+    await db_session.refresh(org)
+    assert org.audits_this_month == 1
+
+
+# ---------------------------------------------------------------------------
+# Partage équitable entre organisations
+# ---------------------------------------------------------------------------
+
+def _queued(organization_id, minutes_ago: int, priority: str = "interactive") -> Job:
+    return Job(
+        kind="analyze", status="queued", priority=priority, organization_id=organization_id,
+        created_at=datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+    )
+
+
+async def test_claim_serves_least_served_tenant_first(
+    db_session: AsyncSession, session_factory, user_a: User, user_b: User
+):
+    # L'agence A a enfilé 5 jobs avant que B n'en enfile un seul
+    bulk = [_queued(user_a.organization_id, 60 - i) for i in range(5)]
+    single = _queued(user_b.organization_id, 1)
+    db_session.add_all(bulk + [single])
+    await db_session.commit()
+
+    claimed = [await claim_job(session_factory, f"worker-{i}") for i in range(3)]
+    assert claimed == [bulk[0].id, single.id, bulk[1].id]
+
+
+async def test_claim_respects_plan_concurrency_cap(
+    db_session: AsyncSession, session_factory, user_a: User
+):
+    org = await db_session.get(Organization, user_a.organization_id)
+    org.subscription_plan = "starter"  # 1 job simultané
+    db_session.add_all([_queued(user_a.organization_id, 10), _queued(user_a.organization_id, 5)])
+    await db_session.commit()
+
+    assert await claim_job(session_factory, "worker-1") is not None
+    assert await claim_job(session_factory, "worker-2") is None
+
+
+async def test_deep_queue_demoted_to_batch_and_capped(
+    db_session: AsyncSession, session_factory, user_a: User, user_b: User, monkeypatch
+):
+    monkeypatch.setattr(jobs.settings, "JOBS_MODE", "external")
+    monkeypatch.setattr(jobs.settings, "JOBS_INTERACTIVE_QUEUE_DEPTH", 2)
+    monkeypatch.setattr(jobs.settings, "JOBS_MAX_RUNNING_BATCH", 1)
+    org = await db_session.get(Organization, user_a.organization_id)
+    org.subscription_plan = "enterprise"
+    await db_session.commit()
+
+    bulk = [
+        await jobs.enqueue_job(db_session, "analyze", {}, organization_id=user_a.organization_id)
+        for _ in range(4)
+    ]
+    assert [j.priority for j in bulk] == ["interactive", "interactive", "batch", "batch"]
+
+    claimed = [await claim_job(session_factory, f"worker-{i}") for i in range(3)]
+    assert claimed == [bulk[0].id, bulk[1].id, bulk[2].id]
+    # Un seul lot à la fois : le 2e batch attend, un job interactif passe devant
+    assert await claim_job(session_factory, "worker-3") is None
+    interactive = await jobs.enqueue_job(db_session, "analyze", {}, organization_id=user_b.organization_id)
+    assert interactive.priority == "interactive"
+    assert await claim_job(session_factory, "worker-4") == interactive.id
+
+
+async def test_queue_depth_endpoint(
+    client: AsyncClient, db_session: AsyncSession, user_a: User, user_b: User, headers_a: dict
+):
+    db_session.add_all([
+        _queued(user_a.organization_id, 10),
+        _queued(user_a.organization_id, 5, priority="batch"),
+        _queued(user_b.organization_id, 5),
+    ])
+    await db_session.commit()
+
+    resp = await client.get("/api/jobs/queue", headers=headers_a)
+    assert resp.status_code == 200
+    queues = resp.json()
+    assert len(queues) == 1  # uniquement sa propre organisation
+    queue = queues[0]
+    assert queue["organization_id"] == str(user_a.organization_id)
+    assert (queue["queued_interactive"], queue["queued_batch"], queue["running"]) == (1, 1, 0)
+    assert queue["weight"] == 4 and queue["max_running"] == 3
+    assert queue["oldest_queued_seconds"] >= 10 * 60 - 5
+
+
+# ---------------------------------------------------------------------------
+# Budget de temps et annulation
+# ---------------------------------------------------------------------------
+
+async def test_job_deadline_fails_with_504_without_retry(
+    db_session: AsyncSession, session_factory, user_a: User, monkeypatch
+):
+    async def _slow(ctx):
+        await asyncio.sleep(5)
+
+    monkeypatch.setitem(jobs._HANDLERS, "test_slow", _slow)
+    monkeypatch.setattr(jobs.settings, "JOBS_MODE", "external")
+    monkeypatch.setattr(jobs.settings, "JOBS_DEADLINE_SECONDS", 0.2)
+    job = await jobs.enqueue_job(db_session, "test_slow", {}, organization_id=user_a.organization_id)
+
+    assert await claim_job(session_factory, "worker") == job.id
+    await execute_job(session_factory, job.id, "worker", heartbeat=False)
+    await db_session.refresh(job)
+    assert (job.status, job.error_status, job.attempts) == ("failed", 504, 1)
+
+
+async def test_cancel_interrupts_running_job(
+    client: AsyncClient, db_session: AsyncSession, session_factory, user_a: User,
+    headers_a: dict, headers_b: dict, monkeypatch,
+):
+    started = asyncio.Event()
+    interrupted = []
+
+    async def _long(ctx):
+        started.set()
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            interrupted.append(ctx.deadline.cancel_reason)
+            raise
+
+    monkeypatch.setitem(jobs._HANDLERS, "test_long", _long)
+    monkeypatch.setattr(jobs.settings, "JOBS_MODE", "external")
+    monkeypatch.setattr(jobs.settings, "JOBS_CANCEL_POLL_SECONDS", 0.05)
+    job = await jobs.enqueue_job(db_session, "test_long", {}, organization_id=user_a.organization_id)
+    assert await claim_job(session_factory, "worker") == job.id
+
+    running = asyncio.create_task(execute_job(session_factory, job.id, "worker"))
+    await asyncio.wait_for(started.wait(), timeout=2)
+
+    resp = await client.post(f"/api/jobs/{job.id}/cancel", headers=headers_b)
+    assert resp.status_code == 404
+    resp = await client.post(f"/api/jobs/{job.id}/cancel", headers=headers_a)
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "cancelled"
+
+    await asyncio.wait_for(running, timeout=2)
+    assert interrupted == ["job annulé"]
+    await db_session.refresh(job)
+    assert job.status == "cancelled"
+    assert await claim_job(session_factory, "worker-2") is None
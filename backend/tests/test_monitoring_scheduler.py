@@ -0,0 +1,435 @@
+"""Tests du scheduler de monitoring — pool borné, plafonds par domaine, timeouts, échéance, baux, lissage."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.audit import Audit
+from app.models.claim import Claim
+from app.models.monitoring_alert import MonitoringAlert
+from app.models.monitoring_config import MonitoringConfig
+from app.models.monitoring_run import MonitoringRun
+from app.models.usage_record import UsageRecord
+from app.models.user import User
+from app.services import monitoring_planner, monitoring_scheduler, monitoring_service
+
+
+@pytest.fixture
+def session_factory(db_session: AsyncSession):
+    return async_sessionmaker(bind=db_session.bind, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _add_configs(db: AsyncSession, user: User, urls: list, overdue_minutes: int = 30) -> dict:
+    """Crée un audit + une config due par URL — retourne {config_id: domaine}."""
+    now = datetime.now(timezone.utc)
+    domains = {}
+    for i, url in enumerate(urls):
+        audit = Audit(
+            organization_id=user.organization_id,
+            company_name=f"Site {i}",
+            sector="textile",
+            website_url=url,
+            created_by_user_id=user.id,
+        )
+        db.add(audit)
+        await db.flush()
+        config = MonitoringConfig(
+            audit_id=audit.id,
+            is_active=True,
+            frequency_days=7,
+            next_check_at=now - timedelta(minutes=overdue_minutes + i),
+        )
+        db.add(config)
+        await db.flush()
+        domains[config.id] = monitoring_scheduler._domain_of(url)
+    await db.commit()
+    return domains
+
+
+@pytest.fixture
+def fake_check(monkeypatch):
+    """Check simulé (sans scraping) : mesure la concurrence globale et par domaine."""
+    state = {"running": 0, "max_running": 0, "per_domain": {}, "max_per_domain": {}, "calls": [],
+             "domains": {}, "delays": {}}
+
+    async def _fake(config_id, db, lease_owner=None, deadline=None):
+        domain = state["domains"][config_id]
+        state["calls"].append((config_id, lease_owner))
+        state["running"] += 1
+        state["per_domain"][domain] = state["per_domain"].get(domain, 0) + 1
+        state["max_running"] = max(state["max_running"], state["running"])
+        state["max_per_domain"][domain] = max(
+            state["max_per_domain"].get(domain, 0), state["per_domain"][domain]
+        )
+        try:
+            await asyncio.sleep(state["delays"].get(config_id, 0.02))
+            # Comme le vrai check : la période suivante est planifiée
+            await db.execute(
+                update(MonitoringConfig)
+                .where(MonitoringConfig.id == config_id)
+                .values(next_check_at=datetime.now(timezone.utc) + timedelta(days=7))
+            )
+            await db.commit()
+            return 1
+        finally:
+            state["running"] -= 1
+            state["per_domain"][domain] -= 1
+
+    monkeypatch.setattr(monitoring_service, "run_monitoring_check", _fake)
+    return state
+
+
+async def test_pool_respects_global_and_domain_caps(
+    db_session: AsyncSession, session_factory, user_a: User, fake_check
+):
+    urls = [
+        "https://www.a.fr", "https://a.fr/rse", "https://a.fr/impact",
+        "https://b.fr", "https://b.fr/csr",
+        "https://c.fr", "https://d.fr", "https://e.fr",
+    ]
+    fake_check["domains"] = await _add_configs(db_session, user_a, urls)
+
+    run = await monitoring_scheduler.run_due_monitoring_checks(
+        session_factory, concurrency=3, domain_concurrency=1, check_timeout=5, run_deadline=30,
+    )
+
+    assert run.due == run.started == run.completed == 8
+    assert run.alerts_created == 8
+    assert run.carried_over == 0 and not run.deadline_hit
+    assert fake_check["max_running"] <= 3
+    assert fake_check["max_running"] > 1  # réellement concurrent
+    assert max(fake_check["max_per_domain"].values()) == 1
+    assert run.max_lag_seconds >= 30 * 60
+
+    stored = (await db_session.execute(select(MonitoringRun))).scalars().all()
+    assert len(stored) == 1 and stored[0].completed == 8
+
+
+async def test_check_timeout_counted(
+    db_session: AsyncSession, session_factory, user_a: User, fake_check
+):
+    domains = await _add_configs(db_session, user_a, ["https://lent.fr", "https://rapide.fr"])
+    fake_check["domains"] = domains
+    slow_id = next(cid for cid, d in domains.items() if d == "lent.fr")
+    fake_check["delays"][slow_id] = 5
+
+    run = await monitoring_scheduler.run_due_monitoring_checks(
+        session_factory, concurrency=2, check_timeout=0.1, run_deadline=30,
+    )
+    assert (run.completed, run.timed_out, run.failed) == (1, 1, 0)
+
+
+async def test_run_deadline_carries_over_remaining(
+    db_session: AsyncSession, session_factory, user_a: User, fake_check
+):
+    urls = [f"https://site{i}.fr" for i in range(6)]
+    domains = await _add_configs(db_session, user_a, urls)
+    fake_check["domains"] = domains
+    for cid in domains:
+        fake_check["delays"][cid] = 0.3
+
+    run = await monitoring_scheduler.run_due_monitoring_checks(
+        session_factory, concurrency=2, check_timeout=5, run_deadline=0.1,
+    )
+    assert run.deadline_hit
+    assert run.completed == 0
+    assert run.due == 6 and run.started == 2
+    assert run.carried_over == 6  # 2 annulés + 4 jamais lancés
+
+    # Baux rendus : toutes les configs restent dues pour le tick suivant
+    configs = (await db_session.execute(select(MonitoringConfig))).scalars().all()
+    assert len(configs) == 6
+    assert all(c.lease_owner is None for c in configs)
+    assert all(monitoring_scheduler._as_utc(c.next_check_at) <= datetime.now(timezone.utc) for c in configs)
+
+
+async def test_no_due_checks_no_run(session_factory, fake_check):
+    assert await monitoring_scheduler.run_due_monitoring_checks(session_factory) is None
+
+
+# ---------------------------------------------------------------------------
+# Baux — plusieurs réplicas
+# ---------------------------------------------------------------------------
+
+async def test_replicas_share_checks_exactly_once(
+    db_session: AsyncSession, session_factory, user_a: User, fake_check
+):
+    urls = [f"https://site{i}.fr" for i in range(20)]
+    fake_check["domains"] = await _add_configs(db_session, user_a, urls)
+
+    runs = await asyncio.gather(*[
+        monitoring_scheduler.run_due_monitoring_checks(
+            session_factory, concurrency=2, check_timeout=5, run_deadline=30, owner=f"replica-{r}",
+        )
+        for r in "abc"
+    ])
+
+    checked = [config_id for config_id, _ in fake_check["calls"]]
+    assert sorted(checked) == sorted(fake_check["domains"])  # chaque config une seule fois
+    assert all(owner is not None for _, owner in fake_check["calls"])
+    assert sum(run.completed for run in runs if run is not None) == 20
+    assert len({owner for _, owner in fake_check["calls"]}) > 1  # travail réparti
+
+
+async def test_valid_lease_skipped_expired_lease_reclaimed(
+    db_session: AsyncSession, session_factory, user_a: User, fake_check
+):
+    domains = await _add_configs(db_session, user_a, ["https://pris.fr", "https://expire.fr"])
+    fake_check["domains"] = domains
+    now = datetime.now(timezone.utc)
+    for config in (await db_session.execute(select(MonitoringConfig))).scalars():
+        config.lease_owner = "autre-replica"
+        expired = domains[config.id] == "expire.fr"
+        config.lease_expires_at = now + (timedelta(minutes=-1) if expired else timedelta(minutes=5))
+    await db_session.commit()
+
+    run = await monitoring_scheduler.run_due_monitoring_checks(
+        session_factory, concurrency=2, check_timeout=5, run_deadline=30, owner="replica-a",
+    )
+
+    assert run.due == run.completed == 1
+    assert [domains[cid] for cid, _ in fake_check["calls"]] == ["expire.fr"]
+    held = (await db_session.execute(
+        select(MonitoringConfig.lease_owner).where(MonitoringConfig.lease_owner.is_not(None))
+    )).scalars().all()
+    assert held == ["autre-replica"]  # le bail valide d'une autre réplique est intact
+
+
+async def test_check_skipped_when_lease_lost(
+    db_session: AsyncSession, user_a: User, monkeypatch
+):
+    async def _no_scrape(url, deadline=None, db=None):
+        raise AssertionError("scrape inattendu")
+
+    monkeypatch.setattr(monitoring_service, "scrape_website", _no_scrape)
+    domains = await _add_configs(db_session, user_a, ["https://repris.fr"])
+    config = await db_session.get(MonitoringConfig, next(iter(domains)))
+    config.lease_owner = "replica-b"
+    await db_session.commit()
+
+    assert await monitoring_service.run_monitoring_check(config.id, db_session, lease_owner="replica-a") == 0
+
+
+
+async def test_check_dedups_against_claims_and_past_alerts(
+    db_session: AsyncSession, user_a: User, monkeypatch
+):
+    """Les allégations connues ne sont plus dans le prompt et ne relancent pas d'alerte."""
+    import anthropic
+
+    page = "Nos engagements RSE : emballages recyclés, énergie renouvelable et neutralité carbone. " * 3
+    extracted = [
+        "Nos emballages sont 100 % recyclés.",              # claim de l'audit
+        "Neutre en carbone depuis 2022 sur tous nos sites",  # alerte déjà levée
+        "Nos boutiques fonctionnent à l'énergie 100% renouvelable.",
+    ]
+    prompts = []
+
+    class _Messages:
+        async def create(self, **kwargs):
+            prompts.append(kwargs["messages"][0]["content"])
+            content = SimpleNamespace(text=json.dumps({"claims": extracted}))
+            return SimpleNamespace(content=[content], usage=None)
+
+    class _Client:
+        def __init__(self, **kwargs):
+            self.messages = _Messages()
+
+    async def _scrape(url, deadline=None, db=None):
+        return page
+
+    monkeypatch.setattr(anthropic, "AsyncAnthropic", _Client)
+    monkeypatch.setattr(monitoring_service.settings, "ANTHROPIC_API_KEY", "sk-test")
+    monkeypatch.setattr(monitoring_service, "scrape_website", _scrape)
+
+    config_id = next(iter(await _add_configs(db_session, user_a, ["https://dedup.fr"])))
+    config = await db_session.get(MonitoringConfig, config_id)
+    db_session.add(Claim(
+        audit_id=config.audit_id, claim_text="« Nos emballages sont 100% recyclés »",
+        support_type="web", scope="produit",
+    ))
+    db_session.add(MonitoringAlert(
+        monitoring_config_id=config_id, claim_text="Neutre en carbone depuis 2022 sur tous nos sites.",
+    ))
+    await db_session.commit()
+
+    assert await monitoring_service.run_monitoring_check(config_id, db_session) == 1
+    assert "déjà connues" not in prompts[0] and "emballages sont 100" not in prompts[0]
+    alerts = (await db_session.execute(
+        select(MonitoringAlert.claim_text).where(MonitoringAlert.monitoring_config_id == config_id)
+    )).scalars().all()
+    assert sorted(alerts) == sorted([
+        "Neutre en carbone depuis 2022 sur tous nos sites.",
+        "Nos boutiques fonctionnent à l'énergie 100% renouvelable.",
+    ])
+
+    # Semaine suivante : même extraction, aucune nouvelle alerte
+    assert await monitoring_service.run_monitoring_check(config_id, db_session) == 0
+
+# ---------------------------------------------------------------------------
+# Lissage de la charge (monitoring_planner)
+# ---------------------------------------------------------------------------
+
+async def test_plan_spreads_configs_enabled_together(
+    db_session: AsyncSession, user_a: User, monkeypatch
+):
+    monkeypatch.setattr(monitoring_planner.settings, "MONITORING_SLOT_CAPACITY", 2)
+    domains = await _add_configs(db_session, user_a, [f"https://s{i}.fr" for i in range(10)])
+    base = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+
+    for config_id in domains:
+        config = await db_session.get(MonitoringConfig, config_id)
+        config.next_check_at = await monitoring_planner.plan_next_check(
+            db_session, config, user_a.organization_id, base=base
+        )
+        await db_session.flush()
+
+    planned = [
+        monitoring_planner._as_utc(c.next_check_at)
+        for c in (await db_session.execute(select(MonitoringConfig))).scalars()
+    ]
+    target = base + timedelta(days=7)
+    assert all(abs(p - target) <= timedelta(hours=13) for p in planned)  # fenêtre ± 12 h
+    per_slot = {}
+    for p in planned:
+        slot = monitoring_planner._slot_start(p)
+        per_slot[slot] = per_slot.get(slot, 0) + 1
+    assert max(per_slot.values()) == 1  # même organisation : un créneau chacun
+
+
+async def test_plan_prefers_slots_below_capacity(
+    db_session: AsyncSession, user_a: User, user_b: User, monkeypatch
+):
+    monkeypatch.setattr(monitoring_planner.settings, "MONITORING_SLOT_CAPACITY", 3)
+    base = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+    target = base + timedelta(days=7)
+    # Org B occupe déjà tous les créneaux de la fenêtre sauf un
+    domains_b = await _add_configs(db_session, user_b, [f"https://b{i}.fr" for i in range(25 * 3)])
+    slots = [target - timedelta(hours=12) + timedelta(hours=h) for h in range(25)]
+    free_slot = slots[20]
+    busy = [s for s in slots if s != free_slot]
+    for index, config_id in enumerate(domains_b):
+        config = await db_session.get(MonitoringConfig, config_id)
+        config.next_check_at = busy[index % len(busy)] + timedelta(minutes=5)
+    await db_session.flush()
+
+    domains_a = await _add_configs(db_session, user_a, ["https://a.fr"])
+    config = await db_session.get(MonitoringConfig, next(iter(domains_a)))
+    planned = await monitoring_planner.plan_next_check(db_session, config, user_a.organization_id, base=base)
+    assert monitoring_planner._slot_start(planned) == free_slot
+
+
+async def test_budget_deferred_checks_spread_over_slots(
+    db_session: AsyncSession, user_a: User, monkeypatch
+):
+    monkeypatch.setattr(monitoring_planner.settings, "MONITORING_SLOT_CAPACITY", 2)
+    domains = await _add_configs(db_session, user_a, [f"https://d{i}.fr" for i in range(5)])
+    db_session.add(UsageRecord(
+        organization_id=user_a.organization_id,
+        day=datetime.now(timezone.utc).date(),
+        operation="scan",
+        input_tokens=10_000_000,
+    ))
+    await db_session.commit()
+
+    now = datetime.now(timezone.utc)
+    for config_id in domains:
+        assert await monitoring_service.run_monitoring_check(config_id, db_session) == 0
+
+    planned = [
+        monitoring_planner._as_utc(c.next_check_at)
+        for c in (await db_session.execute(select(MonitoringConfig))).scalars()
+    ]
+    # Reportés d'un jour environ, sans se regrouper sur un même créneau
+    assert all(abs(p - (now + timedelta(days=1))) <= timedelta(hours=4) for p in planned)
+    assert len({monitoring_planner._slot_start(p) for p in planned}) == len(planned)
+
+
+async def test_reenabling_monitoring_replans_next_check(
+    client: AsyncClient, db_session: AsyncSession, audit_a: Audit, headers_a: dict
+):
+    audit_a.status = "completed"
+    audit_a.website_url = "https://exemple.fr"
+    stale = datetime.now(timezone.utc) - timedelta(days=90)
+    config = MonitoringConfig(audit_id=audit_a.id, is_active=False, frequency_days=7, next_check_at=stale)
+    db_session.add(config)
+    await db_session.commit()
+
+    response = await client.post(
+        f"/api/audits/{audit_a.id}/monitoring", headers=headers_a, json={"frequency_days": 14}
+    )
+    assert response.status_code == 201, response.text
+
+    await db_session.refresh(config)
+    next_check = monitoring_planner._as_utc(config.next_check_at)
+    target = datetime.now(timezone.utc) + timedelta(days=14)
+    assert config.is_active and config.frequency_days == 14
+    assert abs(next_check - target) <= timedelta(hours=13)
+
+
+async def test_backlog_rebalanced_round_robin_across_tenants(
+    db_session: AsyncSession, user_a: User, user_b: User, monkeypatch
+):
+    monkeypatch.setattr(monitoring_planner.settings, "MONITORING_SLOT_CAPACITY", 3)
+    domains_a = await _add_configs(db_session, user_a, [f"https://a{i}.fr" for i in range(5)], overdue_minutes=600)
+    domains_b = await _add_configs(db_session, user_b, ["https://b0.fr", "https://b1.fr"], overdue_minutes=30)
+    now = datetime.now(timezone.utc)
+
+    moved = await monitoring_planner.rebalance_backlog(db_session, now)
+    assert moved == 4
+
+    configs = (await db_session.execute(select(MonitoringConfig))).scalars().all()
+    for config in configs:
+        await db_session.refresh(config)
+    due = [c for c in configs if monitoring_planner._as_utc(c.next_check_at) <= now]
+    assert len(due) == 3
+    # L'organisation B, moins en retard, n'attend pas derrière tout le backlog de A
+    assert sum(1 for c in due if c.id in domains_b) == 1
+    later = sorted(monitoring_planner._slot_start(c.next_check_at) for c in configs if c not in due)
+    current = monitoring_planner._slot_start(now)
+    assert later == [current + timedelta(hours=1)] * 3 + [current + timedelta(hours=2)]
+    assert set(domains_a) | set(domains_b) == {c.id for c in configs}
+
+
+async def test_projected_load_histogram(db_session: AsyncSession, user_a: User, monkeypatch):
+    monkeypatch.setattr(monitoring_planner.settings, "MONITORING_SLOT_CAPACITY", 2)
+    domains = await _add_configs(db_session, user_a, [f"https://h{i}.fr" for i in range(4)])
+    now = datetime.now(timezone.utc)
+    ids = list(domains)
+    # 2 en retard (créneau courant), 1 dans 3 h, 1 au-delà de l'horizon
+    for config_id, delta in zip(ids[2:], (timedelta(hours=3), timedelta(days=30))):
+        config = await db_session.get(MonitoringConfig, config_id)
+        config.next_check_at = now + delta
+    await db_session.flush()
+
+    load = await monitoring_planner.projected_load(db_session, hours=24, now=now)
+    counts = [slot["checks"] for slot in load["slots"]]
+    assert len(counts) == 24
+    assert counts[0] == 2 and sum(counts) == 3
+    assert load["peak"] == 2 and load["over_capacity_slots"] == 0
+    assert load["capacity"] == 2
+
+
+async def test_monitoring_interleaves_tenants_by_weight(
+    db_session: AsyncSession, session_factory, user_a: User, user_b: User, fake_check
+):
+    # L'organisation A, beaucoup plus en retard, ne monopolise pas le pool
+    domains = await _add_configs(db_session, user_a, [f"https://a{i}.fr" for i in range(3)], overdue_minutes=600)
+    domains_b = await _add_configs(db_session, user_b, ["https://b.fr"], overdue_minutes=30)
+    fake_check["domains"] = {**domains, **domains_b}
+
+    run = await monitoring_scheduler.run_due_monitoring_checks(
+        session_factory, concurrency=1, check_timeout=5, run_deadline=30,
+    )
+
+    assert run.completed == 4
+    order = [fake_check["domains"][cid] for cid, _ in fake_check["calls"]]
+    assert order[1] == "b.fr"
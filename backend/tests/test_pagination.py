@@ -0,0 +1,147 @@
+"""Tests de la pagination par curseur des listes (audits, claims, alertes de monitoring)."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+
+from httpx import AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.audit import Audit
+from app.models.claim import Claim
+from app.models.client_access import ClientAccess
+from app.models.monitoring_alert import MonitoringAlert
+from app.models.monitoring_config import MonitoringConfig
+from app.models.user import User
+
+_T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+async def _walk(client: AsyncClient, url: str, headers: dict, limit: int) -> list[list[dict]]:
+    """Toutes les pages d'une liste, en suivant X-Next-Cursor."""
+    pages, params = [], {"limit": limit}
+    while True:
+        response = await client.get(url, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+        params = {"limit": limit, "cursor": cursor}
+
+
+async def test_audits_are_paginated_by_created_at_then_id(
+    client: AsyncClient, headers_a: dict, user_a: User, db_session: AsyncSession
+):
+    # Deux audits au même created_at : départagés par id, sans doublon ni trou
+    audits = [
+        {
+            "id": uuid.uuid4(), "organization_id": user_a.organization_id,
+            "company_name": f"Entreprise {i}", "sector": "textile",
+            "created_at": _T0 + timedelta(hours=min(i, 5)),
+        }
+        for i in range(7)
+    ]
+    await db_session.execute(insert(Audit), audits)
+    await db_session.execute(insert(ClientAccess), [{
+        "id": uuid.uuid4(), "audit_id": audits[0]["id"], "token": uuid.uuid4().hex * 2,
+        "client_email": "client@test.com",
+    }])
+    await db_session.commit()
+
+    pages = await _walk(client, "/api/audits", headers_a, limit=3)
+
+    assert [len(p) for p in pages] == [3, 3, 1]
+    expected = sorted(audits, key=lambda a: (a["created_at"], a["id"]), reverse=True)
+    assert [a["id"] for p in pages for a in p] == [str(a["id"]) for a in expected]
+    by_id = {a["id"]: a for p in pages for a in p}
+    assert by_id[str(audits[0]["id"])]["client_access"]["client_email"] == "client@test.com"
+    assert by_id[str(audits[1]["id"])]["client_access"] is None
+
+    response = await client.get("/api/audits", params={"limit": 3, "include_total": True}, headers=headers_a)
+    assert response.headers["X-Total-Count"] == "7"
+    assert "X-Total-Count" not in (await client.get("/api/audits", headers=headers_a)).headers
+
+
+async def test_invalid_cursor_and_limit_are_rejected(client: AsyncClient, headers_a: dict):
+    response = await client.get("/api/audits", params={"cursor": "pas-un-curseur"}, headers=headers_a)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Curseur de pagination invalide"
+
+    response = await client.get("/api/audits", params={"limit": 1000}, headers=headers_a)
+    assert response.status_code == 422
+
+
+async def test_claims_are_paginated_in_creation_order(
+    client: AsyncClient, headers_a: dict, audit_a: Audit, db_session: AsyncSession
+):
+    claims = [
+        {
+            "id": uuid.uuid4(), "audit_id": audit_a.id, "claim_text": f"Allégation {i}",
+            "support_type": "web", "scope": "produit", "created_at": _T0 + timedelta(minutes=i),
+        }
+        for i in range(5)
+    ]
+    await db_session.execute(insert(Claim), claims)
+    await db_session.commit()
+
+    pages = await _walk(client, f"/api/audits/{audit_a.id}/claims", headers_a, limit=2)
+
+    assert [len(p) for p in pages] == [2, 2, 1]
+    assert [c["claim_text"] for p in pages for c in p] == [f"Allégation {i}" for i in range(5)]
+    assert all(c["results"] == [] for p in pages for c in p)
+
+
+async def test_monitoring_alerts_are_paginated_and_counted(
+    client: AsyncClient, headers_a: dict, audit_a: Audit, db_session: AsyncSession
+):
+    config = MonitoringConfig(audit_id=audit_a.id)
+    db_session.add(config)
+    await db_session.flush()
+    await db_session.execute(insert(MonitoringAlert), [
+        {
+            "id": uuid.uuid4(), "monitoring_config_id": config.id, "claim_text": f"Alerte {i}",
+            "is_read": i % 2 == 0, "detected_at": _T0 + timedelta(days=i),
+        }
+        for i in range(5)
+    ])
+    await db_session.commit()
+
+    response = await client.get(f"/api/audits/{audit_a.id}/monitoring", headers=headers_a)
+    assert response.status_code == 200
+    assert response.json()["unread_alerts_count"] == 2
+    assert len(response.json()["alerts"]) == 5
+    assert response.json()["alerts_next_cursor"] is None
+
+    pages = await _walk(client, f"/api/audits/{audit_a.id}/monitoring/alerts", headers_a, limit=2)
+    assert [a["claim_text"] for p in pages for a in p] == [f"Alerte {i}" for i in reversed(range(5))]
+
+
+async def test_monitoring_config_links_to_older_alerts(
+    client: AsyncClient, headers_a: dict, audit_a: Audit, db_session: AsyncSession, monkeypatch
+):
+    from app.routers import monitoring as monitoring_router
+
+    monkeypatch.setattr(monitoring_router, "DEFAULT_PAGE_SIZE", 2)
+    config = MonitoringConfig(audit_id=audit_a.id)
+    db_session.add(config)
+    await db_session.flush()
+    await db_session.execute(insert(MonitoringAlert), [
+        {"id": uuid.uuid4(), "monitoring_config_id": config.id, "claim_text": f"Alerte {i}",
+         "detected_at": _T0 + timedelta(days=i)}
+        for i in range(5)
+    ])
+    await db_session.commit()
+
+    body = (await client.get(f"/api/audits/{audit_a.id}/monitoring", headers=headers_a)).json()
+    assert [a["claim_text"] for a in body["alerts"]] == ["Alerte 4", "Alerte 3"]
+
+    # La page embarquée se prolonge par l'endpoint paginé, sans doublon ni trou
+    response = await client.get(
+        f"/api/audits/{audit_a.id}/monitoring/alerts",
+        params={"cursor": body["alerts_next_cursor"]}, headers=headers_a,
+    )
+    assert [a["claim_text"] for a in response.json()] == ["Alerte 2", "Alerte 1", "Alerte 0"]
+    assert "X-Next-Cursor" not in response.headers
@@ -0,0 +1,168 @@
+"""
+Plans d'exécution des requêtes chaudes — aucun parcours séquentiel d'une grosse table.
+
+Les endpoints clés sont appelés sur un jeu de données volumineux (ANALYZE
+effectué) ; chaque requête SQL émise est capturée puis repassée en
+EXPLAIN QUERY PLAN (SQLite). Un « SCAN <table> » sur une table seedée fait
+échouer le test : il manque un index (cf. migration 018_index_pack).
+"""
+
+from __future__ import annotations
+
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from httpx import AsyncClient
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.audit import Audit
+from app.models.claim import Claim
+from app.models.claim_result import ClaimResult
+from app.models.client_access import ClientAccess
+from app.models.evidence import EvidenceFile
+from app.models.monitoring_alert import MonitoringAlert
+from app.models.monitoring_config import MonitoringConfig
+from app.models.organization import Organization
+from app.models.user import User
+from app.services import monitoring_scheduler
+
+_ORGS = 30
+_AUDITS_PER_ORG = 40
+_CLAIMS_PER_AUDIT = 5
+
+# Tables seedées : un parcours complet y est interdit
+_LARGE_TABLES = {
+    "audits", "claims", "claim_results", "evidence_files",
+    "client_accesses", "monitoring_configs", "monitoring_alerts",
+}
+_SCAN_RE = re.compile(r"^SCAN (\w+)")
+
+
+async def _seed(db: AsyncSession, user: User) -> dict:
+    """~1 200 audits, 6 000 claims, 12 000 résultats, configs et alertes de monitoring."""
+    now = datetime.now(timezone.utc)
+    org_ids = [user.organization_id] + [uuid.uuid4() for _ in range(_ORGS - 1)]
+    await db.execute(insert(Organization), [
+        {"id": org_id, "name": f"Cabinet {i}", "contact_email": f"c{i}@test.com"}
+        for i, org_id in enumerate(org_ids[1:])
+    ])
+
+    audits, claims, results, evidence, accesses, configs, alerts = [], [], [], [], [], [], []
+    for org_id in org_ids:
+        for a in range(_AUDITS_PER_ORG):
+            audit_id = uuid.uuid4()
+            audits.append({
+                "id": audit_id, "organization_id": org_id, "company_name": f"Entreprise {a}",
+                "sector": "textile", "status": "completed",
+                "created_at": now - timedelta(hours=a),
+            })
+            accesses.append({
+                "id": uuid.uuid4(), "audit_id": audit_id, "token": uuid.uuid4().hex * 2,
+                "client_email": "client@test.com",
+            })
+            config_id = uuid.uuid4()
+            configs.append({
+                "id": config_id, "audit_id": audit_id, "is_active": a % 2 == 0,
+                "next_check_at": now + timedelta(days=1 + a % 7),
+            })
+            alerts.extend({
+                "id": uuid.uuid4(), "monitoring_config_id": config_id,
+                "claim_text": f"Allégation {k}", "is_read": k > 0,
+            } for k in range(3))
+            for c in range(_CLAIMS_PER_AUDIT):
+                claim_id = uuid.uuid4()
+                claims.append({
+                    "id": claim_id, "audit_id": audit_id, "claim_text": f"Produit durable {c}",
+                    "support_type": "web", "scope": "produit", "overall_verdict": "risque",
+                })
+                results.extend({
+                    "id": uuid.uuid4(), "claim_id": claim_id, "criterion": criterion,
+                    "verdict": "risque", "explanation": "—",
+                } for criterion in ("specificite", "justification"))
+                if c == 0:
+                    evidence.append({
+                        "id": uuid.uuid4(), "claim_id": claim_id, "filename": "cert.pdf",
+                        "content_type": "application/pdf", "sha256": uuid.uuid4().hex * 2,
+                        "file_size": 1024,
+                    })
+
+    for model, rows in (
+        (Audit, audits), (Claim, claims), (ClaimResult, results), (EvidenceFile, evidence),
+        (ClientAccess, accesses), (MonitoringConfig, configs), (MonitoringAlert, alerts),
+    ):
+        await db.execute(insert(model), rows)
+    await db.execute(text("ANALYZE"))
+    await db.commit()
+
+    audit = audits[0]
+    claim = next(c for c in claims if c["audit_id"] == audit["id"])
+    access = next(a for a in accesses if a["audit_id"] == audit["id"])
+    return {"audit_id": audit["id"], "claim_id": claim["id"], "token": access["token"]}
+
+
+class _PlanCapture:
+    """Requêtes SQL émises pendant le bloc, pour rejouer leur plan ensuite."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.engine = db.bind.sync_engine
+        self.statements: list[tuple[str, tuple]] = []
+
+    def _capture(self, conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            self.statements.append((statement, tuple(parameters or ())))
+
+    def __enter__(self) -> "_PlanCapture":
+        event.listen(self.engine, "before_cursor_execute", self._capture)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._capture)
+
+    async def sequential_scans(self, db: AsyncSession) -> list[str]:
+        conn = await db.connection()
+        scans = []
+        for statement, parameters in self.statements:
+            plan = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)).all()
+            for row in plan:
+                match = _SCAN_RE.match(row[-1])
+                if match and match.group(1) in _LARGE_TABLES:
+                    scans.append(f"{row[-1]}  ←  {' '.join(statement.split())[:200]}")
+        return scans
+
+
+_HOT_ENDPOINTS = [
+    "/api/audits",
+    "/api/audits/{audit_id}",
+    "/api/audits/{audit_id}/results",
+    "/api/audits/{audit_id}/monitoring",
+    "/api/audits/{audit_id}/monitoring/alerts",
+    "/api/monitoring/unread-summary",
+    "/api/claims/{claim_id}/evidence",
+    "/api/share/{token}",
+]
+
+
+async def test_hot_queries_use_indexes(
+    client: AsyncClient, headers_a: dict, user_a: User, db_session: AsyncSession
+):
+    ids = await _seed(db_session, user_a)
+    factory = async_sessionmaker(bind=db_session.bind, class_=AsyncSession, expire_on_commit=False)
+
+    scans = {}
+    for endpoint in _HOT_ENDPOINTS:
+        with _PlanCapture(db_session) as capture:
+            response = await client.get(endpoint.format(**ids), headers=headers_a)
+        assert response.status_code == 200, (endpoint, response.text)
+        assert capture.statements
+        scans[endpoint] = await capture.sequential_scans(db_session)
+
+    # Checks dus du scheduler de monitoring
+    with _PlanCapture(db_session) as capture:
+        await monitoring_scheduler._lease_due_checks(
+            factory, "replica-1", datetime.now(timezone.utc) + timedelta(days=2), limit=10,
+        )
+    scans["monitoring_scheduler"] = await capture.sequential_scans(db_session)
+
+    assert {name: found for name, found in scans.items() if found} == {}
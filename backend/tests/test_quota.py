@@ -0,0 +1,155 @@
+"""Tests des quotas d'audits : consommation atomique, remise à zéro mensuelle, limite de scans."""
+
+from __future__ import annotations
+
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from sqlalchemy import event, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.audit import Audit
+from app.models.job import Job
+from app.models.organization import Organization
+from app.models.user import User
+from app.services import quota
+
+_PAYLOAD = {"company_name": "Entreprise", "sector": "textile"}
+
+
+@contextmanager
+def _statements(db: AsyncSession):
+    statements: list[str] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    engine = db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+
+async def _org(db: AsyncSession, user: User, **values) -> Organization:
+    org = await db.get(Organization, user.organization_id)
+    for key, value in values.items():
+        setattr(org, key, value)
+    await db.commit()
+    return org
+
+
+async def test_reservation_is_a_single_conditional_update(
+    db_session: AsyncSession, user_a: User
+):
+    org = await _org(db_session, user_a, audits_this_month=3, audits_reset_month=quota._current_month())
+
+    with _statements(db_session) as statements:
+        await quota.reserve_audit(db_session, org.id)
+    assert statements == ["UPDATE"]
+
+    await db_session.refresh(org)
+    assert org.audits_this_month == 4
+
+
+async def test_monthly_limit_is_enforced_then_reset_lazily(
+    client: AsyncClient, headers_a: dict, user_a: User, db_session: AsyncSession
+):
+    org = await _org(db_session, user_a, audits_this_month=15, audits_reset_month=quota._current_month())
+
+    resp = await client.post("/api/audits", json=_PAYLOAD, headers=headers_a)
+    assert resp.status_code == 403
+    assert resp.json()["detail"] == "Limite de 15 audits/mois atteinte. Contactez-nous pour en ajouter."
+
+    # Compteur d'un mois précédent : remis à zéro par la réservation elle-même
+    await _org(db_session, user_a, audits_reset_month="2000-01")
+    resp = await client.post("/api/audits", json=_PAYLOAD, headers=headers_a)
+    assert resp.status_code == 201, resp.text
+
+    await db_session.refresh(org)
+    assert org.audits_this_month == 1
+    assert org.audits_reset_month == quota._current_month()
+
+
+async def test_starter_quota_is_consumed_once(
+    client: AsyncClient, headers_a: dict, user_a: User, db_session: AsyncSession
+):
+    org = await _org(db_session, user_a, subscription_plan="starter", audits_this_month=0)
+
+    assert (await client.post("/api/audits", json=_PAYLOAD, headers=headers_a)).status_code == 201
+    resp = await client.post("/api/audits", json=_PAYLOAD, headers=headers_a)
+    assert resp.status_code == 402
+    assert resp.json()["detail"] == "upgrade_required"
+
+    await db_session.refresh(org)
+    assert org.audits_this_month == 1
+
+
+async def test_rejected_reservation_leaves_counter_unchanged(
+    db_session: AsyncSession, user_a: User
+):
+    org = await _org(db_session, user_a, subscription_plan="partner",
+                     audits_this_month=4, audits_reset_month=quota._current_month())
+
+    await quota.reserve_audit(db_session, org.id)
+    with pytest.raises(HTTPException) as exc:
+        await quota.reserve_audit(db_session, org.id)
+    assert exc.value.status_code == 403
+
+    await db_session.refresh(org)
+    assert org.audits_this_month == 5
+
+
+async def test_starter_scan_limit_counts_in_sql(db_session: AsyncSession, user_a: User):
+    await _org(db_session, user_a, subscription_plan="starter")
+    await db_session.execute(insert(Audit), [
+        {
+            "id": uuid.uuid4(), "organization_id": user_a.organization_id,
+            "company_name": f"Entreprise {i}" if i else "[DÉMO] Entreprise", "sector": "textile",
+        }
+        for i in range(5)
+    ])
+    await db_session.commit()
+
+    # 4 scans + l'audit démo, non compté : verrou sur l'organisation puis COUNT
+    with _statements(db_session) as statements:
+        await quota.reserve_scan(db_session, user_a.organization_id)
+    assert statements == ["SELECT", "SELECT"]
+
+    db_session.add(Audit(organization_id=user_a.organization_id, company_name="Entreprise 5", sector="textile"))
+    await db_session.commit()
+    with pytest.raises(HTTPException) as exc:
+        await quota.reserve_scan(db_session, user_a.organization_id)
+    assert exc.value.status_code == 402
+
+
+async def test_pending_scan_jobs_count_against_starter_limit(
+    db_session: AsyncSession, user_a: User
+):
+    await _org(db_session, user_a, subscription_plan="starter")
+    await db_session.execute(insert(Audit), [
+        {"id": uuid.uuid4(), "organization_id": user_a.organization_id,
+         "company_name": f"Entreprise {i}", "sector": "textile"}
+        for i in range(3)
+    ])
+    await db_session.execute(insert(Job), [
+        {"id": uuid.uuid4(), "kind": "scan", "status": status, "priority": "interactive",
+         "payload": {}, "organization_id": user_a.organization_id}
+        for status in ("queued", "running", "failed")
+    ])
+    await db_session.commit()
+
+    # 3 audits + 2 scans pas encore terminés : la limite est atteinte
+    with pytest.raises(HTTPException) as exc:
+        await quota.reserve_scan(db_session, user_a.organization_id)
+    assert exc.value.status_code == 402
+
+    await db_session.execute(
+        update(Job).where(Job.status == "running").values(status="failed")
+    )
+    await db_session.commit()
+    await quota.reserve_scan(db_session, user_a.organization_id)
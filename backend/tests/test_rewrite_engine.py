@@ -0,0 +1,163 @@
+"""Tests du moteur de réécriture — clé de cache, endpoint batch, réutilisation du cache."""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.audit import Audit
+from app.models.claim import Claim
+from app.models.claim_result import ClaimResult
+from app.models.rewrite_suggestion import RewriteSuggestion
+from app.services import rewrite_engine
+from app.services.rewrite_engine import rewrite_cache_key
+
+
+def test_cache_key_normalizes_text() -> None:
+    reasons = ["Allégation générique"]
+    assert rewrite_cache_key("Produit  Écologique.", "textile", reasons) == rewrite_cache_key(
+        "« produit écologique »", "Textile", reasons
+    )
+
+
+def test_cache_key_depends_on_sector_and_reasons() -> None:
+    base = rewrite_cache_key("produit écologique", "textile", ["a"])
+    assert base != rewrite_cache_key("produit écologique", "alimentaire", ["a"])
+    assert base != rewrite_cache_key("produit écologique", "textile", ["b"])
+    # L'ordre des raisons n'a pas d'importance
+    assert rewrite_cache_key("x", "s", ["a", "b"]) == rewrite_cache_key("x", "s", ["b", "a"])
+
+
+@pytest.fixture
+def fake_batch(monkeypatch):
+    """Remplace l'appel Claude batch — enregistre la taille de chaque lot."""
+    calls: list = []
+
+    async def _fake(items, sector):
+        calls.append(len(items))
+        return {i: [f"Réécriture {i + 1} — {it['claim_text']}"] for i, it in enumerate(items)}
+
+    monkeypatch.setattr(rewrite_engine, "suggest_rewrites_batch", _fake)
+    return calls
+
+
+async def _add_non_conforming_claim(db: AsyncSession, audit: Audit, text: str) -> Claim:
+    claim = Claim(
+        id=uuid.uuid4(),
+        audit_id=audit.id,
+        claim_text=text,
+        support_type="web",
+        scope="produit",
+        overall_verdict="non_conforme",
+    )
+    db.add(claim)
+    db.add(ClaimResult(
+        claim_id=claim.id,
+        criterion="specificity",
+        verdict="non_conforme",
+        explanation="Allégation générique sans qualification",
+    ))
+    await db.commit()
+    return claim
+
+
+async def test_batch_rewrites_single_call_then_cached(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    audit_a: Audit,
+    headers_a: dict,
+    fake_batch: list,
+):
+    for text in ("Produit écologique", "Emballage durable", "Marque verte"):
+        await _add_non_conforming_claim(db_session, audit_a, text)
+
+    resp = await client.post(f"/api/audits/{audit_a.id}/rewrites", headers=headers_a)
+    assert resp.status_code == 200, resp.text
+    rewrites = resp.json()["rewrites"]
+    assert len(rewrites) == 3
+    assert all(r["suggestions"] for r in rewrites)
+    assert fake_batch == [3]  # un seul appel pour les 3 allégations
+
+    # Deuxième passage : tout vient du cache
+    resp = await client.post(f"/api/audits/{audit_a.id}/rewrites", headers=headers_a)
+    assert resp.status_code == 200
+    assert fake_batch == [3]
+
+
+async def test_single_rewrite_reuses_batch_cache(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    audit_a: Audit,
+    headers_a: dict,
+    fake_batch: list,
+):
+    claim = await _add_non_conforming_claim(db_session, audit_a, "Produit écologique")
+
+    await client.post(f"/api/audits/{audit_a.id}/rewrites", headers=headers_a)
+    resp = await client.post(f"/api/claims/{claim.id}/rewrite", headers=headers_a)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["suggestions"] == ["Réécriture 1 — Produit écologique"]
+    assert fake_batch == [1]
+
+
+async def test_batch_rewrites_tenant_isolation(
+    client: AsyncClient,
+    audit_a: Audit,
+    headers_b: dict,
+):
+    resp = await client.post(f"/api/audits/{audit_a.id}/rewrites", headers=headers_b)
+    assert resp.status_code == 404
+
+
+async def test_get_rewrites_leaves_commit_to_caller(
+    db_session: AsyncSession,
+    fake_batch: list,
+    monkeypatch,
+):
+    commits: list = []
+
+    async def _commit():
+        commits.append(True)
+
+    monkeypatch.setattr(db_session, "commit", _commit)
+    [suggestions] = await rewrite_engine.get_rewrites(
+        db_session, [{"claim_text": "Produit écologique", "reasons": ["a"]}], "textile"
+    )
+
+    assert suggestions == ["Réécriture 1 — Produit écologique"]
+    assert commits == []
+    assert len((await db_session.execute(select(RewriteSuggestion))).scalars().all()) == 1
+
+
+async def test_rewrite_endpoints_commit_cache_entries(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    audit_a: Audit,
+    headers_a: dict,
+    fake_batch: list,
+    monkeypatch,
+):
+    """Sans consommation mesurée, metered ne commite pas : l'endpoint doit le faire."""
+    claim = await _add_non_conforming_claim(db_session, audit_a, "Produit écologique")
+    commits: list = []
+    original_commit = AsyncSession.commit
+
+    async def _commit(self):
+        commits.append(True)
+        await original_commit(self)
+
+    monkeypatch.setattr(AsyncSession, "commit", _commit)
+
+    resp = await client.post(f"/api/audits/{audit_a.id}/rewrites", headers=headers_a)
+    assert resp.status_code == 200, resp.text
+    assert commits
+
+    commits.clear()
+    await db_session.execute(RewriteSuggestion.__table__.delete())
+    resp = await client.post(f"/api/claims/{claim.id}/rewrite", headers=headers_a)
+    assert resp.status_code == 200, resp.text
+    assert commits
@@ -0,0 +1,69 @@
+"""Tests d'intégration — endpoint POST /api/audits/scan (scraping simulé)."""
+
+from __future__ import annotations
+
+import pytest
+from httpx import AsyncClient
+
+from app.limiter import limiter
+from app.services import audit_pipeline, monitoring_service
+
+_SITE_TEXT = "\n\n".join([
+    "=== PAGE: https://exemple.fr ===",
+    "Nos chaussures sont écoresponsables et fabriquées en France.",
+    "=== PAGE: https://exemple.fr/engagements ===",
+    "Nous visons la neutralité carbone d'ici 2030.",
+])
+
+
+@pytest.fixture(autouse=True)
+def fake_scrape(monkeypatch):
+    """Remplace le scraping réseau et remet le rate limiter à zéro."""
+    async def _fake(url: str, deadline=None, db=None) -> str:
+        return _SITE_TEXT
+
+    monkeypatch.setattr(audit_pipeline, "scrape_website", _fake)
+    limiter.reset()
+    yield
+    limiter.reset()
+
+
+async def test_scan_lexical_mode_without_llm(client: AsyncClient, headers_a: dict, monkeypatch):
+    async def _no_llm(*args, **kwargs):
+        raise AssertionError("scan_mode=lexical ne doit pas appeler Claude")
+
+    monkeypatch.setattr(audit_pipeline, "extract_claims_with_claude", _no_llm)
+    resp = await client.post("/api/audits/scan", json={
+        "url": "https://exemple.fr",
+        "company_name": "Exemple",
+        "scan_mode": "lexical",
+    }, headers=headers_a)
+
+    assert resp.status_code == 202, resp.text
+    job = resp.json()
+    assert job["status"] == "succeeded", job
+    claims = {c["claim_text"]: c["source_url"] for c in job["result"]["claims"]}
+    assert claims == {
+        "Nos chaussures sont écoresponsables et fabriquées en France.": "https://exemple.fr",
+        "Nous visons la neutralité carbone d'ici 2030.": "https://exemple.fr/engagements",
+    }
+
+
+async def test_scan_llm_mode_falls_back_to_lexical(client: AsyncClient, headers_a: dict, monkeypatch):
+    monkeypatch.setattr(monitoring_service.settings, "ANTHROPIC_API_KEY", "")
+    resp = await client.post("/api/audits/scan", json={
+        "url": "https://exemple.fr",
+        "company_name": "Exemple",
+    }, headers=headers_a)
+
+    assert resp.status_code == 202, resp.text
+    assert resp.json()["result"]["total_claims"] == 2
+
+
+async def test_scan_rejects_unknown_mode(client: AsyncClient, headers_a: dict):
+    resp = await client.post("/api/audits/scan", json={
+        "url": "https://exemple.fr",
+        "company_name": "Exemple",
+        "scan_mode": "magic",
+    }, headers=headers_a)
+    assert resp.status_code == 422
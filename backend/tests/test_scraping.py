@@ -0,0 +1,510 @@
+"""Tests unitaires du pipeline de scraping dans monitoring_service.py (sans réseau)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import urlparse
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.models.scrape_profile import ScrapeProfile
+from app.services import monitoring_service
+from app.services.monitoring_service import (
+    extract_claims_lexical,
+    prefilter_relevant_paragraphs,
+    strip_cross_page_boilerplate,
+)
+from app.services.scrape_profiles import PathOutcome, plan_paths, record_outcomes
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+SITE_FIXTURES = [
+    pytest.param(p, id=p.stem)
+    for p in sorted(FIXTURES_DIR.glob("*.json"))
+    if p.stem != "template"
+]
+
+_HEADER = "Accueil | Boutique | Nos engagements | Contact\nNous utilisons des cookies pour améliorer votre expérience."
+_FOOTER = "© 2026 Exemple SAS — Mentions légales\nLivraison offerte dès 50 €"
+
+
+def _page(url: str, body: str) -> str:
+    return f"=== PAGE: {url} ===\n{_HEADER}\n\n{body}\n\n{_FOOTER}"
+
+
+def test_boilerplate_kept_once_across_pages() -> None:
+    text = "\n\n".join([
+        _page("https://exemple.fr", "Nos emballages sont 100% recyclés."),
+        _page("https://exemple.fr/rse", "Nous visons la neutralité carbone d'ici 2030."),
+        _page("https://exemple.fr/impact", "Notre usine fonctionne à l'énergie solaire."),
+    ])
+    cleaned = strip_cross_page_boilerplate(text)
+
+    assert cleaned.count("Nous utilisons des cookies") == 1
+    assert cleaned.count("Mentions légales") == 1
+    # Le contenu propre à chaque page est intact
+    for body in ("100% recyclés", "neutralité carbone d'ici 2030", "énergie solaire"):
+        assert body in cleaned
+    # Les marqueurs de page sont conservés pour _find_source_url
+    assert cleaned.count("=== PAGE: ") == 3
+    assert len(cleaned) < len(text)
+
+
+def test_single_page_unchanged() -> None:
+    text = _page("https://exemple.fr", "Nos emballages sont 100% recyclés.")
+    assert strip_cross_page_boilerplate(text) == text
+
+
+def test_page_reduced_to_boilerplate_is_dropped() -> None:
+    text = "\n\n".join([
+        _page("https://exemple.fr", "Nos emballages sont 100% recyclés."),
+        _page("https://exemple.fr/csr", ""),
+    ])
+    cleaned = strip_cross_page_boilerplate(text)
+    assert "=== PAGE: https://exemple.fr/csr ===" not in cleaned
+    assert "=== PAGE: https://exemple.fr ===" in cleaned
+
+
+async def test_boilerplate_stripped_before_budget_truncation(monkeypatch, stats) -> None:
+    """Le boilerplate répété ne consomme pas le budget : le contenu de la 3e page survit."""
+    header = "\n".join(f"Menu {i} | Boutique | Nos engagements | Contact" for i in range(70))  # ~3 000 car.
+    bodies = {
+        "": "Nos emballages sont 100 % recyclés. " * 40,
+        "/rse": "Nous visons la neutralité carbone d'ici 2030. " * 32,
+        "/impact": "Notre usine fonctionne à l'énergie solaire. " * 34,
+    }
+
+    async def _fake_page(client, page_url, deadline=None, max_chars=0):
+        path = page_url.removeprefix("https://exemple.fr")
+        return f"{header}\n\n{bodies[path]}"[:max_chars]
+
+    monkeypatch.setattr(monitoring_service, "_fetch_jina_page", _fake_page)
+    text = await monitoring_service._scrape_jina("https://exemple.fr", paths=list(bodies))
+
+    assert sum(len(f"{header}\n\n{b}") for b in bodies.values()) > monitoring_service._JINA_MAX_CHARS
+    assert len(text) <= monitoring_service._JINA_MAX_CHARS
+    assert text.count("Menu 0 | Boutique") == 1
+    for body in bodies.values():
+        assert body.strip() in text
+
+
+# ---------------------------------------------------------------------------
+# Pré-filtre lexical
+# ---------------------------------------------------------------------------
+
+def test_prefilter_drops_irrelevant_paragraphs() -> None:
+    text = "\n\n".join([
+        "=== PAGE: https://exemple.fr ===",
+        "Chaussures homme - 49 EUR",
+        "Soldes -30% sur toute la boutique",
+        "Nos emballages sont 100% recyclés et recyclables.",
+        "Voir le produit",
+        "Paiement sécurisé",
+        "Retours gratuits sous 30 jours",
+        "=== PAGE: https://exemple.fr/faq ===",
+        "Comment suivre ma commande ?",
+    ])
+    filtered = prefilter_relevant_paragraphs(text)
+
+    assert "100% recyclés et recyclables" in filtered
+    # Voisins immédiats conservés comme contexte
+    assert "Soldes -30%" in filtered
+    assert "Voir le produit" in filtered
+    # Paragraphes éloignés et page sans allégation écartés
+    assert "Retours gratuits" not in filtered
+    assert "https://exemple.fr/faq" not in filtered
+    assert filtered.startswith("=== PAGE: https://exemple.fr ===")
+
+
+def test_prefilter_empty_when_nothing_relevant() -> None:
+    assert prefilter_relevant_paragraphs("Accueil\n\nPanier\n\nContact") == ""
+
+
+@pytest.mark.parametrize("paragraph", [
+    "Ouvert du lundi au samedi de 10h à 19h",
+    "Découvrez notre couverture en laine pour l'hiver",
+    "Nous sommes responsables de votre commande jusqu'à sa livraison",
+    "Cours de couture et bourse aux tissus chaque mois",
+    "Notre impact sur votre style",
+])
+def test_prefilter_drops_shop_copy(paragraph: str) -> None:
+    assert prefilter_relevant_paragraphs(paragraph) == ""
+
+
+def test_prefilter_reduces_fixture_size() -> None:
+    data = json.loads((FIXTURES_DIR / "atelier-lin-et-laine.json").read_text(encoding="utf-8"))
+    text = data["scraped_text"]
+    filtered = prefilter_relevant_paragraphs(text)
+
+    assert len(filtered) < 0.75 * len(text)
+    # Navigation, newsletter et pied de page, hors voisinage d'une allégation
+    for shop in ("[Femme]", "Inscrivez-vous à la newsletter", "Politique de confidentialité"):
+        assert shop in text
+        assert shop not in filtered
+
+
+@pytest.mark.parametrize("word", ["nouveau", "cadeau", "bureau", "réseau", "tableau", "plateau"])
+def test_topic_water_matches_whole_word_only(word: str) -> None:
+    assert "topic" not in monitoring_service._lexical_signals(f"Découvrez notre {word} du mois")
+
+
+def test_topic_water_matches_eau_and_eaux() -> None:
+    assert "topic" in monitoring_service._lexical_signals("Nous préservons l'eau")
+    assert "topic" in monitoring_service._lexical_signals("Traitement des eaux usées")
+
+
+def _normalize_ws(text: str) -> str:
+    return re.sub(r"\s+", " ", text.lower()).strip()
+
+
+@pytest.mark.parametrize("fixture_path", SITE_FIXTURES)
+def test_prefilter_keeps_fixture_true_claims(fixture_path: Path) -> None:
+    """Rappel du pré-filtre : toute true_claim présente dans le texte scrapé doit survivre."""
+    data = json.loads(fixture_path.read_text(encoding="utf-8"))
+    scraped = _normalize_ws(data["scraped_text"])
+    filtered = _normalize_ws(prefilter_relevant_paragraphs(data["scraped_text"]))
+
+    # Claude tronque parfois les allégations longues ("…") : on compare le début
+    claims = [_normalize_ws(c.split("…")[0]) for c in data["true_claims"]]
+    verbatim = [c for c in claims if c and c in scraped]
+    if not verbatim:
+        pytest.skip("Aucune true_claim verbatim dans le texte scrapé")
+    missed = [c for c in verbatim if c not in filtered]
+    assert not missed, f"Allégations écartées par le pré-filtre : {missed}"
+
+
+# ---------------------------------------------------------------------------
+# Extracteur lexical
+# ---------------------------------------------------------------------------
+
+_LEXICAL_SITE = "\n\n".join([
+    "=== PAGE: https://exemple.fr ===",
+    "# Bienvenue chez Exemple",
+    "Nos chaussures sont **écoresponsables** et fabriquées en France.",
+    "[Voir la collection](https://exemple.fr/collection)",
+    "Soldes -30% sur toute la boutique",
+    "=== PAGE: https://exemple.fr/engagements ===",
+    "Nous visons à réduire nos émissions de 40% d'ici 2030. Livraison en 48h.",
+    "Nos produits sont garantis sans BPA pour toute la famille.",
+])
+
+
+def test_lexical_extractor_keeps_triggering_sentences() -> None:
+    items = extract_claims_lexical(_LEXICAL_SITE, audited_company_name="Exemple")
+    by_text = {i["claim_text"]: i["source_url"] for i in items}
+
+    assert by_text == {
+        "Nos chaussures sont écoresponsables et fabriquées en France.": "https://exemple.fr",
+        "Nous visons à réduire nos émissions de 40% d'ici 2030.": "https://exemple.fr/engagements",
+        "Nos produits sont garantis sans BPA pour toute la famille.": "https://exemple.fr/engagements",
+    }
+
+
+def test_lexical_extractor_skips_existing_claims() -> None:
+    items = extract_claims_lexical(
+        _LEXICAL_SITE,
+        existing_claims=["« Nos chaussures sont écoresponsables et fabriquées en France »"],
+    )
+    assert all("écoresponsables" not in i["claim_text"] for i in items)
+    assert len(items) == 2
+
+
+async def test_llm_extraction_falls_back_to_lexical(monkeypatch) -> None:
+    monkeypatch.setattr(monitoring_service.settings, "ANTHROPIC_API_KEY", "")
+    assert await monitoring_service.extract_claims_with_claude(_LEXICAL_SITE, []) == []
+    items = await monitoring_service.extract_claims_with_claude(
+        _LEXICAL_SITE, [], lexical_fallback=True
+    )
+    assert len(items) == 3
+
+
+# ---------------------------------------------------------------------------
+# Requêtes couvertes (hedged)
+# ---------------------------------------------------------------------------
+
+_GOOD = "Nos engagements RSE : emballages recyclés, énergie renouvelable sur tous nos sites de production."
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    from app.services.scrape_stats import scrape_stats
+
+    scrape_stats.reset()
+    monkeypatch.setattr(monitoring_service.settings, "SCRAPE_HEDGING", True)
+    monkeypatch.setattr(monitoring_service.settings, "SCRAPE_HEDGE_DELAY_SECONDS", 0.05)
+    yield scrape_stats
+    scrape_stats.reset()
+
+
+def _backend(text: str, delay: float, calls: list, name: str):
+    async def _fetch() -> str:
+        calls.append(name)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            calls.append(f"{name}:cancelled")
+            raise
+        return text
+
+    return name, _fetch
+
+
+async def test_hedge_secondary_wins_when_primary_slow(stats) -> None:
+    calls: list = []
+    text = await monitoring_service._hedged_fetch(
+        _backend(_GOOD, 2.0, calls, "firecrawl"), _backend(_GOOD + " (jina)", 0.01, calls, "jina")
+    )
+    assert text.endswith("(jina)")
+    assert "firecrawl:cancelled" in calls
+    snapshot = stats.snapshot()
+    assert snapshot["jina"]["wins"] == 1 and snapshot["jina"]["hedged"] == 1
+    assert snapshot["firecrawl"]["cancelled"] == 1
+
+
+async def test_hedge_not_fired_when_primary_fast(stats) -> None:
+    calls: list = []
+    text = await monitoring_service._hedged_fetch(
+        _backend(_GOOD, 0.0, calls, "firecrawl"), _backend(_GOOD, 0.0, calls, "jina")
+    )
+    assert text == _GOOD
+    assert calls == ["firecrawl"]
+    assert stats.snapshot()["firecrawl"]["requests"] == 1
+
+
+async def test_hedge_skips_unusable_result(stats) -> None:
+    """Un 404 / consent wall du backend le plus rapide ne gagne pas la course."""
+    calls: list = []
+    not_found = "Oups ! Cette page n'existe pas. Erreur 404 — retour à l'accueil de notre boutique en ligne."
+    text = await monitoring_service._hedged_fetch(
+        _backend(_GOOD, 0.2, calls, "firecrawl"), _backend(not_found, 0.0, calls, "jina")
+    )
+    assert text == _GOOD
+    assert stats.snapshot()["firecrawl"]["wins"] == 1
+
+
+async def test_fast_primary_failure_does_not_hedge(stats) -> None:
+    """Chemin inexistant côté Firecrawl : pas de requête Jina en plus."""
+    calls: list = []
+    text = await monitoring_service._hedged_fetch(
+        _backend("", 0.0, calls, "firecrawl"), _backend(_GOOD, 0.0, calls, "jina")
+    )
+    assert text is None
+    assert calls == ["firecrawl"]
+
+
+def test_hedge_delay_follows_primary_percentile(stats) -> None:
+    assert monitoring_service.hedge_delay() == 0.05
+    for i in range(1, 101):
+        stats.record("firecrawl", i / 10, ok=True)
+    assert stats.percentile("firecrawl", 0.5) == 5.0
+    assert monitoring_service.hedge_delay() == 9.0
+
+
+# ---------------------------------------------------------------------------
+# Profil de scraping par domaine
+# ---------------------------------------------------------------------------
+
+def _jina_site(monkeypatch, pages: dict) -> list:
+    """Jina simulé : pages = {chemin: texte}, 404 ailleurs. Retourne les chemins demandés."""
+    requested: list = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        path = urlparse(str(request.url).split("r.jina.ai/", 1)[1]).path
+        requested.append(path)
+        if path in pages:
+            return httpx.Response(200, text=pages[path])
+        return httpx.Response(404, text="")
+
+    real_client = httpx.AsyncClient
+
+    def _client(*args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(_handler)
+        return real_client(*args, **kwargs)
+
+    monkeypatch.setattr(monitoring_service.httpx, "AsyncClient", _client)
+    monkeypatch.setattr(monitoring_service.settings, "FIRECRAWL_API_KEY", None)
+    return requested
+
+
+async def test_profile_limits_scrape_to_productive_paths(db_session, monkeypatch) -> None:
+    requested = _jina_site(monkeypatch, {"": _GOOD, "/rse": _GOOD + " Objectif zéro plastique en 2027."})
+
+    first = await monitoring_service.scrape_website("https://www.exemple.fr", db=db_session)
+    assert "Objectif zéro plastique" in first
+    assert len(requested) == len(monitoring_service._FC_RSE_PATHS)
+    await db_session.commit()
+
+    profile = (await db_session.execute(select(ScrapeProfile))).scalar_one()
+    assert profile.domain == "exemple.fr"
+    assert profile.paths["/rse"]["outcome"] == "content"
+    assert profile.paths["/esg"]["outcome"] == "not_found"
+
+    requested.clear()
+    second = await monitoring_service.scrape_website("exemple.fr", db=db_session)
+    assert "Objectif zéro plastique" in second
+    assert sorted(requested) == ["", "/rse"]
+
+
+async def test_subpath_scan_does_not_shape_root_profile(db_session, monkeypatch) -> None:
+    """Chemins relatifs à l'URL scannée : "" sous /rse est /rse, pas l'accueil du site."""
+    requested = _jina_site(monkeypatch, {"/rse": _GOOD, "/rse/impact": _GOOD + " Bilan carbone 2025."})
+
+    await monitoring_service.scrape_website("https://exemple.fr/rse", db=db_session)
+    await db_session.commit()
+    profiles = (await db_session.execute(select(ScrapeProfile))).scalars().all()
+    assert [p.domain for p in profiles] == ["exemple.fr/rse"]
+
+    # Scan de la racine : profil distinct, /rse sondé bien qu'il soit "" dans l'autre profil
+    requested.clear()
+    text = await monitoring_service.scrape_website("https://exemple.fr", db=db_session)
+    assert "engagements RSE" in text
+    assert "/rse" in requested
+    assert len(requested) == len(monitoring_service._FC_RSE_PATHS)
+
+
+async def test_profile_reprobes_oldest_unproductive_paths(db_session) -> None:
+    paths = monitoring_service._FC_RSE_PATHS
+    now = datetime.now(timezone.utc)
+    outcomes = {p: PathOutcome("not_found") for p in paths[2:]}
+    outcomes[""] = PathOutcome("content", 500, "jina")
+    await record_outcomes(db_session, "https://exemple.fr", outcomes, now=now - timedelta(days=30))
+    await record_outcomes(
+        db_session, "https://exemple.fr", {"/impact": PathOutcome("not_found")}, now=now
+    )
+    await db_session.flush()
+
+    plan = await plan_paths(db_session, "https://exemple.fr", paths, now=now)
+    assert plan.paths[:2] == ["", "/rse"]  # productif, puis inconnu
+    assert len(plan.paths) == 2 + 3  # + 3 re-sondes
+    assert "/impact" not in plan.paths  # sondé récemment
+    assert plan.backends == {"": "jina"}
+
+
+async def test_stale_profile_falls_back_to_full_probe(db_session, monkeypatch) -> None:
+    await record_outcomes(
+        db_session,
+        "https://exemple.fr",
+        {p: PathOutcome("content" if p == "/rse" else "not_found", 900, "jina")
+         for p in monitoring_service._FC_RSE_PATHS},
+    )
+    await db_session.flush()
+    # Site refondu : /rse n'existe plus, le contenu est passé sous /impact
+    requested = _jina_site(monkeypatch, {"/impact": _GOOD})
+
+    text = await monitoring_service.scrape_website("https://exemple.fr", db=db_session)
+    assert "engagements RSE" in text
+    assert requested[0] == "/rse"
+    assert len(requested) == len(monitoring_service._FC_RSE_PATHS)
+
+    plan = await plan_paths(db_session, "https://exemple.fr", monitoring_service._FC_RSE_PATHS)
+    assert plan.paths == ["/impact"]
+
+
+# ---------------------------------------------------------------------------
+# Lecture en flux bornée
+# ---------------------------------------------------------------------------
+
+class _Chunks(httpx.AsyncByteStream):
+    """Corps de réponse servi par morceaux, en comptant les morceaux consommés."""
+
+    def __init__(self, chunks: list) -> None:
+        self.chunks = chunks
+        self.served = 0
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.served += 1
+            yield chunk
+
+
+async def test_jina_page_read_stops_at_char_budget(monkeypatch, stats) -> None:
+    body = _Chunks([("Nos engagements écoresponsables. " * 100).encode()] * 1000)  # ~3,4 Mo
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, stream=body, headers={"content-type": "text/plain; charset=utf-8"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as client:
+        text = await monitoring_service._fetch_jina_page(client, "https://exemple.fr", max_chars=5000)
+
+    assert len(text) <= 5000 and text.startswith("Nos engagements écoresponsables.")
+    assert body.served <= 2
+    snapshot = stats.snapshot()["jina"]
+    assert snapshot["bytes_read"] < 10_000
+    assert 0 < snapshot["bytes_used"] <= snapshot["bytes_read"]
+
+
+async def test_firecrawl_page_truncated_and_redirect_recorded(stats) -> None:
+    def _handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["url"] == "https://exemple.fr/rse"
+        return httpx.Response(200, json={"success": True, "data": {
+            "markdown": "Nos engagements écoresponsables. " * 2000,
+            "metadata": {"url": "https://exemple.fr/nos-engagements"},
+        }})
+
+    redirects: dict = {}
+    async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as client:
+        text = await monitoring_service._fetch_firecrawl_page(client, "https://exemple.fr/rse", 5.0, redirects)
+
+    assert len(text) == monitoring_service._FIRECRAWL_PAGE_MAX_CHARS
+    assert redirects == {"https://exemple.fr/rse": "https://exemple.fr/nos-engagements"}
+
+
+async def test_losing_firecrawl_request_is_interrupted(stats) -> None:
+    """La requête Firecrawl perdante est annulée en vol, pas laissée finir dans un thread."""
+    calls: list = []
+
+    async def _slow(request: httpx.Request) -> httpx.Response:
+        calls.append("firecrawl")
+        try:
+            await asyncio.sleep(2.0)
+        except asyncio.CancelledError:
+            calls.append("firecrawl:cancelled")
+            raise
+        return httpx.Response(200, json={"data": {"markdown": _GOOD}})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(_slow)) as client:
+        text = await monitoring_service._hedged_fetch(
+            ("firecrawl", lambda: monitoring_service._fetch_firecrawl_page(client, "https://exemple.fr")),
+            _backend(_GOOD + " (jina)", 0.01, calls, "jina"),
+        )
+
+    assert text.endswith("(jina)")
+    assert calls == ["firecrawl", "jina", "firecrawl:cancelled"]
+
+
+async def test_multibyte_chars_split_across_chunks() -> None:
+    encoded = "Écoconçu à 100 % — émissions réduites.".encode()
+    body = _Chunks([encoded[i:i + 1] for i in range(len(encoded))])
+    response = httpx.Response(200, stream=body, headers={"content-type": "text/plain; charset=utf-8"})
+    text, read = await monitoring_service._stream_text(response, max_chars=1000, max_bytes=10_000)
+    assert text == "Écoconçu à 100 % — émissions réduites."
+    assert read == len(encoded)
+
+
+async def test_sitemap_streamed_with_byte_cap(monkeypatch) -> None:
+    head = b'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+    urls = [f"<url><loc>https://exemple.fr/produit-{i}</loc></url>".encode() for i in range(50_000)]
+    urls[10] = b"<url><loc>https://exemple.fr/nos-engagements-rse</loc></url>"
+    body = _Chunks([head] + [b"".join(urls[i:i + 100]) for i in range(0, len(urls), 100)])
+    monkeypatch.setattr(monitoring_service.settings, "SCRAPE_SITEMAP_MAX_BYTES", 20_000)
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/sitemap.xml":
+            return httpx.Response(200, stream=body)
+        return httpx.Response(404)
+
+    real_client = httpx.AsyncClient
+
+    def _client(*args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(_handler)
+        return real_client(*args, **kwargs)
+
+    monkeypatch.setattr(monitoring_service.httpx, "AsyncClient", _client)
+    found = await monitoring_service._fetch_sitemap_urls("https://exemple.fr")
+    assert found == ["https://exemple.fr/nos-engagements-rse"]
+    assert body.served < 10  # lecture arrêtée bien avant les 500 morceaux
@@ -0,0 +1,170 @@
+"""Tests du registre de consommation — mesure, agrégats, contrôle d'admission."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.limiter import limiter
+from app.models.audit import Audit
+from app.models.monitoring_config import MonitoringConfig
+from app.models.organization import Organization
+from app.models.usage_record import UsageRecord
+from app.models.user import User
+from app.services import audit_pipeline, monitoring_service
+from app.services.quota import reserve_audit
+from app.services.usage import metered, record_llm_usage, record_scrape
+
+_SITE_TEXT = "=== PAGE: https://exemple.fr ===\nNos chaussures sont écoresponsables et fabriquées en France."
+
+
+def _fake_message(input_tokens: int, output_tokens: int, cached: int = 0):
+    return SimpleNamespace(usage=SimpleNamespace(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cache_read_input_tokens=cached,
+    ))
+
+
+async def _exhaust_budget(db: AsyncSession, user: User) -> None:
+    db.add(UsageRecord(
+        organization_id=user.organization_id,
+        day=datetime.now(timezone.utc).date(),
+        operation="scan",
+        input_tokens=10_000_000,
+    ))
+    await db.commit()
+
+
+@pytest.fixture
+def fake_scrape(monkeypatch):
+    """Scrape simulé : 3 pages Firecrawl facturées, rate limiter remis à zéro."""
+    async def _fake(url: str, deadline=None, db=None) -> str:
+        record_scrape("firecrawl", 3)
+        return _SITE_TEXT
+
+    monkeypatch.setattr(audit_pipeline, "scrape_website", _fake)
+    monkeypatch.setattr(monitoring_service, "scrape_website", _fake)
+    limiter.reset()
+    yield
+    limiter.reset()
+
+
+async def test_metered_collects_from_tasks_and_threads(db_session: AsyncSession, user_a: User, audit_a: Audit):
+    async def _llm_call():
+        record_llm_usage(_fake_message(100, 20, cached=50))
+
+    async with metered(db_session, user_a.organization_id, "scan", audit_id=audit_a.id) as meter:
+        await asyncio.gather(_llm_call(), _llm_call())
+        await asyncio.to_thread(record_scrape, "firecrawl")
+        await asyncio.to_thread(record_scrape, "jina")
+
+    assert (meter.input_tokens, meter.output_tokens, meter.cached_tokens, meter.llm_calls) == (200, 40, 100, 2)
+    rows = (await db_session.execute(select(UsageRecord))).scalars().all()
+    assert len(rows) == 1
+    assert rows[0].audit_id == audit_a.id
+    assert (rows[0].firecrawl_pages, rows[0].jina_calls) == (1, 1)
+
+    # Hors opération mesurée : aucun effet
+    record_llm_usage(_fake_message(1, 1))
+    record_scrape("firecrawl")
+
+
+async def test_failed_metered_block_rolls_back_caller_work(db_session: AsyncSession, user_a: User):
+    # Session qui n'annule que son propre travail (savepoint), comme une session de prod
+    factory = async_sessionmaker(
+        bind=db_session.bind, class_=AsyncSession, expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+    async with factory() as db:
+        with pytest.raises(RuntimeError):
+            async with metered(db, user_a.organization_id, "scan") as meter:
+                await asyncio.to_thread(record_scrape, "firecrawl", 2)
+                audit = Audit(organization_id=user_a.organization_id, company_name="Partiel", sector="autre")
+                db.add(audit)
+                await db.flush()
+                meter.audit_id = audit.id
+                await reserve_audit(db, user_a.organization_id, enforce=False)
+                raise RuntimeError("échec en cours de scan")
+
+    # Consommation inscrite, mais ni l'audit ni le quota du bloc échoué
+    record = (await db_session.execute(select(UsageRecord))).scalar_one()
+    assert (record.firecrawl_pages, record.audit_id) == (2, None)
+    assert (await db_session.execute(select(Audit))).scalars().all() == []
+    org = await db_session.get(Organization, user_a.organization_id)
+    await db_session.refresh(org)
+    assert org.audits_this_month == 0
+
+
+async def test_scan_is_recorded_and_shown_on_dashboard(
+    client: AsyncClient, db_session: AsyncSession, headers_a: dict, fake_scrape
+):
+    resp = await client.post("/api/audits/scan", json={
+        "url": "https://exemple.fr",
+        "company_name": "Exemple",
+        "scan_mode": "lexical",
+    }, headers=headers_a)
+    assert resp.status_code == 202, resp.text
+    audit_id = resp.json()["audit_id"]
+
+    record = (await db_session.execute(select(UsageRecord))).scalar_one()
+    assert record.operation == "scan"
+    assert str(record.audit_id) == audit_id
+    assert record.firecrawl_pages == 3
+
+    resp = await client.get("/api/usage", headers=headers_a)
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["totals"]["scrape_pages"] == 3
+    assert data["remaining"]["scrape_pages"] == data["budget"]["scrape_pages"] - 3
+    assert len(data["by_day"]) == 1
+    assert [row["audit_id"] for row in data["by_audit"]] == [audit_id]
+
+
+async def test_usage_dashboard_rejects_bad_month(client: AsyncClient, headers_a: dict):
+    resp = await client.get("/api/usage", params={"month": "2026-13"}, headers=headers_a)
+    assert resp.status_code == 400
+
+
+async def test_scan_rejected_when_budget_exhausted(
+    client: AsyncClient, db_session: AsyncSession, user_a: User, headers_a: dict, fake_scrape
+):
+    await _exhaust_budget(db_session, user_a)
+    resp = await client.post("/api/audits/scan", json={
+        "url": "https://exemple.fr",
+        "company_name": "Exemple",
+        "scan_mode": "lexical",
+    }, headers=headers_a)
+    assert resp.status_code == 429
+
+
+async def test_monitoring_check_deferred_when_budget_exhausted(
+    db_session: AsyncSession, user_a: User, audit_a: Audit, fake_scrape
+):
+    audit_a.website_url = "https://exemple.fr"
+    config = MonitoringConfig(
+        audit_id=audit_a.id,
+        is_active=True,
+        frequency_days=7,
+        next_check_at=datetime.now(timezone.utc),
+    )
+    db_session.add(config)
+    await db_session.commit()
+    await _exhaust_budget(db_session, user_a)
+
+    assert await monitoring_service.run_monitoring_check(config.id, db_session) == 0
+    await db_session.refresh(config)
+    assert config.last_checked_at is None
+    next_check = config.next_check_at.replace(tzinfo=config.next_check_at.tzinfo or timezone.utc)
+    # Report d'un jour, lissé par le planificateur (fenêtre ± 10 %)
+    now = datetime.now(timezone.utc)
+    assert now + timedelta(hours=21) < next_check < now + timedelta(hours=27)
+    # Rien n'a été scrapé : seule la ligne de consommation initiale existe
+    rows = (await db_session.execute(select(UsageRecord))).scalars().all()
+    assert len(rows) == 1
@@ -32,4 +32,57 @@ api.interceptors.response.use(
   }
 );
 
+/**
+ * Suit un job asynchrone (scan, analyse) jusqu'à sa fin et retourne son résultat.
+ * En cas d'échec, rejette une erreur au même format qu'une réponse axios
+ * (err.response.status / err.response.data.detail).
+ * signal (AbortSignal) : à l'abandon (page quittée), le job est annulé côté
+ * serveur — le scraping et les appels LLM en cours sont interrompus.
+ */
+export async function waitForJob(job, { intervalMs = 2000, onProgress, signal } = {}) {
+  let current = job;
+  const cancel = () => api.post(`/jobs/${current.id}/cancel`).catch(() => {});
+  if (signal) signal.addEventListener('abort', cancel, { once: true });
+  try {
+    while (current.status === 'queued' || current.status === 'running') {
+      if (onProgress) onProgress(current);
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+      if (signal?.aborted) {
+        const error = new Error('Job annulé');
+        error.name = 'AbortError';
+        throw error;
+      }
+      const { data } = await api.get(`/jobs/${current.id}`);
+      current = data;
+    }
+  } finally {
+    if (signal) signal.removeEventListener('abort', cancel);
+  }
+  if (current.status === 'failed') {
+    const error = new Error(current.error || 'Job en échec');
+    error.response = {
+      status: current.error_status || 500,
+      data: { detail: current.error },
+    };
+    throw error;
+  }
+  return current.result;
+}
+
+/**
+ * Récupère toutes les pages d'une liste paginée par curseur (en-tête X-Next-Cursor).
+ * Réservé aux listes bornées (claims d'un audit) ; les listes longues chargent
+ * page par page.
+ */
+export async function getAllPages(url, params = {}) {
+  const items = [];
+  let cursor = null;
+  do {
+    const res = await api.get(url, { params: { ...params, ...(cursor && { cursor }) } });
+    items.push(...res.data);
+    cursor = res.headers['x-next-cursor'];
+  } while (cursor);
+  return items;
+}
+
 export default api;
@@ -136,6 +136,7 @@ export default function AuditResults() {
   const [monitoring, setMonitoring] = useState(null);
   const [monitoringLoading, setMonitoringLoading] = useState(false);
   const [monitoringError, setMonitoringError] = useState('');
+  const [loadingMoreAlerts, setLoadingMoreAlerts] = useState(false);
   const [rewrites, setRewrites] = useState({});
   const [rewriteLoading, setRewriteLoading] = useState({});
   const [evidenceFiles, setEvidenceFiles] = useState({});
@@ -428,6 +429,24 @@ export default function AuditResults() {
     } catch { /* silent */ }
   };
 
+  const handleLoadMoreAlerts = async () => {
+    setLoadingMoreAlerts(true);
+    try {
+      const res = await api.get(`/audits/${auditId}/monitoring/alerts`, {
+        params: { cursor: monitoring.alerts_next_cursor },
+      });
+      setMonitoring((prev) => ({
+        ...prev,
+        alerts: [...prev.alerts, ...res.data],
+        alerts_next_cursor: res.headers['x-next-cursor'] || null,
+      }));
+    } catch {
+      setMonitoringError('Impossible de charger les alertes suivantes.');
+    } finally {
+      setLoadingMoreAlerts(false);
+    }
+  };
+
   const handleMarkRead = async (alertId) => {
     try {
       await api.patch(`/monitoring/alerts/${alertId}/read`);
@@ -800,6 +819,17 @@ export default function AuditResults() {
                       </p>
                     </div>
                   ))}
+                  {monitoring.alerts_next_cursor && (
+                    <div className="pt-2 flex justify-center">
+                      <button
+                        onClick={handleLoadMoreAlerts}
+                        disabled={loadingMoreAlerts}
+                        className="px-4 py-2 text-sm font-medium text-gray-600 bg-white border border-gray-200 rounded-lg hover:bg-gray-50 disabled:opacity-50"
+                      >
+                        {loadingMoreAlerts ? 'Chargement...' : 'Charger plus'}
+                      </button>
+                    </div>
+                  )}
                 </div>
               )}
             </div>
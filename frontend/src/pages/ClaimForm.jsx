@@ -1,6 +1,6 @@
 import { useState, useEffect, useCallback } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
-import api from '../api/client';
+import api, { getAllPages, waitForJob } from '../api/client';
 import { useAuth } from '../api/auth';
 
 // ---------------------------------------------------------------------------
@@ -110,8 +110,7 @@ export default function ClaimForm() {
 
   const fetchClaims = useCallback(async () => {
     try {
-      const res = await api.get(`/audits/${audit_id}/claims`);
-      setClaims(res.data);
+      setClaims(await getAllPages(`/audits/${audit_id}/claims`, { limit: 200 }));
     } catch (err) {
       setError('Impossible de charger les allegations.');
     } finally {
@@ -238,7 +237,8 @@ export default function ClaimForm() {
     setAnalyzing(true);
     setError(null);
     try {
-      await api.post(`/audits/${audit_id}/analyze`);
+      const { data: job } = await api.post(`/audits/${audit_id}/analyze`);
+      await waitForJob(job);
       navigate(`/audits/${audit_id}/results`);
     } catch (err) {
       setError("Erreur lors du lancement de l'analyse.");
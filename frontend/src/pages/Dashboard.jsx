@@ -37,6 +37,8 @@ export default function Dashboard() {
   const { user } = useAuth();
   const isPro = ['partner', 'pro', 'enterprise'].includes(user?.subscription_plan);
   const [audits, setAudits] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [deletingId, setDeletingId] = useState(null);
@@ -57,14 +59,29 @@ export default function Dashboard() {
         api.get('/audits'),
         api.get('/monitoring/unread-summary'),
       ]);
-      if (auditsRes.status === 'fulfilled') setAudits(auditsRes.value.data);
-      else setError('Impossible de charger les audits. Veuillez réessayer.');
+      if (auditsRes.status === 'fulfilled') {
+        setAudits(auditsRes.value.data);
+        setNextCursor(auditsRes.value.headers['x-next-cursor'] || null);
+      } else setError('Impossible de charger les audits. Veuillez réessayer.');
       if (unreadRes.status === 'fulfilled') setUnreadAlerts(unreadRes.value.data);
     } finally {
       setLoading(false);
     }
   }
 
+  async function loadMoreAudits() {
+    try {
+      setLoadingMore(true);
+      const res = await api.get('/audits', { params: { cursor: nextCursor } });
+      setAudits((prev) => [...prev, ...res.data]);
+      setNextCursor(res.headers['x-next-cursor'] || null);
+    } catch {
+      setError('Impossible de charger les audits suivants.');
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
   async function handleDelete(e, auditId) {
     e.stopPropagation();
     if (!window.confirm('Supprimer cet audit brouillon ?')) return;
@@ -255,6 +272,18 @@ export default function Dashboard() {
           })}
         </div>
       )}
+
+      {nextCursor && (
+        <div className="mt-6 flex justify-center">
+          <button
+            onClick={loadMoreAudits}
+            disabled={loadingMore}
+            className="px-4 py-2 text-sm font-medium text-gray-600 bg-white border border-gray-200 rounded-lg hover:bg-gray-50 disabled:opacity-50"
+          >
+            {loadingMore ? 'Chargement...' : 'Charger plus'}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
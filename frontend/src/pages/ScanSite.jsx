@@ -1,6 +1,6 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
-import api from '../api/client';
+import api, { waitForJob } from '../api/client';
 import { useAuth } from '../api/auth';
 
 const SECTORS = [
@@ -120,6 +120,10 @@ export default function ScanSite() {
   const [scansUsed, setScansUsed] = useState(null);
 
   const SCAN_LIMIT = 5;
+  const scanAbort = useRef(null);
+
+  // Page quittée pendant le scan : le job est annulé côté serveur
+  useEffect(() => () => scanAbort.current?.abort(), []);
 
   useEffect(() => {
     if (isPro) return;
@@ -147,15 +151,18 @@ export default function ScanSite() {
     setStep('scanning');
 
     try {
-      const { data } = await api.post('/audits/scan', {
+      const { data: job } = await api.post('/audits/scan', {
         url,
         company_name: companyName,
         sector,
       });
+      scanAbort.current = new AbortController();
+      const data = await waitForJob(job, { signal: scanAbort.current.signal });
       setResults(data);
       setStep('results');
       if (!isPro) setScansUsed((prev) => (prev ?? 0) + 1);
     } catch (err) {
+      if (err.name === 'AbortError') return;
       if (err.response?.status === 402) {
         setStep('limit');
       } else {